@@ -0,0 +1,75 @@
+"""Time ArithmaticOpReader spends joining both sides and computing the price columns.
+
+Compares the join on aligned keys with the pd.merge and column renaming the reader used before,
+for a stock against an index and for every stock of one reader against the same stock of another.
+
+Usage: python benchmarks/bench_arithmetic_reader.py [--identifiers 200] [--days 5000] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(base_dir, "src"))
+
+import numpy as np
+import pandas as pd
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.datareader.data_reader import DateRangeSourceDataReader
+
+
+def build_data(identifiers: list[str], days: int, seed: int) -> pd.DataFrame:
+    dates = pd.bdate_range("2004-01-01", periods=days)
+    rows = len(identifiers) * days
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            BaseColumns.Identifier: pd.Categorical(np.tile(identifiers, days)),
+            BaseColumns.Date: np.repeat(dates.to_numpy(), len(identifiers)),
+            **{col: rng.uniform(10, 1000, rows) for col in [BaseColumns.Open, BaseColumns.High, BaseColumns.Low, BaseColumns.Close]},
+            BaseColumns.Volume: rng.integers(1, 10**6, rows).astype(float),
+        }
+    )
+
+
+def time_calls(callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        callable()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def merge_and_rename(reader, l_data, r_data, on_cols, prefix_l, prefix_r):
+    merged_df = reader.merge_on_keys(l_data, r_data, on_cols, prefix_l, prefix_r)
+    reader.add_price_columns(merged_df, prefix_l, prefix_r)
+    return merged_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--identifiers", type=int, default=200)
+    parser.add_argument("--days", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    l_reader, r_reader = DateRangeSourceDataReader(), DateRangeSourceDataReader()
+    l_reader.options.col_prefix, r_reader.options.col_prefix = "FO-", "Cash-"
+    reader = l_reader / r_reader
+
+    stocks = [f"SYM{i:04d}" for i in range(args.identifiers)]
+    cases = {
+        "stock / index": (build_data(["SYM0001"], args.days, 1), build_data(["NIFTY 50"], args.days, 2), [BaseColumns.Date], "SYM0001-", "NIFTY 50-"),
+        "stocks / index": (build_data(stocks, args.days // 4, 1), build_data(["NIFTY 50"], args.days // 4, 2), [BaseColumns.Date], "FO-", "NIFTY 50-"),
+        "stocks / stocks": (build_data(stocks, args.days // 4, 1), build_data(stocks, args.days // 4, 2), [BaseColumns.Identifier, BaseColumns.Date], "FO-", "Cash-"),
+    }
+
+    print(f"{'case':<16} {'rows':>10} {'aligned ms':>12} {'merge ms':>10}")
+    for name, (l_data, r_data, on_cols, prefix_l, prefix_r) in cases.items():
+        aligned = time_calls(lambda: reader.merge_with_operation(l_data, r_data), args.repeat)
+        merged = time_calls(lambda: merge_and_rename(reader, l_data, r_data, on_cols, prefix_l, prefix_r), args.repeat)
+        print(f"{name:<16} {l_data.shape[0]:>10,} {aligned:>12.1f} {merged:>10.1f}")
@@ -0,0 +1,77 @@
+"""Latency of MemoryCachedDataReader.read_cached_data on a cache of several million rows.
+
+Compares the binary search over the sorted partitions with a boolean mask over the whole cache,
+which is how the cache answered range reads before it was partitioned.
+
+Usage: python benchmarks/bench_memory_cache.py [--identifiers 2000] [--days 1250] [--repeat 1000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(base_dir, "src"))
+
+import numpy as np
+import pandas as pd
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.datareader.data_reader import DateRangeCriteria, DateRangeSourceDataReader, MemoryCachedDataReader
+
+
+def build_data(identifiers: int, days: int) -> pd.DataFrame:
+    dates = pd.bdate_range("2019-01-01", periods=days)
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            BaseColumns.Identifier: pd.Categorical(np.tile([f"SYM{i:04d}" for i in range(identifiers)], days)),
+            BaseColumns.Date: np.repeat(dates.to_numpy(), identifiers),
+            BaseColumns.Close: rng.uniform(10, 1000, identifiers * days),
+            BaseColumns.Volume: rng.integers(1, 10**6, identifiers * days).astype(float),
+        }
+    )
+
+
+def time_calls(callable, repeat: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        callable()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, max(timings) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--identifiers", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=1250)
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    data = build_data(args.identifiers, args.days)
+    reader = MemoryCachedDataReader(DateRangeSourceDataReader())
+    started = time.perf_counter()
+    reader.on_received_more_data(data)
+    print(f"Cached {data.shape[0]:,} rows in {len(reader.partitions)} partitions in {time.perf_counter() - started:.2f}s")
+
+    dates = data[BaseColumns.Date].drop_duplicates().sort_values().dt.date.tolist()
+    day = dates[len(dates) // 2]
+    cases = {
+        "single day": DateRangeCriteria(day, day),
+        "one month": DateRangeCriteria(dates[len(dates) // 2], dates[len(dates) // 2 + 20]),
+        "one year": DateRangeCriteria(dates[len(dates) // 2], dates[len(dates) // 2 + 250]),
+    }
+
+    print(f"{'read':<12} {'method':<14} {'rows':>10} {'median ms':>10} {'max ms':>10}")
+    for name, criteria in cases.items():
+        rows = reader.read_cached_data(criteria).shape[0]
+        median, worst = time_calls(lambda: reader.read_cached_data(criteria), args.repeat)
+        print(f"{name:<12} {'searchsorted':<14} {rows:>10,} {median:>10.3f} {worst:>10.3f}")
+
+        median, worst = time_calls(
+            lambda: data[data[BaseColumns.Date].dt.date.between(criteria.from_date, criteria.to_date)],
+            max(1, args.repeat // 100),
+        )
+        print(f"{name:<12} {'full scan':<14} {rows:>10,} {median:>10.3f} {worst:>10.3f}")
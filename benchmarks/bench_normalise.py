@@ -0,0 +1,87 @@
+"""Before/after benchmark of DataReader.normalise_base_column_values on bhavcopy sized frames.
+
+Usage: python benchmarks/bench_normalise.py
+"""
+import math
+import os
+import sys
+import time
+
+code_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(code_dir)
+
+import numpy as np
+import pandas as pd
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.datareader.data_reader import DataReader
+
+
+def row_wise_normalise(data: pd.DataFrame) -> pd.DataFrame:
+    for col_name in [BaseColumns.Open, BaseColumns.High, BaseColumns.Low]:
+        data[col_name] = data.apply(
+            lambda x: x[col_name]
+            if str(x[col_name]).replace(".", "").isnumeric() == True
+            else x[BaseColumns.Close],
+            axis=1,
+        )
+        data[col_name] = data[col_name].astype(float)
+
+    data[BaseColumns.PreviousClose] = data.groupby(
+        BaseColumns.Identifier
+    )[BaseColumns.Close].transform(lambda x: x.shift(1))
+
+    for col_name in [BaseColumns.Volume, BaseColumns.Turnover]:
+        if col_name in data.columns:
+            data[col_name] = (
+                data[col_name]
+                .apply(
+                    lambda val: val
+                    if str(val).replace(".", "").isnumeric() == True
+                    else math.nan
+                )
+                .astype(float)
+            )
+        else:
+            data[col_name] = 0
+    return data
+
+
+def make_bhavcopy(rows: int, with_dashes: bool) -> pd.DataFrame:
+    """F&O bhavcopy shaped frame; `with_dashes` mimics files using '-' for untraded prices"""
+    rng = np.random.default_rng(42)
+    close = rng.uniform(0.05, 25000, rows).round(2)
+    data = pd.DataFrame(
+        {
+            BaseColumns.Identifier: [f"SYM{i}" for i in rng.integers(0, 2500, rows)],
+            BaseColumns.Close: close,
+            BaseColumns.Volume: rng.integers(0, 100000, rows),
+            BaseColumns.Turnover: rng.uniform(0, 1e8, rows).round(2),
+        }
+    )
+    for col_name in [BaseColumns.Open, BaseColumns.High, BaseColumns.Low]:
+        values = (close * rng.uniform(0.95, 1.05, rows)).round(2)
+        values[rng.random(rows) < 0.3] = 0
+        if with_dashes:
+            values = values.astype(object)
+            values[rng.random(rows) < 0.2] = "-"
+        data[col_name] = values
+    return data
+
+
+def timed(function, data):
+    started = time.perf_counter()
+    result = function(data)
+    return time.perf_counter() - started, result
+
+
+if __name__ == "__main__":
+    reader = DataReader()
+    print(f"{'rows':>8} {'format':>10} {'row-wise (s)':>13} {'vectorised (s)':>15} {'speedup':>8}")
+    for rows in [10000, 90000]:
+        for with_dashes in [False, True]:
+            before, expected = timed(row_wise_normalise, make_bhavcopy(rows, with_dashes))
+            after, actual = timed(reader.normalise_base_column_values, make_bhavcopy(rows, with_dashes))
+            pd.testing.assert_frame_equal(actual, expected)
+            label = "dashes" if with_dashes else "numeric"
+            print(f"{rows:>8} {label:>10} {before:>13.3f} {after:>15.4f} {before / after:>7.0f}x")
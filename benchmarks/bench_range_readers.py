@@ -0,0 +1,88 @@
+"""Compares per-day accumulation in range readers against the single concat collector.
+
+Usage: python benchmarks/bench_range_readers.py
+"""
+import os
+import sys
+import time
+
+code_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(code_dir)
+
+import numpy as np
+import pandas as pd
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.datareader.data_reader import (
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    ForDateCriteria,
+    MarketDaysHelper,
+    SingleDaySourceDataReader,
+)
+
+ROWS_PER_DAY = 20000
+
+
+class InMemoryDailyReader(SingleDaySourceDataReader):
+    """Serves a pre-built F&O sized frame for every day so only the collection cost is measured"""
+
+    def __init__(self, rows_per_day: int = ROWS_PER_DAY):
+        super().__init__()
+        self.name = "in_memory"
+        rng = np.random.default_rng(0)
+        close = rng.uniform(10, 1000, rows_per_day).round(2)
+        self.day_data = pd.DataFrame(
+            {
+                BaseColumns.Identifier: [f"SYM{i % 2000}" for i in range(rows_per_day)],
+                BaseColumns.Open: close,
+                BaseColumns.High: close,
+                BaseColumns.Low: close,
+                BaseColumns.Close: close,
+                BaseColumns.Volume: rng.integers(0, 10000, rows_per_day),
+                BaseColumns.Turnover: rng.uniform(0, 1e6, rows_per_day),
+            }
+        )
+
+    def read(self, criteria):
+        data = self.day_data.copy()
+        data[BaseColumns.Date] = pd.to_datetime(criteria.for_date)
+        return data
+
+
+def read_with_repeated_concat(reader: InMemoryDailyReader, criteria: DateRangeCriteria):
+    result = pd.DataFrame()
+    for for_date in MarketDaysHelper.get_days_list_for_range(criteria.from_date, criteria.to_date):
+        if MarketDaysHelper.is_open_for_day(pd.Timestamp(for_date).date()):
+            data = reader.read(ForDateCriteria(for_date))
+            if result.empty:
+                result = data
+            else:
+                result = pd.concat([result, data], ignore_index=True).reset_index(drop=True)
+    return result
+
+
+def read_with_collector(reader: InMemoryDailyReader, criteria: DateRangeCriteria):
+    # post_read_data is skipped so both variants measure only the accumulation
+    wrapper = DateRangeDataReaderWrapper(reader)
+    wrapper.post_read_data = lambda data: data
+    return wrapper.read(criteria)
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+if __name__ == "__main__":
+    reader = InMemoryDailyReader()
+    start = pd.Timestamp("2019-01-01").date()
+    print(f"{'days':>6} {'repeated concat (s)':>20} {'collector (s)':>14} {'collector ms/day':>17}")
+    for days in [60, 120, 250]:
+        criteria = DateRangeCriteria(start, (pd.Timestamp(start) + pd.offsets.BDay(days)).date())
+        quadratic_time, quadratic = timed(read_with_repeated_concat, reader, criteria)
+        linear_time, linear = timed(read_with_collector, reader, criteria)
+        assert quadratic.shape == linear.shape
+        sessions = linear[BaseColumns.Date].nunique()
+        print(f"{sessions:>6} {quadratic_time:>20.3f} {linear_time:>14.3f} {linear_time / sessions * 1000:>17.2f}")
@@ -0,0 +1,76 @@
+"""Throughput of the NSE readers against the offline stand-in of the archives (tests/nse_stand_in.py).
+
+Every reader runs in a fresh process reading the same range twice: once downloading from the
+stand-in and once from the files cached on disk. Reports files/sec, rows/sec and the peak RSS of
+the reader process.
+
+Usage: python benchmarks/bench_readers.py [--symbols 500] [--strikes 20] [--days 20]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(base_dir, "src"))
+sys.path.append(os.path.join(base_dir, "tests"))
+
+import pandas as pd
+
+from markets_insights.core.core import Instrumentation, InstrumentationType
+from markets_insights.core.environment import Environment, EnvironmentSettings
+from markets_insights.datareader import data_reader
+from markets_insights.datareader.data_reader import DateRangeCriteria, DateRangeDataReaderWrapper
+from markets_insights.datareader.download_client import DownloadClient
+from nse_stand_in import NseArchiveStandIn, SyntheticMarketData
+
+READERS = ["BhavCopyReader", "NseIndicesNewReader", "NseIndexOptionsDataReader", "NseDerivatiesOldReader"]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_reader(reader_name: str, base_url: str, criteria: DateRangeCriteria, results):
+    Instrumentation.change_level(InstrumentationType.Info)
+    with tempfile.TemporaryDirectory() as data_dir:
+        Environment.setup(data_dir)
+        EnvironmentSettings.Urls["NseArchivesUrl"] = base_url
+        for pass_name in ["download", "cached"]:
+            reader = getattr(data_reader, reader_name)()
+            reader.options.download_client = DownloadClient(requests_per_second=1000, burst=1000)
+            wrapper = DateRangeDataReaderWrapper(reader)
+            started = time.perf_counter()
+            data = wrapper.read(criteria)
+            elapsed = time.perf_counter() - started
+            files = len(wrapper.get_open_dates(criteria))
+            results.put((reader_name, pass_name, files / elapsed, data.shape[0] / elapsed, data.shape[0], peak_rss_mb()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--strikes", type=int, default=20)
+    parser.add_argument("--days", type=int, default=20)
+    args = parser.parse_args()
+
+    start = pd.Timestamp("2023-11-01").date()
+    criteria = DateRangeCriteria(start, (pd.Timestamp(start) + pd.offsets.BDay(args.days - 1)).date())
+    market_data = SyntheticMarketData(symbols=args.symbols, strikes=args.strikes)
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'reader':<28} {'pass':<9} {'files/s':>9} {'rows/s':>12} {'rows':>10} {'peak RSS (MB)':>14}")
+    with NseArchiveStandIn(market_data) as stand_in:
+        for reader_name in READERS:
+            results = context.Queue()
+            process = context.Process(target=run_reader, args=(reader_name, stand_in.base_url, criteria, results))
+            process.start()
+            process.join()
+            while not results.empty():
+                name, pass_name, files_per_second, rows_per_second, rows, peak_rss = results.get()
+                print(f"{name:<28} {pass_name:<9} {files_per_second:>9.1f} {rows_per_second:>12,.0f} {rows:>10,} {peak_rss:>14.1f}")
@@ -55,6 +55,10 @@ class CalculationWorker:
     def get_params(self) -> dict:
         return self._params
 
+    def get_required_columns(self) -> list[str]:
+        """Columns read by the worker besides the base columns"""
+        return [value for key, value in self._params.items() if "column" in key and isinstance(value, str)]
+
     def add_calculated_columns(self, data: pd.DataFrame):
         raise NotImplementedError("add_calculated_fields")
 
@@ -81,6 +85,9 @@ class CalculationPipeline:
     def get_calculation_window(self) -> CalculationWindow:
         return CalculationWindow.load_from_list([worker.get_calculation_window() for worker in self._pipeline])
 
+    def get_required_columns(self) -> list[str]:
+        return list(dict.fromkeys(column for worker in self._pipeline for column in worker.get_required_columns()))
+
 
 class ColumnValueCrossedAboveFlagWorker(CalculationWorker):
     def __init__(self, value_column: str = None, value: int = 0):
@@ -89,7 +96,7 @@ class ColumnValueCrossedAboveFlagWorker(CalculationWorker):
 
     @Instrumentation.trace(name="ColumnValueCrossedAboveFlagWorker")
     def add_calculated_columns(self, data: pd.DataFrame):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         data[self._columns[0]] = identifier_grouped_data[self._params['value_column']].transform(
             lambda x: (x.shift(1) < self._params['value']) & (x >= self._params['value'])
         )
@@ -105,7 +112,7 @@ class ColumnValueCrossedBelowFlagWorker(CalculationWorker):
 
     @Instrumentation.trace(name="ColumnValueCrossedBelowFlagWorker")
     def add_calculated_columns(self, data: pd.DataFrame):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         data[self._columns[0]] = identifier_grouped_data[self._params['value_column']].transform(
             lambda x: (x.shift(-1) > self._params['value']) & (x <= self._params['value'])
         )
@@ -145,7 +152,7 @@ class ColumnValueCrossedAboveAnotherColumnValueFlagWorker(CalculationWorker):
 
     @Instrumentation.trace(name="ColumnValueCrossedAboveAnotherColumnValueFlagWorker")
     def add_calculated_columns(self, data: pd.DataFrame):
-        grouped_data = data.groupby(self.get_group_cols(data.columns))
+        grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         column_a = self._params["value_column_a"]
         column_b = self._params["value_column_b"]
         if len(data[BaseColumns.Identifier].unique()) > 1:
@@ -168,7 +175,7 @@ class ColumnValueCrossedBelowAnotherColumnValueFlagWorker(CalculationWorker):
 
     @Instrumentation.trace(name="ColumnValueCrossedBelowAnotherColumnValueFlagWorker")
     def add_calculated_columns(self, data: pd.DataFrame):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         column_a = self._params["value_column_a"]
         column_b = self._params["value_column_b"]
         if len(data[BaseColumns.Identifier].unique()) > 1:
@@ -255,7 +262,7 @@ class SmaCalculationWorker(CalculationWorker):
 
     @Instrumentation.trace(name="SmaCalculationWorker")
     def add_calculated_columns(self, data: pd.DataFrame):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         data[self._columns[0]] = identifier_grouped_data[BaseColumns.Close].transform(
             lambda x: x.rolling(self._params['time_window']).mean()
         )
@@ -268,7 +275,7 @@ class StdDevCalculationWorker(CalculationWorker):
 
     @Instrumentation.trace(name="StdDevCalculationWorker")
     def add_calculated_columns(self, data: pd.DataFrame):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         data[self._columns[0]] = identifier_grouped_data[BaseColumns.Close].transform(
             lambda x: x.rolling(self._params['time_window']).std()
         )
@@ -316,7 +323,7 @@ class RsiOldCalculationWorker(CalculationWorker):
 
     @Instrumentation.trace(name="RsiOldCalculationWorker")
     def add_calculated_columns(self, data):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         data[CalculatedColumns.ClosePriceDiff] = identifier_grouped_data[
             BaseColumns.Close
         ].transform(lambda x: x.diff(1))
@@ -383,7 +390,7 @@ class RsiCalculationWorker(CalculationWorker):
     @Instrumentation.trace(name="RsiCalculationWorker")
     def add_calculated_columns(self, data):
         if not data.empty:
-            result = data.groupby(self.get_group_cols(data.columns), group_keys=True).apply(
+            result = data.groupby(self.get_group_cols(data.columns), group_keys=True, observed=True).apply(
                 self.calculate_rsi
             )
             return result.reset_index(drop=True)
@@ -405,7 +412,7 @@ class StochRsiCalculationWorker(CalculationWorker):
 
     @Instrumentation.trace(name="StochRsiCalculationWorker")
     def add_calculated_columns(self, data):
-        result = data.groupby(self.get_group_cols(data.columns), group_keys=True).apply(
+        result = data.groupby(self.get_group_cols(data.columns), group_keys=True, observed=True).apply(
             self.calculate_stoch_rsi
         )
         return result.reset_index(drop=True)
@@ -421,7 +428,7 @@ class VwapCalculationWorker(CalculationWorker):
         data[BaseColumns.Volume] = data[BaseColumns.Volume].replace("-", 0)
         if len(data[BaseColumns.Identifier].unique()) > 1:
             data[CalculatedColumns.Vwap] = (
-                data.groupby(self.get_group_cols(data.columns))
+                data.groupby(self.get_group_cols(data.columns), observed=True)
                 .apply(
                     lambda x: x[BaseColumns.Turnover].rolling(self._params['time_window']).sum()
                     / x.rolling(self._params['time_window'])[BaseColumns.Volume].sum()
@@ -439,7 +446,7 @@ class LowestPriceInNextNDaysCalculationWorker(CalculationWorker):
 
     @Instrumentation.trace(name="LowestPriceInNextNDaysCalculationWorker")
     def add_calculated_columns(self, data):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         data[self._columns[0]] = identifier_grouped_data[
             self._params['low_price_column']
         ].transform(
@@ -462,7 +469,7 @@ class HighestPriceInNextNDaysCalculationWorker(CalculationWorker):
 
     @Instrumentation.trace(name="HighestPriceInNextNDaysCalculationWorker")
     def add_calculated_columns(self, data):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         data[self._columns[0]] = identifier_grouped_data[
             self._params['high_price_column']
         ].transform(
@@ -486,7 +493,7 @@ class ColumnGrowthCalculationWorker(CalculationWorker):
 
     @Instrumentation.trace(name="ColumnChangeOverNDaysCalculationWorker")
     def add_calculated_columns(self, data: pd.DataFrame):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         data[self._columns[0]] = identifier_grouped_data[self._params["value_column"]].transform(lambda x:
             x - x.iloc[0]
         )
@@ -503,7 +510,7 @@ class ColumnChangeOverNDaysCalculationWorker(CalculationWorker):
 
     @Instrumentation.trace(name="ColumnChangeOverNDaysCalculationWorker")
     def add_calculated_columns(self, data: pd.DataFrame):
-        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns))
+        identifier_grouped_data = data.groupby(self.get_group_cols(data.columns), observed=True)
         N: int = self._params['N']
         data[self._columns[0]] = identifier_grouped_data[self._params["value_column"]].transform(lambda x:
             x - x.shift(N)
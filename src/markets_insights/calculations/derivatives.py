@@ -12,7 +12,7 @@ class DerivativesPriceCalculationWorker(CalculationWorker):
     @Instrumentation.trace(name="DerivativesPriceCalculationWorker")
     def add_calculated_columns(self, data):
         if DerivativesBaseColumns.PreviousClose not in data.columns.to_list():
-            data[DerivativesBaseColumns.PreviousClose] = data.groupby(self.get_group_cols(data.columns))[DerivativesBaseColumns.Close].transform(lambda x: x.shift(1))
+            data[DerivativesBaseColumns.PreviousClose] = data.groupby(self.get_group_cols(data.columns), observed=True)[DerivativesBaseColumns.Close].transform(lambda x: x.shift(1))
 
         data[DerivativesCalculatedColumns.CloseToPrevCloseChangePerc] = (
             data[DerivativesBaseColumns.Close]
@@ -63,7 +63,7 @@ class DerivativesLotSizeCalculationWorker(CalculationWorker):
     @Instrumentation.trace(name="DerivativesLotSizeCalculationWorker")
     def add_calculated_columns(self, data):
         data[DerivativesCalculatedColumns.LotSize] = \
-            data.groupby([DerivativesBaseColumns.Identifier, DerivativesBaseColumns.ExpiryDate]) \
+            data.groupby([DerivativesBaseColumns.Identifier, DerivativesBaseColumns.ExpiryDate], observed=True) \
             [DerivativesBaseColumns.OpenInterest].transform(lambda x: x.min())
 
 
@@ -7,7 +7,10 @@ from markets_insights.core.column_definition import (
 from markets_insights.core.settings import MarketDaysSettings
 from markets_insights.core.environment import EnvironmentSettings
 from datetime import date
+import operator
 import time
+from ast import literal_eval
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 import calendar
@@ -98,70 +101,213 @@ class NoTrace:
         return
 
 
+class TradingCalendar:
+    """Trading sessions of the market: the weekdays outside `Weekends` that are not in
+    MarketDaysSettings.MarketHolidays, plus MarketDaysSettings.HolidayOpenings. The sessions from
+    `first_day` to `last_day` are built once into a sorted datetime64 array, so that lookups are
+    binary searches and take single dates or whole arrays of dates. Lookups of dates outside the
+    span extend it first."""
+
+    first_day = date(1990, 1, 1)
+    last_day = date(2099, 12, 31)
+
+    _calendar = None
+    _calendar_key = None
+
+    def get():
+        """The calendar of the current settings, rebuilt when the holiday lists are replaced or extended"""
+        key = (
+            id(MarketDaysSettings.MarketHolidays),
+            len(MarketDaysSettings.MarketHolidays),
+            id(MarketDaysSettings.HolidayOpenings),
+            len(MarketDaysSettings.HolidayOpenings),
+        )
+        if TradingCalendar._calendar_key != key:
+            TradingCalendar._calendar = TradingCalendar(
+                MarketDaysSettings.MarketHolidays, TradingCalendar.flatten(MarketDaysSettings.HolidayOpenings)
+            )
+            TradingCalendar._calendar_key = key
+        return TradingCalendar._calendar
+
+    def flatten(days) -> list:
+        return [day for item in days for day in (item if isinstance(item, (list, tuple)) else [item])]
+
+    def __init__(self, holidays: list[date], openings: list[date] = []):
+        weekmask = [day not in Weekends for day in calendar.day_name]
+        self.holidays = np.unique(np.array(holidays, dtype="datetime64[D]"))
+        self.openings = np.unique(np.array(openings, dtype="datetime64[D]"))
+        self.busdaycalendar = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+        self.first_day = np.datetime64(TradingCalendar.first_day, "D")
+        self.last_day = np.datetime64(TradingCalendar.last_day, "D")
+        self.sessions = self.get_sessions_between(self.first_day, self.last_day)
+
+    def get_sessions_between(self, first_day: np.datetime64, last_day: np.datetime64) -> np.ndarray:
+        days = np.arange(first_day, last_day + 1)
+        return days[np.is_busday(days, busdaycal=self.busdaycalendar) | np.isin(days, self.openings)]
+
+    def cover(self, dates, sessions: int = 0) -> np.ndarray:
+        """The days of `dates`, after extending the sessions to a year and `sessions` sessions around them"""
+        days = TradingCalendar.to_days(dates)
+        first_day, last_day = get_span(days, np.timedelta64(366 + 2 * abs(sessions), "D"))
+        if first_day is not None and (first_day < self.first_day or last_day > self.last_day):
+            first_day, last_day = min(first_day, self.first_day), max(last_day, self.last_day)
+            self.sessions = self.get_sessions_between(first_day, last_day)
+            self.first_day, self.last_day = first_day, last_day
+        return days
+
+    def to_days(dates):
+        """datetime64[D] of a date, datetime or Timestamp, or of an array-like of them"""
+        if isinstance(dates, date):
+            return np.datetime64(dates.date() if hasattr(dates, "date") else dates, "D")
+        if isinstance(dates, np.datetime64):
+            return dates.astype("datetime64[D]")
+        return pd.DatetimeIndex(dates).to_numpy().astype("datetime64[D]")
+
+    def is_open(self, dates):
+        days = self.cover(dates)
+        positions = np.minimum(self.sessions.searchsorted(days), len(self.sessions) - 1)
+        return self.sessions[positions] == days
+
+    def next_open(self, dates, include_this: bool = True):
+        """The first session on or after (`include_this`) or strictly after each date"""
+        days = self.cover(dates)
+        return self.sessions[self.sessions.searchsorted(days, side="left" if include_this else "right")]
+
+    def previous_open(self, dates, include_this: bool = True):
+        """The last session on or before (`include_this`) or strictly before each date"""
+        days = self.cover(dates)
+        return self.sessions[self.sessions.searchsorted(days, side="right" if include_this else "left") - 1]
+
+    def offset(self, dates, sessions: int):
+        """The `sessions`-th session after each date when positive, before it when negative, or
+        the first session on or after it for zero"""
+        days = self.cover(dates, sessions)
+        if sessions > 0:
+            return self.sessions[self.sessions.searchsorted(days, side="right") + sessions - 1]
+        return self.sessions[self.sessions.searchsorted(days, side="left") + sessions]
+
+    def sessions_in_range(self, from_date, to_date) -> pd.DatetimeIndex:
+        start = self.sessions.searchsorted(self.cover(from_date), side="left")
+        end = self.sessions.searchsorted(self.cover(to_date), side="right")
+        return pd.DatetimeIndex(self.sessions[start:end].astype("datetime64[ns]"))
+
+    def count_sessions(self, from_date, to_date):
+        """Number of sessions from `from_date` to `to_date`, both included, for dates or arrays of dates"""
+        start = self.sessions.searchsorted(self.cover(from_date), side="left")
+        end = self.sessions.searchsorted(self.cover(to_date), side="right")
+        return np.maximum(end - start, 0)
+
+
+def get_span(days, margin: np.timedelta64) -> tuple:
+    """First and last of `days` widened by `margin`, or None and None when there are no days"""
+    days = np.atleast_1d(days)
+    days = days[~np.isnat(days)]
+    if len(days) == 0:
+        return None, None
+    return days.min() - margin, days.max() + margin
+
+
+class ExpiryCalendar:
+    """Derivatives expiry dates over the span of the TradingCalendar. Contracts expire on
+    `weekday`, every week for the weekly cycle of index derivatives and on the last one of the
+    month for the monthly cycle of index and stock derivatives. An expiry that falls on a
+    holiday moves to the previous session. Lookups of dates outside the span extend it first."""
+
+    Monthly = "monthly"
+    Weekly = "weekly"
+
+    _calendars: dict = {}
+
+    def get(cycle: str = "monthly", weekday: int = calendar.THURSDAY):
+        """The expiry calendar of `cycle`, rebuilt when the trading calendar changes"""
+        trading_calendar = TradingCalendar.get()
+        key = (cycle, weekday)
+        expiry_calendar = ExpiryCalendar._calendars.get(key)
+        if expiry_calendar is None or expiry_calendar.trading_calendar is not trading_calendar:
+            expiry_calendar = ExpiryCalendar(trading_calendar, cycle, weekday)
+            ExpiryCalendar._calendars[key] = expiry_calendar
+        return expiry_calendar
+
+    def __init__(self, trading_calendar: TradingCalendar, cycle: str = "monthly", weekday: int = calendar.THURSDAY):
+        if cycle not in [ExpiryCalendar.Monthly, ExpiryCalendar.Weekly]:
+            raise ValueError(f"Unknown expiry cycle {cycle}")
+        self.trading_calendar = trading_calendar
+        self.cycle = cycle
+        self.weekday = weekday
+        self.first_day = np.datetime64(TradingCalendar.first_day, "D")
+        self.last_day = np.datetime64(TradingCalendar.last_day, "D")
+        self.expiries = self.get_expiries_between(self.first_day, self.last_day)
+
+    def get_expiries_between(self, first_day: np.datetime64, last_day: np.datetime64) -> np.ndarray:
+        days = np.arange(first_day, last_day + 1)
+        # 1970-01-01, day 0, was a Thursday
+        weekdays = days[(days.astype("int64") + calendar.THURSDAY) % 7 == self.weekday]
+        if self.cycle == ExpiryCalendar.Monthly:
+            weekdays = weekdays[(weekdays + 7).astype("datetime64[M]") != weekdays.astype("datetime64[M]")]
+        return np.unique(self.trading_calendar.previous_open(weekdays))
+
+    def cover(self, dates) -> np.ndarray:
+        """The days of `dates`, after extending the expiries to a year around them"""
+        days = TradingCalendar.to_days(dates)
+        first_day, last_day = get_span(days, np.timedelta64(366, "D"))
+        if first_day is not None and (first_day < self.first_day or last_day > self.last_day):
+            first_day, last_day = min(first_day, self.first_day), max(last_day, self.last_day)
+            self.expiries = self.get_expiries_between(first_day, last_day)
+            self.first_day, self.last_day = first_day, last_day
+        return days
+
+    def next_expiry(self, dates, include_this: bool = True):
+        """The first expiry on or after (`include_this`) or strictly after each date"""
+        days = self.cover(dates)
+        return self.expiries[self.expiries.searchsorted(days, side="left" if include_this else "right")]
+
+    def previous_expiry(self, dates, include_this: bool = True):
+        """The last expiry on or before (`include_this`) or strictly before each date"""
+        days = self.cover(dates)
+        return self.expiries[self.expiries.searchsorted(days, side="right" if include_this else "left") - 1]
+
+    def expiries_in_range(self, from_date, to_date) -> pd.DatetimeIndex:
+        start = self.expiries.searchsorted(self.cover(from_date), side="left")
+        end = self.expiries.searchsorted(self.cover(to_date), side="right")
+        return pd.DatetimeIndex(self.expiries[start:end].astype("datetime64[ns]"))
+
+    def map_next_expiry(self, dates: pd.Series) -> pd.Series:
+        """Next expiry on or after each value of a Date column, aligned with its index"""
+        return pd.Series(self.next_expiry(dates).astype("datetime64[ns]"), index=dates.index, name=dates.name)
+
+
 class MarketDaysHelper:
     def is_open_for_day(for_date):
-        day = for_date.strftime("%A")
-        if hasattr(for_date, "date"):
-            for_date = for_date.date()
-        return not (day in Weekends or for_date in MarketDaysSettings.MarketHolidays)
+        return bool(TradingCalendar.get().is_open(for_date))
+
+    def move_to(for_date, session):
+        """`for_date` moved to `session`, keeping its type and time of day"""
+        return for_date + pd.Timedelta(days=int((session - TradingCalendar.to_days(for_date)) // np.timedelta64(1, "D")))
 
     def get_this_or_next_market_day(for_date):
-        current_date = for_date
-        i = 1
-        while i < 5:
-            if not MarketDaysHelper.is_open_for_day(current_date):
-                current_date = current_date + pd.Timedelta(days=1)
-            else:
-                return current_date
-            i = i + 1
-        return current_date
+        return MarketDaysHelper.move_to(for_date, TradingCalendar.get().next_open(for_date))
 
     def get_next_market_day(for_date):
-        current_date = for_date + pd.Timedelta(days=1)
-        i = 1
-        while i < 5:
-            if not MarketDaysHelper.is_open_for_day(current_date):
-                current_date = current_date + pd.Timedelta(days=1)
-            else:
-                return current_date
-            i = i + 1
-        return current_date
+        return MarketDaysHelper.move_to(for_date, TradingCalendar.get().next_open(for_date, include_this=False))
 
     def get_this_or_previous_market_day(for_date):
-        current_date = for_date
-        i = 1
-        while i < 5:
-            if not MarketDaysHelper.is_open_for_day(current_date):
-                current_date = current_date - pd.Timedelta(days=1)
-            else:
-                return current_date
-            i = i + 1
-        return current_date
+        return MarketDaysHelper.move_to(for_date, TradingCalendar.get().previous_open(for_date))
 
     def get_previous_market_day(for_date):
-        current_date = for_date - pd.Timedelta(days=1)
-        i = 1
-        while i < 5:
-            if not MarketDaysHelper.is_open_for_day(current_date):
-                current_date = current_date - pd.Timedelta(days=1)
-            else:
-                return current_date
-            i = i + 1
-        return current_date
+        return MarketDaysHelper.move_to(for_date, TradingCalendar.get().previous_open(for_date, include_this=False))
 
     def get_days_list_for_range(from_date, to_date):
         return pd.date_range(from_date, to_date, freq="B").tolist()
 
+    def get_market_days_list_for_range(from_date, to_date):
+        return TradingCalendar.get().sessions_in_range(from_date, to_date).tolist()
+
     def get_monthly_expiry_dates(no_of_recent_expiries):
-        expiries = []
         today = date.today()
-        for i in range(1, no_of_recent_expiries):
-            cur_month = date(today.year, today.month, 1) - relativedelta(months=i)
-            monthly_expiry = MarketDaysHelper.get_this_or_previous_market_day(
-                MarketDaysHelper.get_last_thursday(cur_month.year, cur_month.month)
-            )
-            expiries.append(monthly_expiry)
-        return expiries
+        months = [date(today.year, today.month, 1) - relativedelta(months=i) for i in range(1, no_of_recent_expiries)]
+        if len(months) == 0:
+            return []
+        return [expiry.date() for expiry in pd.DatetimeIndex(ExpiryCalendar.get().next_expiry(months))]
 
     def get_last_thursday(year, month):
         cal = calendar.Calendar(firstweekday=calendar.MONDAY)
@@ -177,25 +323,110 @@ class MarketDaysHelper:
 
 
 class FilterCriteria:
+    """Condition on one column. `condition` is a comparison operator, "in" / "not in" with a list
+    of values, or "between" with a (low, high) pair, both included. String values are python
+    literals as written in DataFrame.query, e.g. "'TCS'". Other strings, such as column references
+    or expressions, are evaluated by DataFrame.query."""
+
     _col_to_filter: str = None
     _condition: str = None
     _condition_value = None
 
+    comparisons = {
+        "==": operator.eq,
+        "!=": operator.ne,
+        "<": operator.lt,
+        "<=": operator.le,
+        ">": operator.gt,
+        ">=": operator.ge,
+    }
+
     def __init__(
         self, col_to_filter: str = None, condition: str = None, condition_value = None
     ):
         self._col_to_filter = col_to_filter
         self._condition = condition
         self._condition_value = condition_value
+        self._typed_values = {}
 
     def __str__(self) -> str:
         return self.get_query()
 
     def get_query(self) -> str:
+        if self._condition == "between":
+            low, high = self.get_value()
+            return f"(`{self._col_to_filter}` >= {low!r} & `{self._col_to_filter}` <= {high!r})"
         return f"`{self._col_to_filter}` {self._condition} {self._condition_value}"
 
+    def get_column(self) -> str:
+        return self._col_to_filter
+
+    def get_condition(self) -> str:
+        return self._condition
+
+    def with_column(self, col_to_filter: str):
+        return FilterCriteria(col_to_filter, self._condition, self._condition_value)
+
+    def get_value(self):
+        if isinstance(self._condition_value, str):
+            return literal_eval(self._condition_value)
+        return self._condition_value
+
+    def is_literal(self) -> bool:
+        """False for values only DataFrame.query can evaluate, e.g. "`Close` * 2" or "@threshold" """
+        if not isinstance(self._condition_value, str):
+            return True
+        try:
+            literal_eval(self._condition_value)
+            return True
+        except (ValueError, SyntaxError):
+            return False
+
+    def get_key(self) -> tuple:
+        """Hashable form of the criteria, equal for criteria selecting the same rows"""
+        if not self.is_literal():
+            return (self._col_to_filter, self._condition, self._condition_value)
+
+        value = self.get_value()
+        if self._condition in ["in", "not in"]:
+            value = tuple(sorted(set(value), key=repr))
+        elif self._condition == "between":
+            value = tuple(value)
+        return (self._col_to_filter, self._condition, value)
+
+    def get_typed_value(self, dtype):
+        """The value converted once, e.g. date strings to Timestamps for datetime columns. Keyed on
+        whether the column holds dates only, as categorical dtypes differ with every frame."""
+        is_datetime = pd.api.types.is_datetime64_any_dtype(dtype)
+        if is_datetime not in self._typed_values:
+            value = self.get_value()
+            if is_datetime:
+                value = [pd.Timestamp(item) for item in value] if isinstance(value, (list, tuple, set)) else pd.Timestamp(value)
+            self._typed_values[is_datetime] = value
+        return self._typed_values[is_datetime]
+
+    def get_mask(self, data: pd.DataFrame) -> np.ndarray:
+        if not self.is_literal():
+            return data.eval(self.get_query()).to_numpy(dtype=bool, na_value=False)
+
+        column = data[self._col_to_filter]
+        value = self.get_typed_value(column.dtype)
+        if self._condition in FilterCriteria.comparisons:
+            mask = FilterCriteria.comparisons[self._condition](column, value)
+        elif self._condition in ["in", "not in"]:
+            mask = column.isin(list(value))
+            if self._condition == "not in":
+                mask = ~mask
+        elif self._condition == "between":
+            mask = column.between(value[0], value[1])
+        else:
+            raise ValueError(f"Unsupported filter condition {self._condition}")
+        return mask.to_numpy(dtype=bool, na_value=False)
+
 
 class FilterBase:
+    """Criteria combined with &. Applied to a frame as one vectorised mask per criteria."""
+
     _filter_criterias: [FilterCriteria]
 
     def __init__(self):
@@ -210,6 +441,34 @@ class FilterBase:
     def get_query(self) -> str:
         return " & ".join([f"{k.get_query()}" for k in self._filter_criterias])
 
+    def get_criterias(self) -> list[FilterCriteria]:
+        return self._filter_criterias
+
+    def get_key(self) -> tuple:
+        """Hashable form of the filter, independent of the order of its criteria, usable as a cache key"""
+        return tuple(sorted({criteria.get_key() for criteria in self._filter_criterias}, key=repr))
+
+    def get_mask(self, data: pd.DataFrame) -> np.ndarray:
+        mask = np.ones(len(data), dtype=bool)
+        for criteria in self._filter_criterias:
+            mask &= criteria.get_mask(data)
+        return mask
+
+    def apply(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Rows of `data` matching every criteria"""
+        if len(self._filter_criterias) == 0:
+            return data
+        if not all(criteria.is_literal() for criteria in self._filter_criterias):
+            return data.query(self.get_query())
+        return data[self.get_mask(data)]
+
+    def get_equals_value(self, col_name: str):
+        """Value `col_name` is compared to with ==, or None when the filter has no such criteria"""
+        for criteria in self._filter_criterias:
+            if criteria._col_to_filter == col_name and criteria._condition == "==" and criteria.is_literal():
+                return criteria.get_value()
+        return None
+
     def __and__(self, other: object):
         new_filter = FilterBase()
         for criteria in self._filter_criterias:
@@ -7,15 +7,25 @@ class EnvironmentSettings:
         "RawDataDir": "raw",
         "ProcessedDataDir": "processed",
         "HistoricalDataDir": "historical",
+        "PartitionsDataDir": "partitions",
+        "CacheDataDir": "cache",
         "MonthlySuffix": "monthly",
         "AnnualSuffix": "annual",
         "BhavDataDir": "bhavcopy",
         "NseDerivativesDataDir": "nse_derivatives",
         "NseIndicesDataDir": "nse_indices",
+        "ManifestsDataDir": "manifests",
         "ManualDataDir": "manual_data",
         "ManualDataPath": "../manual_data",
     }
+    Urls = {
+        "NseArchivesUrl": "https://archives.nseindia.com",
+    }
     Development = {"InstrumentationLevel": 1 | 2 | 4}
+    Caches = {
+        # per process, parse pools hold one cache in each worker
+        "ParsedFileCacheMB": int(os.environ.get("MARKETS_INSIGHTS_PARSED_FILE_CACHE_MB", 128)),
+    }
 
 
 class Environment:
@@ -37,11 +47,12 @@ class Environment:
             if not os.path.exists(cur_path):
                 os.mkdir(cur_path)
 
-        for folder in ["BhavDataDir", "NseIndicesDataDir", "NseDerivativesDataDir"]:
+        for folder in ["BhavDataDir", "NseIndicesDataDir", "NseDerivativesDataDir", "ManifestsDataDir"]:
             cur_path = f"{env_paths['DataBaseDir']}/{env_paths['RawDataDir']}/{env_paths[folder]}"
             if not os.path.exists(cur_path):
                 os.mkdir(cur_path)
 
-        cur_path = f"{env_paths['DataBaseDir']}/{env_paths['ProcessedDataDir']}/{env_paths['HistoricalDataDir']}"
-        if not os.path.exists(cur_path):
-            os.mkdir(cur_path)
+        for folder in ["HistoricalDataDir", "PartitionsDataDir", "CacheDataDir"]:
+            cur_path = f"{env_paths['DataBaseDir']}/{env_paths['ProcessedDataDir']}/{env_paths[folder]}"
+            if not os.path.exists(cur_path):
+                os.mkdir(cur_path)
@@ -176,6 +176,9 @@ class MultiDataCalculationPipelines:
     def get_calculation_window(self) -> CalculationWindow:
         return CalculationWindow.load_from_list([self._store[key].get_calculation_window() for key in self._store])
 
+    def get_required_columns(self) -> list[str]:
+        return list(dict.fromkeys(column for key in self._store for column in self._store[key].get_required_columns()))
+
 class HistoricalDataset:
     _daily: pd.DataFrame = None
     _identifier_grouped: pd.core.groupby.DataFrameGroupBy = None
@@ -199,7 +202,7 @@ class HistoricalDataset:
         return self
 
     def create_grouped_data(self, columns):
-        return self._daily.groupby(columns)
+        return self._daily.groupby(columns, observed=True)
 
     def get_identifier_grouped(self):
         return self._identifier_grouped
@@ -234,7 +237,7 @@ class HistoricalDataProcessor(DataProcessor):
         self.annual_group_data_filename = Template("$ReaderName-$AnnualSuffix.csv")
         self.historic_highs_reset_days = 60
         self.dataset: HistoricalDataset
-        self.calculation_pipelines: MultiDataCalculationPipelines
+        self.calculation_pipelines: MultiDataCalculationPipelines = None
         self.options = options
 
     def set_calculation_pipelines(self, pipelines):
@@ -251,11 +254,15 @@ class HistoricalDataProcessor(DataProcessor):
         from_date = MarketDaysHelper.get_this_or_next_market_day(criteria.from_date)
         to_date = MarketDaysHelper.get_this_or_previous_market_day(criteria.to_date)
 
-        daily_data = pd.DataFrame(self.get_data(reader, from_date, to_date).drop_duplicates())
+        previous_projections = self.set_reader_projection(reader)
+        try:
+            daily_data = pd.DataFrame(self.get_data(reader, from_date, to_date).drop_duplicates())
+        finally:
+            DataReader.restore_projections(previous_projections)
 
         if not daily_data.empty:
             if reader.filter:
-                daily_data = pd.DataFrame(daily_data.query(reader.filter.get_query()))
+                daily_data = pd.DataFrame(reader.filter.apply(daily_data))
 
             self.dataset = HistoricalDataset()
             self.dataset.set_daily_data(daily_data)
@@ -283,12 +290,78 @@ class HistoricalDataProcessor(DataProcessor):
         return self.dataset
     
 
+    def process_in_batches(
+        self, reader: DataReader, criteria: DateRangeCriteria, batch_sessions: int = 60
+    ):
+        """Yields the daily data of the range in batches of about `batch_sessions` sessions with
+        the calculation pipelines applied. Each batch is calculated together with the trailing
+        and leading sessions the pipelines need, so only a bounded window is held in memory.
+        Recursive indicators such as RSI are seeded from the trailing window of each batch."""
+        from_date = MarketDaysHelper.get_this_or_next_market_day(criteria.from_date)
+        to_date = MarketDaysHelper.get_this_or_previous_market_day(criteria.to_date)
+
+        if self.calculation_pipelines is not None:
+            window = self.calculation_pipelines.get_calculation_window()
+        else:
+            window = CalculationWindow()
+
+        buffer: list[pd.DataFrame] = []
+        buffered_sessions = 0
+        warmup_sessions = 0
+        previous_projections = self.set_reader_projection(reader)
+        try:
+            for data in reader.read_iter(DateRangeCriteria(from_date, to_date)):
+                buffer.append(data)
+                buffered_sessions += data[BaseColumns.Date].nunique()
+                if buffered_sessions >= warmup_sessions + batch_sessions + window.leading:
+                    batch, buffer, warmup_sessions = self.run_batch(buffer, warmup_sessions, window, is_last=False)
+                    buffered_sessions = sum([data[BaseColumns.Date].nunique() for data in buffer])
+                    yield batch
+        finally:
+            DataReader.restore_projections(previous_projections)
+
+        if buffered_sessions > warmup_sessions:
+            batch, buffer, warmup_sessions = self.run_batch(buffer, warmup_sessions, window, is_last=True)
+            yield batch
+
+    def set_reader_projection(self, reader: DataReader) -> list[tuple]:
+        """Limits the columns read by `reader` to the ones the calculation pipelines need.
+        Returns the previous projections of the reader and the readers it wraps."""
+        previous_projections = reader.get_projections()
+        if self.calculation_pipelines is not None:
+            reader.set_projection(self.calculation_pipelines.get_required_columns())
+        return previous_projections
+
+    def run_batch(
+        self, buffer: list[pd.DataFrame], warmup_sessions: int, window: CalculationWindow, is_last: bool
+    ):
+        data = pd.concat(buffer, ignore_index=True)
+        # read_iter normalises each day on its own, the previous close spans the buffer instead
+        data[BaseColumns.PreviousClose] = data.groupby(BaseColumns.Identifier, observed=True)[BaseColumns.Close].shift(1)
+        sessions = data[BaseColumns.Date].drop_duplicates().sort_values().reset_index(drop=True)
+        emit_till = len(sessions) if is_last else len(sessions) - window.leading
+
+        if self.calculation_pipelines is not None:
+            result = self.calculation_pipelines.run(data.copy())
+        else:
+            result = data.copy()
+        batch = result[
+            result[BaseColumns.Date].between(sessions[warmup_sessions], sessions[emit_till - 1])
+        ].reset_index(drop=True)
+
+        # at least the last session is carried, for the previous close of the next batch
+        carry_from = max(0, emit_till - max(window.trailing, 1))
+        if is_last or carry_from >= len(sessions):
+            return batch, [], 0
+        remaining = data[data[BaseColumns.Date] >= sessions[carry_from]]
+        return batch, [remaining], emit_till - carry_from
+
     def add_periodic_growth_calc(
         self, processed_data: pd.DataFrame, period: str
     ) -> pd.DataFrame:
         Instrumentation.debug(f"Started periodic calculation for {period}")
 
-        periodic_grouped = processed_data.groupby([BaseColumns.Identifier, period])
+        periodic_grouped = processed_data.groupby([BaseColumns.Identifier, period], observed=True)
 
         processed_data[
             PeriodAggregateColumnTemplate.substitute(
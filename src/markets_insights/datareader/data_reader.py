@@ -1,9 +1,14 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import hashlib
 import math
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 from attr import dataclass
 import markets_insights as mi
 
-from urllib.request import urlopen
 from zipfile import ZipFile
 from markets_insights.core.column_definition import (
     BaseColumns,
@@ -11,8 +16,16 @@ from markets_insights.core.column_definition import (
     DerivativesBaseColumns,
 )
 from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader.disk_cache import DiskCacheStore
+from markets_insights.datareader.download_client import DownloadClient, get_default_client
+from markets_insights.datareader.file_lock import atomic_directory, locked_path
+from markets_insights.datareader.manifest import FailedDates, ReaderManifest
+from markets_insights.datareader.parsed_file_cache import parsed_file_cache
+from markets_insights.datareader.partition_store import MonthlyPartitionStore
+from markets_insights.datareader.schema import ReaderSchema, concat_categories
 import os
 from string import Template
+import numpy as np
 import pandas as pd
 from urllib.error import HTTPError
 from datetime import date, timedelta
@@ -22,6 +35,7 @@ from markets_insights.core.core import (
     InstrumentTypeFilter,
     MarketDaysHelper,
     Instrumentation,
+    TradingCalendar,
     TypeHelper,
 )
 
@@ -33,6 +47,12 @@ class Status(Enum):
     UKNOWN: int = 3
 
 
+class FetchStatus(Enum):
+    NOT_FETCHED: int = 0
+    FETCHED: int = 1
+    UNAVAILABLE: int = 2
+
+
 class ReaderDateCriteria:
     pass
 
@@ -76,15 +96,81 @@ class ReaderOptions:
     unzip_path_template = Template("")
     primary_data_path_template = Template("")
     unzip_file: bool = True
+    extract_zip: bool = False  # extract downloaded archives to disk instead of reading the csv inside them
     data_availability: list [DateRangeCriteria] = None
     download_timeout = 5  # seconds
+    download_client: DownloadClient = None  # shared default client when not set
+    max_concurrent_downloads: int = 1  # files fetched in parallel by range readers
+    max_concurrent_gap_reads: int = 1  # ranges missing from a chained reader read in parallel
+    max_concurrent_leaf_reads: int = 1  # readers of an arithmetic expression read in parallel
+    parse_processes: int = 1  # processes range readers parse daily files in, requires pyarrow when above 1
+    parse_pool: ProcessPoolExecutor = None  # pool the parse processes run in, a pool shared by the readers when not set
     col_prefix = None
+    source_name: str = None  # name shared by readers parsing the same raw files, defaults to reader name
+    read_chunk_rows: int = None  # parse csv files in chunks of this many rows, filtering each chunk
+    compact_numerics: bool = False  # downcast the numeric columns of the schema to float32 and the smallest int type
+    failed_date_expiry = timedelta(days=30)  # how long range readers skip a date the source does not have
+    recent_failed_date_expiry = timedelta(hours=1)  # for recent dates and transient errors, e.g. files not yet published
+
+    def __getstate__(self):
+        # the pool belongs to the process that created it, the readers sent to its processes go without it
+        return {name: value for name, value in self.__dict__.items() if name != "parse_pool"}
 
 @dataclass
 class ReaderRescaleOptions:
     volume_scale: int = 1
     turnover_scale: int = 1
 
+def is_plain_number(values: pd.Series) -> pd.Series:
+    """Vectorised form of `str(val).replace(".", "").isnumeric()`: True for values written
+    with digits and dots only, i.e. not missing, not negative and not in exponent notation"""
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return pd.Series(False, index=values.index)
+    elif pd.api.types.is_integer_dtype(values.dtype):
+        return (values >= 0).fillna(False).astype(bool)
+    elif pd.api.types.is_float_dtype(values.dtype):
+        numbers = values.to_numpy(dtype=float, na_value=np.nan)
+        # str() switches to exponent notation below 1e-4 and from 1e16 onwards
+        plain = (numbers == 0) | ((numbers >= 1e-4) & (numbers < 1e16))
+        return pd.Series(plain & ~np.signbit(numbers), index=values.index)
+    else:
+        as_text = np.asarray(values, dtype=object).astype(str)
+        return pd.Series(np.char.isnumeric(np.char.replace(as_text, ".", "")), index=values.index)
+
+
+# columns whose values are rewritten by normalise_base_column_values, filters on them wait for normalisation
+normalised_value_columns = [
+    BaseColumns.Open,
+    BaseColumns.High,
+    BaseColumns.Low,
+    BaseColumns.PreviousClose,
+    BaseColumns.Volume,
+    BaseColumns.Turnover,
+]
+
+# operators that can be evaluated while reading a parquet partition
+partition_filter_operators = ["==", "!=", "<", "<=", ">", ">=", "in", "not in"]
+
+base_schema = ReaderSchema(
+    categories=[BaseColumns.Identifier],
+    numerics=[
+        BaseColumns.Open,
+        BaseColumns.High,
+        BaseColumns.Low,
+        BaseColumns.Close,
+        BaseColumns.PreviousClose,
+        BaseColumns.Volume,
+        BaseColumns.Turnover,
+    ],
+)
+
+derivatives_schema = base_schema.extend(
+    categories=[DerivativesBaseColumns.InstrumentType, DerivativesBaseColumns.OptionType],
+    dates={DerivativesBaseColumns.ExpiryDate: "%Y-%m-%d"},
+    numerics=[DerivativesBaseColumns.StrikePrice, DerivativesBaseColumns.OpenInterest, DerivativesBaseColumns.OiChangePct],
+)
+
+
 def get_safe_min_date(for_date) -> date:
     return for_date if for_date is not None else date(1900, 1, 1)
 
@@ -95,12 +181,14 @@ def get_safe_max_date(for_date) -> date:
 
 class DataReader:
     options: ReaderOptions
+    plan_key_by_value: bool = False  # set by readers fully described by their name, source, prefix, filter and projection
 
     def __init__(self):
         self.options: ReaderOptions = ReaderOptions()
         self.rescale_options: ReaderRescaleOptions = ReaderRescaleOptions()
         self.name: str = ""
         self.filter: FilterBase = None
+        self.projection: list[str] = None
 
     def merge_intervals(intervals: list[DateRangeCriteria]) -> list[DateRangeCriteria]:
         merged_ranges: list[DateRangeCriteria] = []
@@ -121,27 +209,32 @@ class DataReader:
         return merged_ranges
 
     def has_data_for_range(data_availability: list[DateRangeCriteria], criteria: DateRangeCriteria):
-        read_criteria = DateRangeCriteria(MarketDaysHelper.get_this_or_next_market_day(criteria.from_date), MarketDaysHelper.get_this_or_previous_market_day(criteria.to_date))
-
         data_availability = DataReader.merge_intervals(data_availability)
+        return DataReader.has_data_for_merged_ranges(
+            [interval.from_date for interval in data_availability],
+            [interval.to_date for interval in data_availability],
+            criteria,
+        )
+
+    def has_data_for_merged_ranges(range_starts: list[date], range_ends: list[date], criteria: DateRangeCriteria):
+        """Availability of `criteria` within sorted, non overlapping ranges given as parallel lists
+        of start and end dates. Ranges outside the criteria are skipped by bisection."""
+        read_criteria = DateRangeCriteria(MarketDaysHelper.get_this_or_next_market_day(criteria.from_date), MarketDaysHelper.get_this_or_previous_market_day(criteria.to_date))
 
         availability_ranges = []
         unavailability_ranges = []
         last_date_processed = read_criteria.from_date - timedelta(days=1)
-        
-        for interval in data_availability:
-            if interval.from_date > read_criteria.to_date:
-                break
-            if interval.to_date < read_criteria.from_date:
-                continue
-            
-            if interval.from_date > last_date_processed + timedelta(days=1):
-                unavailability_ranges.append(DateRangeCriteria(last_date_processed + timedelta(days=1), interval.from_date - timedelta(days=1)))
-            
-            start_date = max(interval.from_date, read_criteria.from_date)
-            end_date = min(interval.to_date, read_criteria.to_date)
+
+        first_index = bisect_left(range_ends, read_criteria.from_date)
+        last_index = bisect_right(range_starts, read_criteria.to_date)
+        for from_date, to_date in zip(range_starts[first_index:last_index], range_ends[first_index:last_index]):
+            if from_date > last_date_processed + timedelta(days=1):
+                unavailability_ranges.append(DateRangeCriteria(last_date_processed + timedelta(days=1), from_date - timedelta(days=1)))
+
+            start_date = max(from_date, read_criteria.from_date)
+            end_date = min(to_date, read_criteria.to_date)
             availability_ranges.append(DateRangeCriteria(start_date, end_date))
-            last_date_processed = max(last_date_processed, interval.to_date)
+            last_date_processed = max(last_date_processed, to_date)
 
         if last_date_processed < read_criteria.to_date:
             unavailability_ranges.append(DateRangeCriteria(last_date_processed + timedelta(days=1), read_criteria.to_date))
@@ -170,10 +263,126 @@ class DataReader:
         else:
             return ReaderDataAvailabilityStatus(status=Status.UKNOWN)        
 
+    def get_manifest(self) -> ReaderManifest:
+        return ReaderManifest.for_source(self.get_source_name())
+
+    def get_failed_dates(self) -> FailedDates:
+        return FailedDates.for_source(self.get_source_name())
+
+    def get_fetch_status(self, for_date: date) -> FetchStatus:
+        if isinstance(self, SingleDaySourceDataReader):
+            if self.get_manifest().has(for_date):
+                return FetchStatus.FETCHED
+            elif self.get_failed_dates().has(for_date):
+                return FetchStatus.UNAVAILABLE
+        return FetchStatus.NOT_FETCHED
+
+    def record_failed_date(self, for_date: date, error: Exception):
+        if not isinstance(self, SingleDaySourceDataReader):
+            return
+
+        # only the source answering 404 means the date is not published, local I/O errors are transient
+        is_missing = isinstance(error, HTTPError) and error.code == 404
+        is_recent = pd.Timestamp(for_date).date() >= date.today() - timedelta(days=7)
+        if is_missing and not is_recent:
+            expiry = self.options.failed_date_expiry
+        else:
+            expiry = self.options.recent_failed_date_expiry
+        self.get_failed_dates().record(for_date, f"{type(error).__name__}: {error}", expiry)
+
+    def clear_failed_dates(self, criteria: DateRangeCriteria = None):
+        """Forgets the failed dates within `criteria`, or all of them, so that range readers retry them"""
+        if criteria is None:
+            self.get_failed_dates().clear()
+        else:
+            self.get_failed_dates().clear(criteria.from_date, criteria.to_date)
+
+    def has_local_data(self, criteria: ReaderDateCriteria) -> ReaderDataAvailabilityStatus:
+        """Availability of `criteria` in the files already fetched, as recorded in the manifest"""
+        if not isinstance(self, SingleDaySourceDataReader):
+            return ReaderDataAvailabilityStatus(status=Status.UKNOWN)
+
+        if isinstance(criteria, ForDateCriteria):
+            if self.get_fetch_status(criteria.for_date) == FetchStatus.FETCHED:
+                return ReaderDataAvailabilityStatus(status=Status.COMPLETE, availability_ranges=[DateRangeCriteria(criteria.for_date, criteria.for_date)])
+            return ReaderDataAvailabilityStatus(status=Status.NONE)
+        elif isinstance(criteria, DateRangeCriteria):
+            manifest = self.get_manifest()
+            return DataReader.has_data_for_merged_ranges(manifest.range_starts, manifest.range_ends, criteria)
+        else:
+            return ReaderDataAvailabilityStatus(status=Status.UKNOWN)
+
+    def record_fetched(self, for_date: date, data_file_path, data: pd.DataFrame):
+        if not isinstance(self, SingleDaySourceDataReader) or not isinstance(data_file_path, str):
+            return
+
+        manifest = self.get_manifest()
+        if not manifest.has(for_date) and os.path.exists(data_file_path):
+            manifest.record(for_date, len(data), os.path.getsize(data_file_path))
+
     def set_filter(self, filter: FilterBase):
         self.filter = filter
         return self
 
+    def get_plan_key(self) -> tuple:
+        """Identifies the nodes of an arithmetic expression, so that a reader used several times in
+        the expression is read once. Readers are told apart by identity unless `plan_key_by_value`
+        is set, in which case equal readers built separately are also read once."""
+        if not self.plan_key_by_value:
+            return (type(self), id(self))
+        return (
+            type(self),
+            self.name,
+            self.get_source_name(),
+            self.options.col_prefix,
+            self.filter.get_key() if self.filter else None,
+            tuple(self.projection) if self.projection is not None else None,
+        )
+
+    def set_projection(self, columns: list[str]):
+        """Limits the columns read from the source to `columns`, besides the base, derivatives and filter
+        columns the reader always needs. None reads every column."""
+        self.projection = columns
+        return self
+
+    def get_projections(self) -> list[tuple]:
+        """Projections of this reader and of the readers it wraps, for restore_projections"""
+        projections = [(self, self.projection)]
+        for reader in vars(self).values():
+            if isinstance(reader, DataReader):
+                projections += reader.get_projections()
+        return projections
+
+    def restore_projections(projections: list[tuple]):
+        """Sets back the projections returned by get_projections, without cascading to wrapped readers"""
+        for reader, projection in projections:
+            reader.projection = projection
+
+    def get_projected_columns(self) -> list[str]:
+        if self.projection is None:
+            return None
+
+        columns = TypeHelper.get_class_static_values(DerivativesBaseColumns) + self.get_reader_columns()
+        if self.filter:
+            columns += [criteria.get_column() for criteria in self.filter.get_criterias()]
+        return list(dict.fromkeys(columns + list(self.projection)))
+
+    def get_source_columns(self) -> set[str]:
+        """Names of the source columns to parse for the projection, or None for all columns"""
+        columns = self.get_projected_columns()
+        if columns is None:
+            return None
+
+        source_columns = set(columns)
+        for source_column, column in (self.get_column_name_mappings() or {}).items():
+            if column in columns:
+                source_columns.add(source_column)
+        return source_columns
+
+    def get_reader_columns(self) -> list[str]:
+        """Source columns used by sanitize_data besides the base columns"""
+        return []
+
     def get_date_parts(self, for_date: date):
         return {
             "year": str(for_date.year),
@@ -201,27 +410,176 @@ class DataReader:
         return merged_df
 
     def read(self, criteria: ReaderDateCriteria) -> pd.DataFrame:
+        data = self.read_partition_data(criteria.for_date)
+        if data is not None:
+            return self.filter_data(data)
+
         data = self.read_data(criteria.for_date)
         return self.post_read_data(data)
+
+    def read_iter(self, criteria: ReaderDateCriteria):
+        """Yields the data for `criteria` as per-day (or per-chunk) frames in date order so
+        that long ranges can be consumed without holding the full result in memory"""
+        if isinstance(criteria, ForDateCriteria):
+            data = self.read(criteria)
+            if not (data is None or data.empty):
+                yield data
+        else:
+            yield from get_date_criteria_based_reader(self, criteria).read_iter(criteria)
     
     def post_read_data(self, data: pd.DataFrame) -> pd.DataFrame:
         if not (data is None or data.empty):
-            column_name_mappings = self.get_column_name_mappings()
-            if column_name_mappings is not None:
-                data.rename(columns=column_name_mappings, inplace=True)
+            return self.filter_data(self.normalise_data(self.filter_source_data(data)))
+        else:
+            return data
 
-            data.drop_duplicates(inplace=True)
+    def get_source_filter(self, columns) -> FilterBase:
+        """Criteria of the filter that can be evaluated before normalisation, renamed to the
+        source `columns` with the reversed column name mappings"""
+        if not self.filter:
+            return None
+
+        source_columns = {v: k for k, v in (self.get_column_name_mappings() or {}).items()}
+        source_filter = FilterBase()
+        for criteria in self.filter.get_criterias():
+            source_column = source_columns.get(criteria.get_column(), criteria.get_column())
+            # values evaluated by DataFrame.query may refer to the normalised columns
+            if criteria.get_column() not in normalised_value_columns and source_column in columns and criteria.is_literal():
+                source_filter.add_criteria(criteria.with_column(source_column))
+        return source_filter if source_filter.get_criterias() else None
+
+    def filter_source_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        source_filter = self.get_source_filter(data.columns)
+        if source_filter:
+            data = data[source_filter.get_mask(self.parse_filter_dates(data, source_filter, source_columns=True))]
+        return data
 
-            self.normalise_base_column_values(data)
-            
-            if self.filter:
-                data = data.query(str(self.filter))
+    def parse_filter_dates(self, data: pd.DataFrame, filter: FilterBase, source_columns: bool = False) -> pd.DataFrame:
+        """`data` with the date columns compared by `filter` parsed as the schema parses them, so
+        that date criteria select the same rows before and after the schema is applied"""
+        date_formats = self.get_schema().dates
+        if source_columns:
+            date_formats = {
+                **date_formats,
+                **{
+                    source_column: date_formats[column]
+                    for source_column, column in (self.get_column_name_mappings() or {}).items()
+                    if column in date_formats
+                },
+            }
+        parsed_dates = {
+            column: pd.to_datetime(data[column], format=date_formats[column])
+            for column in {criteria.get_column() for criteria in filter.get_criterias()}
+            if column in date_formats and column in data.columns and not pd.api.types.is_datetime64_any_dtype(data[column].dtype)
+        }
+        return data.assign(**parsed_dates) if parsed_dates else data
+
+    def get_partition_filters(self) -> list[tuple]:
+        if not self.filter:
+            return None
+
+        return [
+            # keys are hashable, partitions are cached per filters
+            criteria.get_key()
+            for criteria in self.filter.get_criterias()
+            if criteria.get_condition() in partition_filter_operators
+            and criteria.is_literal()
+            # partitions are read date by date already, and date values are only typed by filter_data
+            and criteria.get_column() != BaseColumns.Date
+            and criteria.get_column() not in self.get_schema().dates
+        ] or None
+
+    def normalise_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        # raw frames may be shared through the parsed file cache, so they are never modified in place
+        column_name_mappings = self.get_column_name_mappings()
+        if column_name_mappings is not None:
+            data = data.rename(columns=column_name_mappings)
 
-            return self.sanitize_data(data)
-        else:
-            return data
+        data = data.drop_duplicates()
+
+        self.normalise_base_column_values(data)
+        return data
+
+    def filter_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        if self.filter:
+            data = data[self.filter.get_mask(self.parse_filter_dates(data, self.filter))]
+
+        return self.apply_schema(self.sanitize_data(data))
+
+    def get_schema(self) -> ReaderSchema:
+        return base_schema
+
+    def apply_schema(self, data: pd.DataFrame) -> pd.DataFrame:
+        # applied after sanitize_data, which may rewrite values of categorical columns
+        return self.get_schema().apply(data, self.options.compact_numerics)
+
+    def get_source_name(self) -> str:
+        return self.options.source_name or self.name
+
+    def get_partition_store(self) -> MonthlyPartitionStore:
+        return MonthlyPartitionStore(self.get_source_name())
+
+    def read_partition_data(self, for_date: date) -> pd.DataFrame:
+        """Returns the normalised data of `for_date` from the monthly partitions written by compact(),
+        or None when the date has not been compacted"""
+        if not isinstance(self, SingleDaySourceDataReader):
+            return None
+        return self.get_partition_store().read(for_date, self.get_partition_filters(), self.get_projected_columns())
+
+    def compact(self, criteria: DateRangeCriteria) -> list[str]:
+        """Converts the raw daily files of every month in the range into one parquet partition per
+        month holding the normalised, unfiltered data. Later reads of those days are served from the
+        partitions. Returns the paths written."""
+        store = self.get_partition_store()
+        partition_paths = []
+        month_start = date(criteria.from_date.year, criteria.from_date.month, 1)
+        while month_start <= criteria.to_date:
+            month_end = min(
+                (pd.Timestamp(month_start) + pd.offsets.MonthEnd(1)).date(), date.today()
+            )
+            frames = []
+            for for_date in MarketDaysHelper.get_market_days_list_for_range(month_start, month_end):
+                try:
+                    data = self.read_source_data(for_date)
+                    if not (data is None or data.empty):
+                        frames.append(self.normalise_data(data))
+                except Exception as e:
+                    print(e, for_date.strftime("date(%Y, %m, %d),"))
+
+            if len(frames) > 0:
+                Instrumentation.debug(f"Compacting {len(frames)} days of {self.get_source_name()} for {month_start.strftime('%Y-%m')}")
+                partition_paths.append(store.write(month_start, pd.concat(frames, ignore_index=True)))
+            month_start = (pd.Timestamp(month_start) + pd.offsets.MonthBegin(1)).date()
+
+        return partition_paths
 
     def read_data(self, for_date: date) -> pd.DataFrame:
+        return self.read_file_data(for_date, filter_rows=bool(self.filter and self.options.read_chunk_rows))
+
+    def read_file_data(self, for_date: date, filter_rows: bool = False, projected: bool = True) -> pd.DataFrame:
+        data_file_path = self.fetch_data(for_date)
+        read_options = {"filter_rows": True} if filter_rows else {}
+        if not projected and self.projection is not None:
+            read_options["projected"] = False
+        if self.is_read_from_archive():
+            data = self.read_data_from_archive(for_date, data_file_path, **read_options)
+        else:
+            data = self.read_data_from_file(for_date, data_file_path, **read_options)
+
+        self.record_fetched(for_date, data_file_path, data)
+        return data
+
+    def get_download_client(self) -> DownloadClient:
+        return self.options.download_client or get_default_client()
+
+    def read_source_data(self, for_date: date) -> pd.DataFrame:
+        """All rows and columns of the source file of `for_date`, including those of other readers sharing the source"""
+        return self.read_file_data(for_date, projected=False)
+
+    def is_read_from_archive(self) -> bool:
+        return self.options.unzip_file == True and self.options.extract_zip == False
+
+    def fetch_data(self, for_date: date) -> str:
         date_parts = self.get_date_parts(for_date)
         filenames = self.get_filenames(for_date)
         output_file_path = self.options.output_path_template.substitute(
@@ -231,49 +589,51 @@ class DataReader:
             **({**EnvironmentSettings.Paths, **filenames})
         )
 
+        # a date stays in the manifest only as long as its raw file, a deleted file is fetched again
         if not os.path.exists(output_file_path):
-            Instrumentation.debug(f"Downloading data for {for_date.strftime('%Y, %m, %d')}")
-            url = self.options.url_template.substitute(**({**date_parts, **filenames}))
+            if self.get_fetch_status(for_date) == FetchStatus.FETCHED:
+                self.get_manifest().remove(for_date)
+
+            # one download per file across threads and processes, the others wait and find it on disk
+            with locked_path(output_file_path):
+                if not os.path.exists(output_file_path):
+                    Instrumentation.debug(f"Downloading data for {for_date.strftime('%Y, %m, %d')}")
+                    url = self.options.url_template.substitute(**({**EnvironmentSettings.Urls, **date_parts, **filenames}))
 
-            Instrumentation.debug(url)
+                    Instrumentation.debug(url)
 
-            urldata = urlopen(url, timeout=self.options.download_timeout)
-            with open(output_file_path, "wb") as output:
-                output.write(urldata.read())
+                    self.get_download_client().download(url, output_file_path, timeout=self.options.download_timeout)
+
+        if self.is_read_from_archive():
+            return output_file_path
 
         unzip_folder_path = self.options.unzip_path_template.substitute(
             **({**EnvironmentSettings.Paths, **filenames})
         )
         if self.options.unzip_file == True and not os.path.exists(unzip_folder_path):
-            self.unzip_content(output_file_path, unzip_folder_path, for_date)
+            with locked_path(unzip_folder_path):
+                if not os.path.exists(unzip_folder_path):
+                    self.unzip_content(output_file_path, unzip_folder_path, for_date)
 
-        data = self.read_data_from_file(for_date, primary_data_file_path)
-
-        return data
+        return primary_data_file_path
 
     def normalise_base_column_values(self, data: pd.DataFrame) -> pd.DataFrame:
         for col_name in [BaseColumns.Open, BaseColumns.High, BaseColumns.Low]:
-            data[col_name] = data.apply(
-                lambda x: x[col_name]
-                if str(x[col_name]).replace(".", "").isnumeric() == True
-                else x[BaseColumns.Close],
-                axis=1,
+            data[col_name] = (
+                data[col_name]
+                .where(is_plain_number(data[col_name]), data[BaseColumns.Close])
+                .astype(float)
             )
-            data[col_name] = data[col_name].astype(float)
 
         data[BaseColumns.PreviousClose] = data.groupby(
-            BaseColumns.Identifier
-        )[BaseColumns.Close].transform(lambda x: x.shift(1))
+            BaseColumns.Identifier, observed=True
+        )[BaseColumns.Close].shift(1)
 
         for col_name in [BaseColumns.Volume, BaseColumns.Turnover]:
             if col_name in data.columns:
                 data[col_name] = (
                     data[col_name]
-                    .apply(
-                        lambda val: val
-                        if str(val).replace(".", "").isnumeric() == True
-                        else math.nan
-                    )
+                    .where(is_plain_number(data[col_name]), math.nan)
                     .astype(float)
                 )
             else:
@@ -289,12 +649,42 @@ class DataReader:
         return data
 
     def unzip_content(self, output_file_path, unzip_folder_path, for_date):
-        zf = ZipFile(output_file_path)
-        zf.extractall(path=unzip_folder_path)
-        zf.close()
+        with ZipFile(output_file_path) as zf, atomic_directory(unzip_folder_path) as temp_folder_path:
+            zf.extractall(path=temp_folder_path)
+
+    def read_data_from_archive(self, for_date, archive_path, **read_options):
+        primary_data_filename = self.get_filenames(for_date)["primary_data_filename"]
+        with ZipFile(archive_path) as zf:
+            members = zf.namelist()
+            if primary_data_filename not in members:
+                primary_data_filename = next(
+                    (member for member in members if member.lower() == primary_data_filename.lower()),
+                    members[0],
+                )
+            with zf.open(primary_data_filename) as primary_data_file:
+                return self.read_data_from_file(for_date, primary_data_file, **read_options)
+
+    def read_data_from_file(self, for_date, primary_data_filepath, filter_rows: bool = False, projected: bool = True):
+        source_columns = self.get_source_columns() if projected else None
+        if filter_rows and self.options.read_chunk_rows:
+            # rows are filtered chunk by chunk instead of after parsing the whole file
+            chunks = self.parse_data_file(for_date, primary_data_filepath, source_columns, self.options.read_chunk_rows)
+            return concat_frames([self.filter_source_data(chunk) for chunk in chunks])
+
+        primary_data = self.parse_data_file(for_date, primary_data_filepath, source_columns)
+        return self.filter_source_data(primary_data) if filter_rows else primary_data
+
+    def parse_data_file(self, for_date, primary_data_filepath, source_columns: set[str] = None, chunk_rows: int = None):
+        """Parses the csv keeping only `source_columns` when given. Returns an iterator of frames
+        of `chunk_rows` rows when chunk_rows is given."""
+        usecols = (lambda column: column in source_columns) if source_columns is not None else None
+        if chunk_rows:
+            return (
+                chunk.assign(Date=pd.to_datetime(for_date))
+                for chunk in pd.read_csv(primary_data_filepath, usecols=usecols, chunksize=chunk_rows)
+            )
 
-    def read_data_from_file(self, for_date, primary_data_filepath):
-        primary_data = pd.read_csv(primary_data_filepath)
+        primary_data = pd.read_csv(primary_data_filepath, usecols=usecols)
         primary_data["Date"] = pd.to_datetime(for_date)
         return primary_data
 
@@ -337,8 +727,177 @@ def get_date_criteria_based_reader(reader: DataReader, criteria: ReaderDateCrite
         return reader
     
 
+def fetch_in_order(reader: DataReader, datelist: list[date]):
+    """Yields (date, fetch error) in date order while the files are downloaded ahead in a
+    pool of `options.max_concurrent_downloads` workers. Readers not sourced from daily files
+    are yielded as is and fetch on read."""
+    max_workers = reader.options.max_concurrent_downloads
+    if max_workers <= 1 or len(datelist) <= 1 or not isinstance(reader, SingleDaySourceDataReader):
+        for for_date in datelist:
+            yield for_date, None
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{reader.name}-fetch")
+    try:
+        futures = [executor.submit(reader.fetch_data, for_date) for for_date in datelist]
+        for for_date, future in zip(datelist, futures):
+            yield for_date, future.exception()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    if len(frames) == 0:
+        return pd.DataFrame()
+    elif len(frames) == 1:
+        return frames[0]
+    else:
+        return pd.concat(concat_categories(frames), ignore_index=True)
+
+
+def concat_by_date(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates `frames` in date order. Frames that are sorted and cover disjoint dates are
+    concatenated as they are, otherwise the result is sorted by date."""
+    frames = [frame for frame in frames if not (frame is None or frame.empty)]
+    frames.sort(key=lambda frame: frame[BaseColumns.Date].iloc[0])
+    is_ordered = all(frame[BaseColumns.Date].is_monotonic_increasing for frame in frames) and all(
+        previous[BaseColumns.Date].iloc[-1] < frame[BaseColumns.Date].iloc[0] for previous, frame in zip(frames, frames[1:])
+    )
+
+    data = concat_frames(frames)
+    if not is_ordered:
+        data = data.sort_values(BaseColumns.Date, kind="stable", ignore_index=True)
+    return data
+
+
+def iter_for_dates(reader: DataReader, datelist: list[date]):
+    """Reads each date with `reader` and yields the non empty per-day frames in date order.
+    Dates that failed before are skipped until their failure expires."""
+    datelist = [
+        for_date for for_date in datelist if reader.get_fetch_status(for_date) != FetchStatus.UNAVAILABLE
+    ]
+    for for_date, fetch_error in fetch_in_order(reader, datelist):
+        try:
+            if fetch_error is not None:
+                raise fetch_error
+            data = reader.read(ForDateCriteria(for_date))
+        except Exception as e:
+            print(e, for_date.strftime("date(%Y, %m, %d),"))
+            reader.record_failed_date(for_date, e)
+            continue
+
+        if not (data is None or data.empty):
+            yield data
+
+
+def read_for_dates(reader: DataReader, datelist: list[date]) -> pd.DataFrame:
+    """Reads each date with `reader` and assembles the per-day frames with a single concat"""
+    if reader.options.parse_processes > 1 and isinstance(reader, SingleDaySourceDataReader) and len(datelist) > 1:
+        return read_for_dates_in_processes(reader, datelist)
+    return concat_frames(list(iter_for_dates(reader, datelist)))
+
+
+def read_for_dates_in_processes(reader: DataReader, datelist: list[date]) -> pd.DataFrame:
+    """Splits `datelist` into contiguous shards read by a pool of `options.parse_processes` processes.
+    Each process parses, normalises and sanitizes the days of its shard and returns them as one
+    Arrow IPC stream; the shards are reassembled in date order. The dates fetched and failed in the
+    processes are recorded here, so that only this process writes the manifests."""
+    datelist = [
+        for_date for for_date in datelist if reader.get_fetch_status(for_date) != FetchStatus.UNAVAILABLE
+    ]
+    if len(datelist) == 0:
+        return pd.DataFrame()
+
+    processes = min(reader.options.parse_processes, len(datelist))
+    shard_size = math.ceil(len(datelist) / (processes * 4))
+    shards = [datelist[i : i + shard_size] for i in range(0, len(datelist), shard_size)]
+    settings = (dict(EnvironmentSettings.Paths), dict(EnvironmentSettings.Urls), dict(EnvironmentSettings.Caches))
+
+    executor = reader.options.parse_pool or get_parse_pool(reader.options.parse_processes)
+    try:
+        results = list(executor.map(read_shard, [reader] * len(shards), shards, [settings] * len(shards)))
+    except BrokenProcessPool:
+        discard_parse_pool(executor)
+        raise
+
+    frames = []
+    for shard_data, manifest_entries, failed_dates in results:
+        for path, entries in manifest_entries:
+            ReaderManifest.for_path(path).record_entries(entries)
+        for path, entries in failed_dates:
+            FailedDates.for_path(path).record_entries(entries)
+        if shard_data is not None:
+            frames.append(from_ipc_stream(shard_data) if isinstance(shard_data, bytes) else shard_data)
+    return concat_frames(frames)
+
+
+_parse_pools: dict[int, ProcessPoolExecutor] = {}
+_parse_pools_lock = threading.Lock()
+
+
+def get_parse_pool(processes: int) -> ProcessPoolExecutor:
+    """Pool of `processes` parse processes shared by the readers, started on first use"""
+    with _parse_pools_lock:
+        if processes not in _parse_pools:
+            _parse_pools[processes] = ProcessPoolExecutor(max_workers=processes)
+        return _parse_pools[processes]
+
+
+def discard_parse_pool(executor: ProcessPoolExecutor):
+    with _parse_pools_lock:
+        for processes, pool in list(_parse_pools.items()):
+            if pool is executor:
+                del _parse_pools[processes]
+    executor.shutdown(wait=False)
+
+
+def read_shard(reader: DataReader, datelist: list[date], settings: tuple) -> tuple:
+    """Reads the days of a shard in a parse process. Returns the data as an Arrow IPC stream, or as
+    the frame itself when Arrow cannot convert it, with the manifest and failed date records made."""
+    paths, urls, caches = settings
+    EnvironmentSettings.Paths.update(paths)
+    EnvironmentSettings.Urls.update(urls)
+    EnvironmentSettings.Caches.update(caches)
+
+    # the records are returned to the parent process, which writes them
+    ReaderManifest.persist, FailedDates.persist = False, False
+    try:
+        data = concat_frames(list(iter_for_dates(reader, datelist)))
+        records = ReaderManifest.take_unsaved(), FailedDates.take_unsaved()
+    finally:
+        ReaderManifest.persist, FailedDates.persist = True, True
+
+    shard_data = None
+    if not data.empty:
+        import pyarrow as pa
+
+        try:
+            shard_data = to_ipc_stream(data)
+        except pa.ArrowException:
+            # e.g. object columns mixing numbers and text, pickled with the frame instead
+            shard_data = data
+    return (shard_data, *records)
+
+
+def to_ipc_stream(data: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_ipc_stream(stream: bytes) -> pd.DataFrame:
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(stream).read_pandas()
+
+
 class MultiDatesDataReader(DataReader):
     reader: DataReader
+    plan_key_by_value = True  # together with the key of the wrapped reader
 
     def __init__(self, reader: DataReader):
         super().__init__()
@@ -351,34 +910,50 @@ class MultiDatesDataReader(DataReader):
         if not isinstance(criteria, MultiDatesCriteria):
             raise Exception("MultiDatesDataReader.read() expects MultiDatesCriteria")
         
-        result = pd.DataFrame()
-        for for_date in criteria.for_dates:
-            if MarketDaysHelper.is_open_for_day(pd.Timestamp(for_date).date()):
-                try:
-                    data = self.reader.read(ForDateCriteria(for_date))
-                    
-                    if result.empty:
-                        result = data
-                    else:
-                        if not data.empty:
-                            result = pd.concat(
-                                [result, data], ignore_index=True
-                            ).reset_index(drop=True)
-                except Exception as e:
-                    print(e, for_date.strftime("date(%Y, %m, %d),"))
+        result = read_for_dates(self.reader, self.get_open_dates(criteria))
 
         return self.post_read_data(result)
 
+    def read_iter(self, criteria: ReaderDateCriteria):
+        if not isinstance(criteria, MultiDatesCriteria):
+            raise Exception("MultiDatesDataReader.read_iter() expects MultiDatesCriteria")
+
+        yield from iter_for_dates(self.reader, self.get_open_dates(criteria))
+
+    def clear_failed_dates(self, criteria: DateRangeCriteria = None):
+        self.reader.clear_failed_dates(criteria)
+
+    def set_projection(self, columns: list[str]):
+        self.projection = columns
+        self.reader.set_projection(columns)
+        return self
+
+    def get_plan_key(self) -> tuple:
+        return super().get_plan_key() + (self.reader.get_plan_key(),)
+
+    def get_schema(self) -> ReaderSchema:
+        return self.reader.get_schema()
+
+    def get_open_dates(self, criteria: MultiDatesCriteria) -> list[date]:
+        if len(criteria.for_dates) == 0:
+            return []
+        is_open = TradingCalendar.get().is_open(criteria.for_dates)
+        return [for_date for for_date, is_market_day in zip(criteria.for_dates, is_open) if is_market_day]
+
 
 class SingleDaySourceDataReader(DataReader):
     pass
 
 
 class DateRangeSourceDataReader(DataReader):
-    pass
+    def read_iter(self, criteria: ReaderDateCriteria):
+        data = self.read(criteria)
+        if not (data is None or data.empty):
+            yield data
 
 class DateRangeDataReaderWrapper(DateRangeSourceDataReader):
     reader: DataReader
+    plan_key_by_value = True  # together with the key of the wrapped reader
 
     def __init__(self, reader: DataReader):
         super().__init__()
@@ -392,25 +967,38 @@ class DateRangeDataReaderWrapper(DateRangeSourceDataReader):
         if not isinstance(criteria, ReaderDateCriteria):
             raise Exception("DateRangeDataReader.read() expects ReaderDateCriteria")
         
-        datelist = MarketDaysHelper.get_days_list_for_range(criteria.from_date, criteria.to_date)
-        result = pd.DataFrame()
-        for for_date in datelist:
-            if MarketDaysHelper.is_open_for_day(pd.Timestamp(for_date).date()):
-                try:
-                    data = self.reader.read(ForDateCriteria(for_date))
-                    
-                    if result.empty:
-                        result = data
-                    else:
-                        if not data.empty:
-                            result = pd.concat(
-                                [result, data], ignore_index=True
-                            ).reset_index(drop=True)
-                except Exception as e:
-                    print(e, for_date.strftime("date(%Y, %m, %d),"))
+        result = read_for_dates(self.reader, self.get_open_dates(criteria))
 
         return self.post_read_data(result)
 
+    def read_iter(self, criteria: ReaderDateCriteria):
+        """Yields the normalised frame of each market day in the range. Unlike read(), columns
+        derived across days such as PreviousClose are computed within each day only."""
+        if not isinstance(criteria, ReaderDateCriteria):
+            raise Exception("DateRangeDataReader.read_iter() expects ReaderDateCriteria")
+
+        yield from iter_for_dates(self.reader, self.get_open_dates(criteria))
+
+    def get_open_dates(self, criteria: DateRangeCriteria) -> list[date]:
+        return MarketDaysHelper.get_market_days_list_for_range(criteria.from_date, criteria.to_date)
+
+    def compact(self, criteria: DateRangeCriteria) -> list[str]:
+        return self.reader.compact(criteria)
+
+    def get_schema(self) -> ReaderSchema:
+        return self.reader.get_schema()
+
+    def clear_failed_dates(self, criteria: DateRangeCriteria = None):
+        self.reader.clear_failed_dates(criteria)
+
+    def set_projection(self, columns: list[str]):
+        self.projection = columns
+        self.reader.set_projection(columns)
+        return self
+
+    def get_plan_key(self) -> tuple:
+        return super().get_plan_key() + (self.reader.get_plan_key(),)
+
     def has_data(self, criteria: ReaderDateCriteria):
         if self.reader:
             return self.reader.has_data(criteria)
@@ -419,6 +1007,8 @@ class DateRangeDataReaderWrapper(DateRangeSourceDataReader):
 
 
 class ChainedDataReader(DateRangeSourceDataReader):
+    plan_key_by_value = True  # together with the key of the next reader
+
     def __init__(self, next: DataReader):
         super().__init__()
         if not isinstance(next, DateRangeSourceDataReader):
@@ -442,35 +1032,93 @@ class ChainedDataReader(DateRangeSourceDataReader):
                 self.on_received_more_data(data)
         elif availability.status == Status.PARTIAL:
             Instrumentation.debug(f"{self.__class__} -> Data availability {str(availability.status)}, criteria: {str(criteria)}")
-            available_data = self.read_data(criteria)
-            unavailable_data: list[pd.DataFrame] = []
-            
-            for date_range in availability.unavailability_ranges:
-                Instrumentation.debug(f"{self.__class__} -> reading unavailability range: {str(date_range)}")
-                data = self.next.read(date_range)
-                if not data.empty:
-                    unavailable_data.append(data)
+            # the available ranges and the gaps are disjoint, read separately they concatenate in date order
+            available_data = [self.read_data(date_range) for date_range in availability.availability_ranges]
+            unavailable_data = [data for data in self.read_gaps(availability.unavailability_ranges) if not data.empty]
             if len(unavailable_data) > 0:
-                all_unavailable_data = pd.concat(unavailable_data).sort_values([BaseColumns.Date])
+                all_unavailable_data = concat_by_date(unavailable_data)
                 #all_unavailable_data = self.post_read_data(all_unavailable_data)
-                data = pd.concat([all_unavailable_data, available_data])
+                data = concat_by_date([all_unavailable_data] + available_data)
                 data[BaseColumns.Date] = data[BaseColumns.Date].astype('datetime64[ns]')
-                data = data.sort_values([BaseColumns.Date])
                 self.on_received_more_data(all_unavailable_data)
             else:
-                data = available_data
+                data = concat_by_date(available_data)
         
         return self.post_read_data(data)
+
+    def read_iter(self, criteria: ReaderDateCriteria):
+        """Yields the available and the missing ranges chunk by chunk in date order, handing
+        each chunk read from the next reader to on_received_more_data"""
+        availability: ReaderDataAvailabilityStatus = self.has_data(criteria)
+
+        if availability.status == Status.COMPLETE:
+            read_plan = [(criteria, True)]
+        elif availability.status == Status.NONE or availability.status == Status.UKNOWN:
+            read_plan = [(criteria, False)]
+        else:
+            read_plan = sorted(
+                [(date_range, True) for date_range in availability.availability_ranges]
+                + [(date_range, False) for date_range in availability.unavailability_ranges],
+                key=lambda x: x[0].from_date,
+            )
+
+        for date_range, is_available in read_plan:
+            if is_available:
+                chunks = self.read_data_iter(date_range)
+            else:
+                chunks = self.next.read_iter(date_range)
+
+            for data in chunks:
+                if data.empty:
+                    continue
+                if not is_available:
+                    self.on_received_more_data(data)
+                data = self.post_read_data(data)
+                if not data.empty:
+                    yield data
+
+    def read_data_iter(self, criteria: ReaderDateCriteria):
+        data = self.read_data(criteria)
+        if not (data is None or data.empty):
+            yield data
     
+    def read_gaps(self, date_ranges: list[DateRangeCriteria]) -> list[pd.DataFrame]:
+        """Reads the missing `date_ranges` from the next reader, up to `options.max_concurrent_gap_reads`
+        at a time. The frames are returned in the order of the ranges."""
+        for date_range in date_ranges:
+            Instrumentation.debug(f"{self.__class__} -> reading unavailability range: {str(date_range)}")
+
+        max_workers = min(self.options.max_concurrent_gap_reads, len(date_ranges))
+        if max_workers <= 1:
+            return [self.next.read(date_range) for date_range in date_ranges]
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{self.name}-gaps") as executor:
+            return list(executor.map(self.next.read, date_ranges))
+
+    def get_plan_key(self) -> tuple:
+        return super().get_plan_key() + (self.next.get_plan_key(),)
+
     def on_received_more_data(self, data: list[pd.DataFrame]):
         pass
 
+    def set_projection(self, columns: list[str]):
+        self.projection = columns
+        self.next.set_projection(columns)
+        return self
+
+    def get_schema(self) -> ReaderSchema:
+        return self.next.get_schema()
 
 class CachedDataReader(ChainedDataReader):
     def __init__(self, next: DataReader):
         super().__init__(next)
         self.name = next.name
         self.options.col_prefix = next.options.col_prefix
+
+    def set_projection(self, columns: list[str]):
+        # the cache keeps every column so that it can serve any later projection
+        self.projection = columns
+        return self
     
     def read_data(self, criteria) -> pd.DataFrame:
         return self.read_cached_data(criteria)
@@ -483,46 +1131,169 @@ class CachedDataReader(ChainedDataReader):
         data = data.reset_index(drop=True)
         data = data.drop_duplicates()
         if self.filter:
-            data = data.query(str(self.filter))
+            data = self.filter.apply(data)
         return data
 
 
 class MemoryCachedDataReader(CachedDataReader):
+    """Caches the data read through the chain in memory as one partition per month. Partitions are
+    kept in least recently used order and evicted once they hold more than `max_bytes`."""
+
+    def __init__(self, next: DataReader, max_bytes: int = None):
+        super().__init__(next)
+        self.max_bytes = max_bytes
+        self.partitions: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+        self.partition_dates: dict[tuple, np.ndarray] = {}  # sorted datetime64 Date values of each partition
+        self.partition_bytes: dict[tuple, int] = {}
+        self.lock = threading.RLock()
+
+    @property
+    def cached_data(self) -> pd.DataFrame:
+        with self.lock:
+            return concat_frames([self.partitions[key] for key in sorted(self.partitions)])
+
+    def get_partition_key(for_date) -> tuple:
+        return (for_date.year, for_date.month)
+
+    def get_cached_bytes(self) -> int:
+        return sum(self.partition_bytes.values())
+
+    def read_cached_data(self, criteria: ReaderDateCriteria) -> pd.DataFrame:
+        if isinstance(criteria, ForDateCriteria):
+            criteria = DateRangeCriteria(criteria.for_date, criteria.for_date)
+
+        from_key = MemoryCachedDataReader.get_partition_key(criteria.from_date)
+        to_key = MemoryCachedDataReader.get_partition_key(criteria.to_date)
+        from_date = np.datetime64(pd.Timestamp(criteria.from_date).date())
+        till_date = np.datetime64(pd.Timestamp(criteria.to_date).date() + timedelta(days=1))
+        frames = []
+        with self.lock:
+            for key in sorted(key for key in self.partitions if from_key <= key <= to_key):
+                self.partitions.move_to_end(key)
+                # partitions are sorted by date, the rows of the range are a contiguous slice
+                dates = self.partition_dates[key]
+                start, end = dates.searchsorted([from_date, till_date], side="left")
+                if end > start:
+                    frames.append(self.partitions[key].iloc[start:end])
+        return concat_frames(frames)
+
+    def on_received_more_data(self, new_data: pd.DataFrame):
+        """Adds `new_data` to the partitions of its months, replacing the rows cached for its dates"""
+        if new_data is None or new_data.empty:
+            return
+
+        dates = pd.to_datetime(new_data[BaseColumns.Date])
+        with self.lock:
+            for (year, month), month_data in new_data.groupby([dates.dt.year, dates.dt.month]):
+                key = (int(year), int(month))
+                existing_data = self.partitions.get(key)
+                if existing_data is not None:
+                    existing_data = existing_data[~existing_data[BaseColumns.Date].isin(month_data[BaseColumns.Date].unique())]
+                    month_data = concat_frames([existing_data, month_data])
+
+                partition = month_data.sort_values(BaseColumns.Date, kind="stable").reset_index(drop=True)
+                self.partitions[key] = partition
+                self.partitions.move_to_end(key)
+                self.partition_dates[key] = partition[BaseColumns.Date].to_numpy(dtype="datetime64[ns]")
+                self.partition_bytes[key] = int(partition.memory_usage(deep=True).sum())
+
+            self.options.data_availability = DataReader.merge_intervals(
+                (self.options.data_availability or []) + get_date_ranges(dates.drop_duplicates().sort_values())
+            )
+            self.evict()
+
+    def evict(self):
+        """Drops the least recently used partitions while the cache is over budget, keeping at least one"""
+        if self.max_bytes is None:
+            return
+
+        while len(self.partitions) > 1 and self.get_cached_bytes() > self.max_bytes:
+            (year, month), _ = self.partitions.popitem(last=False)
+            del self.partition_bytes[(year, month)]
+            del self.partition_dates[(year, month)]
+            month_start = date(year, month, 1)
+            month_end = (pd.Timestamp(month_start) + pd.offsets.MonthEnd(1)).date()
+            Instrumentation.debug(f"Evicting {self.name} cache partition {month_start.strftime('%Y-%m')}")
+            self.options.data_availability = subtract_range(self.options.data_availability, month_start, month_end)
+
+    def get_data_availability_ranges(self):
+        return get_date_ranges(self.cached_data['Date'])
+
+
+class DiskCachedDataReader(CachedDataReader):
+    """Caches the data read through the chain in a SQLite file per reader, so that later processes
+    are served from disk instead of the raw files. Identifier filters are answered from the index."""
+
     def __init__(self, next: DataReader):
         super().__init__(next)
-        self.cached_data = pd.DataFrame()
-    
-    def read_cached_data(self, criteria: DateRangeCriteria) -> pd.DataFrame:
-        return self.cached_data[
-            self.cached_data[BaseColumns.Date].dt.date.between(criteria.from_date, criteria.to_date)
-        ]
-        
+        self.store = DiskCacheStore(self.get_store_name())
+        self.options.data_availability = [
+            DateRangeCriteria(from_date, to_date) for from_date, to_date in self.store.get_availability()
+        ] or None
+
+    def get_store_name(self) -> str:
+        """Reader name, with a digest of the filter and projection of the next reader when it has any,
+        so that readers caching different rows or columns of a source do not share a store"""
+        filter_key = self.next.filter.get_key() if self.next.filter else ()
+        projection = tuple(sorted(self.next.projection)) if self.next.projection is not None else None
+        if len(filter_key) == 0 and projection is None:
+            return self.name
+        # hash() of strings changes across processes, the store must be found again by later runs
+        return f"{self.name}-{hashlib.sha1(repr((filter_key, projection)).encode()).hexdigest()[:12]}"
+
+    def read_cached_data(self, criteria: ReaderDateCriteria) -> pd.DataFrame:
+        if isinstance(criteria, ForDateCriteria):
+            criteria = DateRangeCriteria(criteria.for_date, criteria.for_date)
+
+        identifier = self.filter.get_equals_value(BaseColumns.Identifier) if self.filter else None
+        data = self.store.read(criteria.from_date, criteria.to_date, [identifier] if identifier is not None else None)
+        return self.apply_schema(data)
+
     def on_received_more_data(self, new_data: pd.DataFrame):
-        existing_data = self.cached_data
-        self.cached_data = pd.concat([existing_data, new_data])
-        
-        self.cached_data.sort_values(BaseColumns.Date, inplace=True)
-        if self.options.data_availability is None:
-            self.options.data_availability = []
+        self.store.write(new_data)
+        received_ranges = get_date_ranges(new_data[BaseColumns.Date].drop_duplicates().sort_values())
+        availability = self.store.update_availability(
+            lambda stored_ranges: [
+                (date_range.from_date, date_range.to_date)
+                for date_range in DataReader.merge_intervals(
+                    [DateRangeCriteria(from_date, to_date) for from_date, to_date in stored_ranges] + received_ranges
+                )
+            ]
+        )
+        self.options.data_availability = [DateRangeCriteria(from_date, to_date) for from_date, to_date in availability]
 
-        self.options.data_availability = self.get_data_availability_ranges()
 
-    def get_data_availability_ranges(self):
-        df = pd.DataFrame()
-        df['Date'] = self.cached_data['Date']
-        df['Gap'] = self.cached_data['Date'].diff().dt.days
+def subtract_range(ranges: list[DateRangeCriteria], from_date: date, to_date: date) -> list[DateRangeCriteria]:
+    """`ranges` without the dates from `from_date` to `to_date`"""
+    remaining_ranges: list[DateRangeCriteria] = []
+    for date_range in ranges or []:
+        if date_range.to_date < from_date or date_range.from_date > to_date:
+            remaining_ranges.append(date_range)
+            continue
+        if date_range.from_date < from_date:
+            remaining_ranges.append(DateRangeCriteria(date_range.from_date, from_date - timedelta(days=1)))
+        if date_range.to_date > to_date:
+            remaining_ranges.append(DateRangeCriteria(to_date + timedelta(days=1), date_range.to_date))
+    return remaining_ranges
+
+
+def get_date_ranges(dates: pd.Series) -> list[DateRangeCriteria]:
+    """Ranges of the sorted `dates`, a gap of more than 4 days starts a new range"""
+    df = pd.DataFrame()
+    df['Date'] = dates
+    df['Gap'] = dates.diff().dt.days
 
-        df['NewRange'] = df['Gap'] > 4
+    df['NewRange'] = df['Gap'] > 4
 
-        df['Group'] = df['NewRange'].cumsum()
+    df['Group'] = df['NewRange'].cumsum()
 
-        ranges_df = df.groupby('Group')['Date'].agg(['min', 'max']).reset_index(drop=True)
+    ranges_df = df.groupby('Group')['Date'].agg(['min', 'max']).reset_index(drop=True)
 
-        availability_ranges: list[DateRangeCriteria] = []
-        for index, row in ranges_df.iterrows():
-            availability_ranges.append(DateRangeCriteria(row['min'].date(), row['max'].date()))
+    availability_ranges: list[DateRangeCriteria] = []
+    for index, row in ranges_df.iterrows():
+        availability_ranges.append(DateRangeCriteria(row['min'].date(), row['max'].date()))
 
-        return availability_ranges
+    return availability_ranges
 
 
 
@@ -539,9 +1310,71 @@ class ArithmaticOpReader(DataReader):
         self.options.col_prefix = ""
         self.name = f"{left.name}{op_symbol}{right.name}"
 
+    def set_projection(self, columns: list[str]):
+        self.projection = columns
+        self.l_reader.set_projection(columns)
+        self.r_reader.set_projection(columns)
+        return self
+
+    def get_plan_key(self) -> tuple:
+        return (
+            type(self),
+            self.op_symbol,
+            self.options.col_prefix,
+            tuple(self.projection) if self.projection is not None else None,
+            self.l_reader.get_plan_key(),
+            self.r_reader.get_plan_key(),
+        )
+
+    def get_plan_leaves(self, leaves: dict = None) -> dict:
+        """The distinct readers at the leaves of the expression, keyed by plan key"""
+        leaves = {} if leaves is None else leaves
+        for reader in [self.l_reader, self.r_reader]:
+            if isinstance(reader, ArithmaticOpReader):
+                reader.get_plan_leaves(leaves)
+            else:
+                leaves.setdefault(reader.get_plan_key(), reader)
+        return leaves
+
     def read(self, criteria: ReaderDateCriteria) -> pd.DataFrame:
-        l_data = get_date_criteria_based_reader(self.l_reader, criteria).read(criteria)
-        r_data = get_date_criteria_based_reader(self.r_reader, criteria).read(criteria)
+        """Reads each distinct leaf reader once, up to `options.max_concurrent_leaf_reads` at a time,
+        then evaluates the expression bottom up. Identical sub expressions are evaluated once.
+        Leaves are read for the whole range, so their columns derived across days such as
+        PreviousClose span the range, like the leaves of an expression without sub expressions."""
+        leaves = self.get_plan_leaves()
+        read_leaf = lambda reader: get_date_criteria_based_reader(reader, criteria).read(criteria)
+
+        max_workers = min(self.options.max_concurrent_leaf_reads, len(leaves))
+        if max_workers <= 1:
+            frames = {key: read_leaf(reader) for key, reader in leaves.items()}
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{self.name}-leaves") as executor:
+                frames = dict(zip(leaves, executor.map(read_leaf, leaves.values())))
+
+        return self.evaluate(frames, criteria)
+
+    def evaluate(self, frames: dict, criteria: ReaderDateCriteria) -> pd.DataFrame:
+        """Result of the expression from the frames of its leaves, adding the frames of the sub
+        expressions to `frames` as they are evaluated"""
+        key = self.get_plan_key()
+        if key not in frames:
+            l_data, r_data = [self.get_operand(reader, frames, criteria) for reader in [self.l_reader, self.r_reader]]
+            frames[key] = self.merge_with_operation(l_data, r_data)
+        return frames[key]
+
+    def get_operand(self, reader: DataReader, frames: dict, criteria: ReaderDateCriteria) -> pd.DataFrame:
+        if not isinstance(reader, ArithmaticOpReader):
+            return frames[reader.get_plan_key()]
+
+        wrapped_key = ("wrapped", reader.get_plan_key())
+        if wrapped_key not in frames:
+            data = reader.evaluate(frames, criteria)
+            # a sub expression read for a range or dates is post processed by the wrapper reading it
+            wrapper = get_date_criteria_based_reader(reader, criteria)
+            frames[wrapped_key] = data if wrapper is reader else wrapper.post_read_data(data)
+        return frames[wrapped_key]
+
+    def merge_with_operation(self, l_data: pd.DataFrame, r_data: pd.DataFrame) -> pd.DataFrame:
         if not (l_data.empty or r_data.empty):
             on_cols = [BaseColumns.Identifier, BaseColumns.Date]
             prefix_l = self.l_reader.options.col_prefix
@@ -558,36 +1391,23 @@ class ArithmaticOpReader(DataReader):
                 on_cols = [BaseColumns.Date]
                 prefix_r = r_data[BaseColumns.Identifier].values[0] + "-"
             
-            if not (
+            if (
                 f"{prefix_l}{BaseColumns.Close}" in l_data.columns
                 and f"{prefix_r}{BaseColumns.Close}" in l_data.columns
             ):
-                merged_df = pd.merge(
-                    l_data,
-                    r_data,
-                    how="inner",
-                    on=on_cols,
-                    left_index=False,
-                    right_index=False,
-                )
-
-                if BaseColumns.Identifier not in on_cols:
-                    merged_df[BaseColumns.Identifier] = merged_df[BaseColumns.Identifier + "_x"] + " " + self.op_symbol + " " + merged_df[BaseColumns.Identifier + "_y"]
-
-                update_col_prefix = {}
-                for col in [col for col in merged_df.columns if "_x" in col]:
-                    update_col_prefix[col] = f"{prefix_l}{col.replace('_x', '')}"
-                for col in [col for col in merged_df.columns if "_y" in col]:
-                    update_col_prefix[col] = f"{prefix_r}{col.replace('_y', '')}"
-
-                merged_df.rename(columns=update_col_prefix, inplace=True)
+                # frames are shared between the nodes of the expression
+                merged_df = l_data.copy()
+                self.add_price_columns(merged_df, prefix_l, prefix_r)
             else:
-                merged_df = l_data
-
-            for col in TypeHelper.get_class_static_values(BasePriceColumns):
-                merged_df[col] = self.operator(
-                    merged_df[f"{prefix_l}{col}"], merged_df[f"{prefix_r}{col}"]
-                )
+                merged_df = self.join_with_operation(l_data, r_data, on_cols, prefix_l, prefix_r)
+                if merged_df is None:
+                    merged_df = self.merge_on_keys(l_data, r_data, on_cols, prefix_l, prefix_r)
+                    self.add_price_columns(merged_df, prefix_l, prefix_r)
+                    merged_df = merged_df[
+                        [col for col in merged_df.columns if self.is_carried(col, l_data, r_data, on_cols, prefix_l, prefix_r)]
+                    ]
+                    # the merge leaves text identifiers where the join keeps them categorical
+                    merged_df = self.get_schema().apply(merged_df)
 
             self.l_prefix = prefix_l
             self.r_prefix = prefix_r
@@ -596,13 +1416,110 @@ class ArithmaticOpReader(DataReader):
         else:
             return pd.DataFrame()
 
+    def is_carried(self, col: str, l_data: pd.DataFrame, r_data: pd.DataFrame, on_cols: list[str], prefix_l: str, prefix_r: str) -> bool:
+        """Whether a column of the result is kept. The columns of both sides are prefixed with the side
+        and carried only when the projection asks for them, by name or by prefixed name."""
+        if self.projection is None:
+            return True
+        for prefix, data, other in [(prefix_l, l_data, r_data), (prefix_r, r_data, l_data)]:
+            name = col[len(prefix):] if prefix and col.startswith(prefix) else None
+            if name in data.columns and name in other.columns and name not in on_cols:
+                return name in self.projection or col in self.projection
+        return True
+
+    def join_with_operation(
+        self, l_data: pd.DataFrame, r_data: pd.DataFrame, on_cols: list[str], prefix_l: str, prefix_r: str
+    ) -> pd.DataFrame:
+        """Inner join of both sides on `on_cols` with the price columns computed on the aligned arrays.
+        Rows keep the order of the left side, as with pd.merge. Returns None when the keys of the
+        right side are not unique."""
+        r_keys = get_join_keys(r_data, on_cols)
+        if not r_keys.is_unique:
+            return None
+        r_positions = r_keys.get_indexer(get_join_keys(l_data, on_cols))
+        l_positions = np.flatnonzero(r_positions >= 0)
+        r_positions = r_positions[l_positions]
+
+        shared_columns = set(l_data.columns).intersection(r_data.columns).difference(on_cols)
+        sides = []
+        names = set()
+        for data, positions, prefix in [(l_data, l_positions, prefix_l), (r_data, r_positions, prefix_r)]:
+            side_columns = {}
+            for col in data.columns:
+                name = f"{prefix}{col}" if col in shared_columns else col
+                if name not in names and self.is_carried(name, l_data, r_data, on_cols, prefix_l, prefix_r):
+                    side_columns[col] = name
+                    names.add(name)
+            side = data[list(side_columns)].take(positions).set_axis(list(side_columns.values()), axis=1)
+            sides.append(side.reset_index(drop=True))
+        merged_df = pd.concat(sides, axis=1)
+
+        if BaseColumns.Identifier not in on_cols:
+            merged_df[BaseColumns.Identifier] = combine_identifiers(
+                l_data[BaseColumns.Identifier], r_data[BaseColumns.Identifier], l_positions, r_positions, self.op_symbol
+            )
+        with np.errstate(all="ignore"):
+            for col in TypeHelper.get_class_static_values(BasePriceColumns):
+                merged_df[col] = self.operator(l_data[col].to_numpy()[l_positions], r_data[col].to_numpy()[r_positions])
+
+        return merged_df
+
+    def merge_on_keys(
+        self, l_data: pd.DataFrame, r_data: pd.DataFrame, on_cols: list[str], prefix_l: str, prefix_r: str
+    ) -> pd.DataFrame:
+        merged_df = pd.merge(
+            l_data,
+            r_data,
+            how="inner",
+            on=on_cols,
+            left_index=False,
+            right_index=False,
+        )
+
+        if BaseColumns.Identifier not in on_cols:
+            merged_df[BaseColumns.Identifier] = merged_df[BaseColumns.Identifier + "_x"].astype(str) + " " + self.op_symbol + " " + merged_df[BaseColumns.Identifier + "_y"].astype(str)
+
+        update_col_prefix = {}
+        for col in [col for col in merged_df.columns if "_x" in col]:
+            update_col_prefix[col] = f"{prefix_l}{col.replace('_x', '')}"
+        for col in [col for col in merged_df.columns if "_y" in col]:
+            update_col_prefix[col] = f"{prefix_r}{col.replace('_y', '')}"
+
+        merged_df.rename(columns=update_col_prefix, inplace=True)
+        return merged_df
+
+    def add_price_columns(self, merged_df: pd.DataFrame, prefix_l: str, prefix_r: str):
+        for col in TypeHelper.get_class_static_values(BasePriceColumns):
+            merged_df[col] = self.operator(
+                merged_df[f"{prefix_l}{col}"], merged_df[f"{prefix_r}{col}"]
+            )
+
+
+def combine_identifiers(l_ids: pd.Series, r_ids: pd.Series, l_positions: np.ndarray, r_positions: np.ndarray, op_symbol: str) -> pd.Categorical:
+    """"left op right" identifiers of the joined rows, formatted once per distinct pair"""
+    l_codes, l_uniques = pd.factorize(l_ids, use_na_sentinel=False)
+    r_codes, r_uniques = pd.factorize(r_ids, use_na_sentinel=False)
+    codes, pairs = pd.factorize(l_codes[l_positions].astype("int64") * len(r_uniques) + r_codes[r_positions])
+    names = [f"{l_uniques[pair // len(r_uniques)]} {op_symbol} {r_uniques[pair % len(r_uniques)]}" for pair in pairs]
+    if len(set(names)) < len(names):
+        return pd.Categorical(np.asarray(names, dtype=object)[codes])
+    return pd.Categorical.from_codes(codes, categories=names)
+
+
+def get_join_keys(data: pd.DataFrame, on_cols: list[str]) -> pd.Index:
+    if len(on_cols) == 1:
+        return pd.Index(data[on_cols[0]])
+    return pd.MultiIndex.from_arrays([data[col] for col in on_cols])
+
 
 class BhavCopyReader(SingleDaySourceDataReader):
+    plan_key_by_value = True
+
     def __init__(self):
         super().__init__()
         self.name = "nse_equities"
         self.options.col_prefix = "Cash-"
-        __base_url = "https://archives.nseindia.com/content/historical/EQUITIES/"
+        __base_url = "$NseArchivesUrl/content/historical/EQUITIES/"
         self.options.data_availability = [DateRangeCriteria(date.fromisoformat("2016-01-01"), date.today())]
         self.options.url_template = Template(
             __base_url + "$year/$month/$download_filename"
@@ -637,17 +1554,25 @@ class BhavCopyReader(SingleDaySourceDataReader):
             "TOTTRDVAL": BaseColumns.Turnover,
         }
 
+    def get_reader_columns(self):
+        return ["SERIES"]
+
+    def get_schema(self) -> ReaderSchema:
+        return base_schema.extend(categories=["SERIES"])
+
     def sanitize_data(self, data):
         return data[data["SERIES"] == "EQ"].reset_index(drop=True)
 
 
 class NseIndicesNewReader(SingleDaySourceDataReader):
+    plan_key_by_value = True
+
     def __init__(self):
         super().__init__()
         self.name = "nse_indices"
         self.options.col_prefix = "index-"
         self.rescale_options.turnover_scale = math.pow(10, 7)
-        __base_url = "https://archives.nseindia.com/content/indices/"
+        __base_url = "$NseArchivesUrl/content/indices/"
         self.options.unzip_file = False
         self.options.url_template = Template(__base_url + "$download_filename")
         self.options.output_path_template = Template(
@@ -678,6 +1603,8 @@ class NseIndicesNewReader(SingleDaySourceDataReader):
 
 
 class NseDerivatiesReaderBase(SingleDaySourceDataReader):
+    plan_key_by_value = True
+
     def __init__(self):
         super().__init__()
         self.options.data_availability = [DateRangeCriteria(date(2016, 1, 1), date.today())]
@@ -685,15 +1612,20 @@ class NseDerivatiesReaderBase(SingleDaySourceDataReader):
     def sanitize_data(self, data):
         return data[data["OpenInterest"] > 0].reset_index(drop=True)
 
+    def get_schema(self) -> ReaderSchema:
+        return derivatives_schema
+
 
 class NseDerivatiesReader(NseDerivatiesReaderBase):
     def __init__(self):
         super().__init__()
         self.name = "nse_derivatives"
         self.options.col_prefix = "FO-"
+        self.options.source_name = "nse_derivatives"
         self.rescale_options.turnover_scale = math.pow(10, 7)
         self.options.unzip_file = False
-        __base_url = "https://archives.nseindia.com/content/fo/"
+        self.instrument_type_column = "FinInstrmNm"
+        __base_url = "$NseArchivesUrl/content/fo/"
         self.options.url_template = Template(__base_url + "$download_filename")
         self.options.output_path_template = Template(
             "$DataBaseDir/$RawDataDir/$NseDerivativesDataDir/$download_filename"
@@ -710,6 +1642,34 @@ class NseDerivatiesReader(NseDerivatiesReaderBase):
             "primary_data_filename": f"NSE_FO_bhavcopy_{__formatted_date}.csv",
         }
 
+    def read_data(self, for_date: date) -> pd.DataFrame:
+        if self.filter and self.options.read_chunk_rows:
+            return super().read_data(for_date)
+
+        # the readers of each instrument type share one parse of the file and read their slice of it
+        return self.read_parsed_file(for_date, self.get_source_columns()).get_view(self.get_instrument_type())
+
+    def read_source_data(self, for_date: date) -> pd.DataFrame:
+        return self.read_parsed_file(for_date).get_view()
+
+    def read_parsed_file(self, for_date: date, source_columns: set[str] = None):
+        data_file_path = self.fetch_data(for_date)
+        if source_columns is not None:
+            source_columns = frozenset(source_columns | {self.instrument_type_column})
+        parsed_file = parsed_file_cache.get(
+            data_file_path,
+            lambda path: self.parse_data_file(for_date, path, source_columns),
+            split_column=self.instrument_type_column,
+            columns=source_columns,
+        )
+        self.record_fetched(for_date, data_file_path, parsed_file.data)
+        return parsed_file
+
+    def get_instrument_type(self) -> str:
+        if self.filter:
+            return self.filter.get_equals_value(DerivativesBaseColumns.InstrumentType)
+        return None
+
     def get_column_name_mappings(self):
         return {
             "TckrSymb": BaseColumns.Identifier,
@@ -742,8 +1702,9 @@ class NseDerivatiesOldReader(NseDerivatiesReaderBase):
         super().__init__()
         self.name = "Derivatives"
         self.options.col_prefix = "FO-"
+        self.options.source_name = "nse_derivatives_old"
         self.rescale_options.turnover_scale = math.pow(10, 7)
-        __base_url = "https://archives.nseindia.com/content/historical/DERIVATIVES/"
+        __base_url = "$NseArchivesUrl/content/historical/DERIVATIVES/"
         self.options.url_template = Template(
             __base_url + "$year/$month/$download_filename"
         )
@@ -779,8 +1740,13 @@ class NseDerivatiesOldReader(NseDerivatiesReaderBase):
             "OpnIntrst": DerivativesBaseColumns.OpenInterest,
             "PctgChngInOpnIntrst": DerivativesBaseColumns.OiChangePct,
             "STRIKE_PR": DerivativesBaseColumns.StrikePrice,
+            "OPEN_INT": DerivativesBaseColumns.OpenInterest,
+            "INSTRUMENT": DerivativesBaseColumns.InstrumentType,
         }
 
+    def get_schema(self) -> ReaderSchema:
+        return derivatives_schema.extend(dates={DerivativesBaseColumns.ExpiryDate: "%d-%b-%Y"})
+
 
 class NseIndexFuturesDataReader(NseDerivatiesReader):
     def __init__(self):
@@ -829,6 +1795,7 @@ class NseIndicesManualDataReader(DateRangeSourceDataReader):
     output_dir_template = Template("")
     filename_template = Template("$ReaderName.csv")
     data_dir_template = Template("$DataBaseDir/$ManualDataDir")
+    plan_key_by_value = True
 
     def __init__(self):
         super().__init__()
@@ -865,6 +1832,14 @@ class NseIndicesReader(ChainedDataReader):
     
     def read_data(self, criteria: ReaderDateCriteria):
         return self.new_reader.read(criteria)
+
+    def read_data_iter(self, criteria: ReaderDateCriteria):
+        return self.new_reader.read_iter(criteria)
+
+    def set_projection(self, columns: list[str]):
+        super().set_projection(columns)
+        self.new_reader.set_projection(columns)
+        return self
     
     def has_data(self, criteria: ReaderDateCriteria):
         return self.new_reader.has_data(criteria)
\ No newline at end of file
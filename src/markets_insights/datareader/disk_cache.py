@@ -0,0 +1,109 @@
+from contextlib import closing
+from datetime import date
+import os
+import sqlite3
+from string import Template
+import threading
+
+import pandas as pd
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.environment import EnvironmentSettings
+
+
+class DiskCacheStore:
+    """SQLite file holding the normalised rows of a reader, indexed by Date and by Identifier + Date,
+    together with the date ranges it covers. Dates are stored as yyyy-mm-dd text so that range
+    conditions use the indexes; the columns that were datetimes are parsed back on read."""
+
+    path_template = Template("$DataBaseDir/$ProcessedDataDir/$CacheDataDir/$ReaderName.sqlite")
+    date_format = "%Y-%m-%d"
+
+    def __init__(self, reader_name: str, path: str = None):
+        self.path = path or self.path_template.substitute(**EnvironmentSettings.Paths, ReaderName=reader_name)
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self.connect()) as connection, connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS availability (from_date TEXT, to_date TEXT)")
+            connection.execute("CREATE TABLE IF NOT EXISTS columns (name TEXT PRIMARY KEY, kind TEXT)")
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_columns(self, connection: sqlite3.Connection) -> dict[str, str]:
+        return dict(connection.execute("SELECT name, kind FROM columns").fetchall())
+
+    def write(self, data: pd.DataFrame):
+        """Stores `data`, replacing the rows previously stored for its dates"""
+        if data is None or data.empty:
+            return
+
+        data = data.reset_index(drop=True)
+        kinds = {}
+        for column, dtype in data.dtypes.items():
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                kinds[column] = "date"
+                data[column] = data[column].dt.strftime(self.date_format)
+            elif isinstance(dtype, pd.CategoricalDtype):
+                kinds[column] = "text"
+                data[column] = data[column].astype(object)
+            else:
+                kinds[column] = "value"
+
+        dates = data[BaseColumns.Date].drop_duplicates().tolist()
+        with self.lock, closing(self.connect()) as connection, connection:
+            stored_columns = self.get_columns(connection)
+            if len(stored_columns) == 0:
+                data.head(0).to_sql("data", connection, index=False)
+                connection.execute(f'CREATE INDEX data_date ON data ("{BaseColumns.Date}")')
+                connection.execute(
+                    f'CREATE INDEX data_identifier_date ON data ("{BaseColumns.Identifier}", "{BaseColumns.Date}")'
+                )
+            else:
+                for column in [column for column in data.columns if column not in stored_columns]:
+                    connection.execute(f'ALTER TABLE data ADD COLUMN "{column}"')
+                connection.executemany(f'DELETE FROM data WHERE "{BaseColumns.Date}" = ?', [(for_date,) for for_date in dates])
+
+            connection.executemany(
+                "INSERT OR REPLACE INTO columns (name, kind) VALUES (?, ?)",
+                [(column, kind) for column, kind in kinds.items() if column not in stored_columns],
+            )
+            data.to_sql("data", connection, index=False, if_exists="append")
+
+    def read(self, from_date: date, to_date: date, identifiers: list[str] = None) -> pd.DataFrame:
+        query = f'SELECT * FROM data WHERE "{BaseColumns.Date}" BETWEEN ? AND ?'
+        params = [from_date.strftime(self.date_format), to_date.strftime(self.date_format)]
+        if identifiers:
+            query += f' AND "{BaseColumns.Identifier}" IN ({", ".join("?" * len(identifiers))})'
+            params += list(identifiers)
+
+        with closing(self.connect()) as connection:
+            columns = self.get_columns(connection)
+            if len(columns) == 0:
+                return pd.DataFrame()
+            data = pd.read_sql_query(query + f' ORDER BY "{BaseColumns.Date}"', connection, params=params)
+
+        for column, kind in columns.items():
+            if kind == "date" and column in data.columns:
+                data[column] = pd.to_datetime(data[column], format=self.date_format)
+        return data
+
+    def get_availability(self) -> list[tuple[date, date]]:
+        with closing(self.connect()) as connection:
+            rows = connection.execute("SELECT from_date, to_date FROM availability ORDER BY from_date").fetchall()
+        return [(date.fromisoformat(from_date), date.fromisoformat(to_date)) for from_date, to_date in rows]
+
+    def update_availability(self, update) -> list[tuple[date, date]]:
+        """Replaces the stored ranges by `update(stored ranges)` in one transaction, so that ranges
+        recorded meanwhile by other readers of the store are kept. Returns the new ranges."""
+        with self.lock, closing(self.connect()) as connection, connection:
+            # taking the write lock before reading, a concurrent update waits for this one
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute("SELECT from_date, to_date FROM availability ORDER BY from_date").fetchall()
+            ranges = update([(date.fromisoformat(from_date), date.fromisoformat(to_date)) for from_date, to_date in rows])
+            connection.execute("DELETE FROM availability")
+            connection.executemany(
+                "INSERT INTO availability (from_date, to_date) VALUES (?, ?)",
+                [(from_date.isoformat(), to_date.isoformat()) for from_date, to_date in ranges],
+            )
+        return ranges
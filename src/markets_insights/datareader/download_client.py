@@ -0,0 +1,282 @@
+from collections import deque
+import http.client
+import random
+import threading
+import time
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+
+from markets_insights.core.core import Instrumentation
+from markets_insights.datareader.file_lock import atomic_write
+
+
+class RequestRecord:
+    def __init__(self, url: str, status: int, size: int, seconds: float, attempts: int):
+        self.url = url
+        self.status = status
+        self.size = size
+        self.seconds = seconds
+        self.attempts = attempts
+
+
+class DownloadStats:
+    """Latency and throughput of the requests made by a DownloadClient. The latest
+    `max_records` requests are kept individually, the totals cover every request."""
+
+    def __init__(self, max_records: int = 1000):
+        self.lock = threading.Lock()
+        self.records: deque[RequestRecord] = deque(maxlen=max_records)
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.total_bytes = 0
+        self.total_seconds = 0.0
+
+    def record(self, record: RequestRecord):
+        with self.lock:
+            self.records.append(record)
+            self.requests += 1
+            self.retries += record.attempts - 1
+            self.total_bytes += record.size
+            self.total_seconds += record.seconds
+            if record.status != 200:
+                self.failures += 1
+
+    def summary(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "failures": self.failures,
+                "retries": self.retries,
+                "bytes": self.total_bytes,
+                "mean_latency": self.total_seconds / self.requests if self.requests else 0.0,
+                "throughput": self.total_bytes / self.total_seconds if self.total_seconds else 0.0,
+            }
+
+
+class TokenBucket:
+    """Rate limiter allowing `rate` requests per second with bursts of up to `burst` requests.
+    The rate is halved when the server throttles and recovers additively on success."""
+
+    def __init__(self, rate: float, burst: int, min_rate: float = 0.5, max_rate: float = None):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_seconds = (1 - self.tokens) / self.rate
+            time.sleep(wait_seconds)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + 0.1)
+
+    def on_throttled(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port)"""
+
+    def __init__(self, max_idle_per_host: int = 8):
+        self.max_idle_per_host = max_idle_per_host
+        self.idle: dict[tuple, list[http.client.HTTPConnection]] = {}
+        self.lock = threading.Lock()
+        self.created = 0
+
+    def get(self, scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+        with self.lock:
+            connections = self.idle.get((scheme, netloc))
+            if connections:
+                connection = connections.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection
+
+        return self.connect(scheme, netloc, timeout)
+
+    def connect(self, scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+        with self.lock:
+            self.created += 1
+
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        return http.client.HTTPConnection(netloc, timeout=timeout)
+
+    def put(self, scheme: str, netloc: str, connection: http.client.HTTPConnection):
+        with self.lock:
+            connections = self.idle.setdefault((scheme, netloc), [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle = {}
+
+
+class DownloadClient:
+    """HTTP client shared by the readers to download source files. Connections are kept alive and
+    reused, requests are rate limited and transient failures are retried with jittered backoff.
+    Client errors such as 404 are raised right away as urllib HTTPError."""
+
+    retry_statuses = [429, 500, 502, 503, 504]
+    throttle_statuses = [429, 503]
+    max_redirects = 5
+    headers = {"User-Agent": "Mozilla/5.0", "Accept": "*/*", "Connection": "keep-alive"}
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 8,
+        requests_per_second: float = 5,
+        burst: int = 5,
+        max_idle_per_host: int = 8,
+    ):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.pool = ConnectionPool(max_idle_per_host)
+        self.stats = DownloadStats()
+
+    def __getstate__(self):
+        # connections, locks and stats belong to the process that created them, others get a fresh client
+        return {
+            "max_retries": self.max_retries,
+            "backoff_seconds": self.backoff_seconds,
+            "max_backoff_seconds": self.max_backoff_seconds,
+            "requests_per_second": self.rate_limiter.max_rate,
+            "burst": self.rate_limiter.burst,
+            "max_idle_per_host": self.pool.max_idle_per_host,
+        }
+
+    def __setstate__(self, state: dict):
+        self.__init__(**state)
+
+    def get(self, url: str, timeout: float = 5) -> bytes:
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                status, reason, headers, body = self.request(url, timeout)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt > self.max_retries:
+                    self.stats.record(RequestRecord(url, 0, 0, time.monotonic() - started, attempt))
+                    raise
+                Instrumentation.debug(f"Retrying {url} after {type(e).__name__}: {e}")
+                self.wait_before_retry(attempt)
+                continue
+
+            if status == 200:
+                self.rate_limiter.on_success()
+                self.stats.record(RequestRecord(url, status, len(body), time.monotonic() - started, attempt))
+                return body
+
+            if status in self.throttle_statuses:
+                self.rate_limiter.on_throttled()
+            if status not in self.retry_statuses or attempt > self.max_retries:
+                self.stats.record(RequestRecord(url, status, 0, time.monotonic() - started, attempt))
+                raise HTTPError(url, status, reason, headers, None)
+
+            Instrumentation.debug(f"Retrying {url} after HTTP {status}")
+            self.wait_before_retry(attempt, headers.get("Retry-After"))
+
+    def request(self, url: str, timeout: float):
+        for _ in range(self.max_redirects + 1):
+            self.rate_limiter.acquire()
+            parts = urlsplit(url)
+            path = parts.path or "/"
+            if parts.query:
+                path += "?" + parts.query
+
+            connection = self.pool.get(parts.scheme, parts.netloc, timeout)
+            is_reused = connection.sock is not None
+            try:
+                try:
+                    response = self.send(connection, path)
+                except (OSError, http.client.HTTPException) as e:
+                    if not is_reused:
+                        raise
+                    # the server closed the idle keep-alive connection, not a failed request
+                    Instrumentation.debug(f"Reconnecting for {url} after {type(e).__name__}: {e}")
+                    connection.close()
+                    connection = self.pool.connect(parts.scheme, parts.netloc, timeout)
+                    response = self.send(connection, path)
+                body = response.read()
+            except Exception:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self.pool.put(parts.scheme, parts.netloc, connection)
+
+            location = response.getheader("Location")
+            if response.status in [301, 302, 303, 307, 308] and location:
+                url = urljoin(url, location)
+                continue
+            return response.status, response.reason, response.headers, body
+
+        raise HTTPError(url, response.status, "Too many redirects", response.headers, None)
+
+    def send(self, connection: http.client.HTTPConnection, path: str) -> http.client.HTTPResponse:
+        connection.request("GET", path, headers=self.headers)
+        return connection.getresponse()
+
+    def wait_before_retry(self, attempt: int, retry_after: str = None):
+        if retry_after is not None and retry_after.isdigit():
+            wait_seconds = min(self.max_backoff_seconds, float(retry_after))
+        else:
+            backoff = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempt - 1))
+            wait_seconds = random.uniform(backoff / 2, backoff)
+        time.sleep(wait_seconds)
+
+    def download(self, url: str, output_path: str, timeout: float = 5) -> int:
+        body = self.get(url, timeout)
+        with atomic_write(output_path) as output:
+            output.write(body)
+        return len(body)
+
+    def close(self):
+        self.pool.close()
+
+
+_default_client: DownloadClient = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> DownloadClient:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = DownloadClient()
+        return _default_client
+
+
+def set_default_client(client: DownloadClient):
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
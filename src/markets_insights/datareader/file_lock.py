@@ -0,0 +1,116 @@
+from contextlib import contextmanager
+import os
+import shutil
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class SingleFlight:
+    """Lets one thread at a time work on a key. Threads asking for a key that is in flight wait for
+    it to finish, so they find the file written by the first one instead of fetching it again."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flights: dict[str, list] = {}
+
+    @contextmanager
+    def acquire(self, key: str):
+        with self.lock:
+            flight = self.flights.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self.lock:
+                flight[1] -= 1
+                if flight[1] == 0:
+                    del self.flights[key]
+
+
+single_flight = SingleFlight()
+
+
+def get_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# read once on import, os.umask() can only be read by changing it for every thread of the process
+umask = get_umask()
+
+
+def get_lock_path(path: str) -> str:
+    """Lock file of `path`, kept in a .locks folder next to it. Lock files are never removed, another
+    process may be waiting on the one being released."""
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, ".locks", filename + ".lock")
+
+
+@contextmanager
+def file_lock(path: str):
+    """Advisory lock on the lock file of `path`, held across processes sharing the data directory"""
+    lock_path = get_lock_path(path)
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def locked_path(path: str):
+    """Exclusive access to `path` for the threads of this process and for other processes"""
+    with single_flight.acquire(os.path.abspath(path)), file_lock(path):
+        yield
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "wb", **open_options):
+    """Opens a temporary file next to `path` and moves it over `path` once written, so readers
+    never see a partially written file and a failed write leaves nothing behind"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(handle, mode, **open_options) as output:
+            yield output
+        # mkstemp creates the file readable by its owner only, give it the mode open() would
+        os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+@contextmanager
+def atomic_directory(path: str):
+    """Yields a temporary directory next to `path`, renamed to `path` when filled. Keeps the
+    directory written by another process if one appeared in the meantime."""
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    temp_path = tempfile.mkdtemp(dir=parent, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        yield temp_path
+        if not os.path.exists(path):
+            os.chmod(temp_path, 0o777 & ~umask)
+            os.replace(temp_path, path)
+    finally:
+        shutil.rmtree(temp_path, ignore_errors=True)
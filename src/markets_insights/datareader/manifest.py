@@ -0,0 +1,256 @@
+from bisect import bisect_left, bisect_right
+import csv
+from datetime import date, datetime, timedelta
+import json
+import os
+from string import Template
+import threading
+
+import pandas as pd
+
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader.file_lock import atomic_write
+
+
+class ManifestEntry:
+    def __init__(self, for_date: date, rows: int, size: int):
+        self.for_date = for_date
+        self.rows = rows
+        self.size = size
+
+
+class ReaderManifest:
+    """Persistent record of the dates fetched for a source with the row count and file size of each
+    date. Entries are appended to a csv file and indexed in memory as sorted dates and merged ranges,
+    so lookups are O(log n) and never touch the raw data files."""
+
+    path_template = Template("$DataBaseDir/$RawDataDir/$ManifestsDataDir/$SourceName.csv")
+    columns = ["Date", "Rows", "Size"]
+    max_gap = timedelta(days=4)  # weekends and holidays do not break a fetched range
+    persist = True  # parse processes keep their records unsaved for the parent process to write
+    _manifests: dict = {}
+    _manifests_lock = threading.Lock()
+
+    def for_source(source_name: str):
+        return ReaderManifest.for_path(
+            ReaderManifest.path_template.substitute(**EnvironmentSettings.Paths, SourceName=source_name)
+        )
+
+    def for_path(path: str):
+        with ReaderManifest._manifests_lock:
+            if path not in ReaderManifest._manifests:
+                ReaderManifest._manifests[path] = ReaderManifest(path)
+            return ReaderManifest._manifests[path]
+
+    def take_unsaved() -> list[tuple[str, list[ManifestEntry]]]:
+        """The entries recorded without persisting them, per manifest path. Forgets the loaded
+        manifests so that the next reads load the files the parent process wrote meanwhile."""
+        with ReaderManifest._manifests_lock:
+            unsaved = [(manifest.path, manifest.unsaved) for manifest in ReaderManifest._manifests.values() if manifest.unsaved]
+            ReaderManifest._manifests = {}
+        return unsaved
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.unsaved: list[ManifestEntry] = []
+        self.entries: dict[date, ManifestEntry] = {}
+        self.dates: list[date] = []
+        self.range_starts: list[date] = []
+        self.range_ends: list[date] = []
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, newline="") as manifest_file:
+            for row in csv.DictReader(manifest_file):
+                self.add_entry(ManifestEntry(date.fromisoformat(row["Date"]), int(row["Rows"]), int(row["Size"])))
+
+    def record(self, for_date: date, rows: int, size: int):
+        self.record_entries([ManifestEntry(pd.Timestamp(for_date).date(), rows, size)])
+
+    def record_entries(self, entries: list[ManifestEntry]):
+        with self.lock:
+            entries = [entry for entry in entries if entry.for_date not in self.entries]
+            if len(entries) == 0:
+                return
+
+            if not self.persist:
+                self.unsaved += entries
+            else:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                is_new_file = not os.path.exists(self.path)
+                with open(self.path, "a", newline="") as manifest_file:
+                    writer = csv.writer(manifest_file)
+                    if is_new_file:
+                        writer.writerow(self.columns)
+                    writer.writerows([[entry.for_date.isoformat(), entry.rows, entry.size] for entry in entries])
+            for entry in entries:
+                self.add_entry(entry)
+
+    def add_entry(self, entry: ManifestEntry):
+        if entry.for_date in self.entries:
+            return
+
+        self.entries[entry.for_date] = entry
+        self.dates.insert(bisect_left(self.dates, entry.for_date), entry.for_date)
+        self.add_to_ranges(entry.for_date)
+
+    def add_to_ranges(self, for_date: date):
+        index = bisect_right(self.range_starts, for_date)
+        joins_previous = index > 0 and for_date - self.range_ends[index - 1] <= self.max_gap
+        joins_next = index < len(self.range_starts) and self.range_starts[index] - for_date <= self.max_gap
+
+        if joins_previous and joins_next:
+            self.range_ends[index - 1] = self.range_ends[index]
+            del self.range_starts[index]
+            del self.range_ends[index]
+        elif joins_previous:
+            self.range_ends[index - 1] = max(self.range_ends[index - 1], for_date)
+        elif joins_next:
+            self.range_starts[index] = for_date
+        else:
+            self.range_starts.insert(index, for_date)
+            self.range_ends.insert(index, for_date)
+
+    def has(self, for_date: date) -> bool:
+        for_date = pd.Timestamp(for_date).date()
+        index = bisect_left(self.dates, for_date)
+        return index < len(self.dates) and self.dates[index] == for_date
+
+    def get(self, for_date: date) -> ManifestEntry:
+        return self.entries.get(pd.Timestamp(for_date).date())
+
+    def get_ranges(self) -> list[tuple[date, date]]:
+        return list(zip(self.range_starts, self.range_ends))
+
+    def remove(self, for_date: date):
+        """Forgets `for_date`, e.g. when its raw file was deleted, and rewrites the csv file without it"""
+        for_date = pd.Timestamp(for_date).date()
+        with self.lock:
+            if for_date not in self.entries:
+                return
+
+            entries = [entry for entry in self.entries.values() if entry.for_date != for_date]
+            if self.persist:
+                self.write_entries(entries)
+
+            self.entries, self.dates, self.range_starts, self.range_ends = {}, [], [], []
+            for entry in entries:
+                self.add_entry(entry)
+
+    def write_entries(self, entries: list[ManifestEntry]):
+        with atomic_write(self.path, "w", newline="") as manifest_file:
+            writer = csv.writer(manifest_file)
+            writer.writerow(self.columns)
+            writer.writerows([[entry.for_date.isoformat(), entry.rows, entry.size] for entry in entries])
+
+    def clear(self):
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.entries = {}
+            self.dates = []
+            self.range_starts = []
+            self.range_ends = []
+
+
+class FailedDate:
+    def __init__(self, for_date: date, reason: str, expires_at: datetime):
+        self.for_date = for_date
+        self.reason = reason
+        self.expires_at = expires_at
+
+    def is_expired(self) -> bool:
+        return datetime.now() >= self.expires_at
+
+
+class FailedDates:
+    """Persistent negative cache of the dates a source failed to serve, e.g. unlisted holidays that
+    return 404. Range readers skip the dates until their entry expires."""
+
+    path_template = Template("$DataBaseDir/$RawDataDir/$ManifestsDataDir/$SourceName.failed.json")
+    persist = True  # parse processes keep their records unsaved for the parent process to write
+    _failed_dates: dict = {}
+    _failed_dates_lock = threading.Lock()
+
+    def for_source(source_name: str):
+        return FailedDates.for_path(
+            FailedDates.path_template.substitute(**EnvironmentSettings.Paths, SourceName=source_name)
+        )
+
+    def for_path(path: str):
+        with FailedDates._failed_dates_lock:
+            if path not in FailedDates._failed_dates:
+                FailedDates._failed_dates[path] = FailedDates(path)
+            return FailedDates._failed_dates[path]
+
+    def take_unsaved() -> list[tuple[str, list[FailedDate]]]:
+        """The failed dates recorded without persisting them, per file path. Forgets the loaded
+        files so that the next reads load the files the parent process wrote meanwhile."""
+        with FailedDates._failed_dates_lock:
+            unsaved = [(failed_dates.path, failed_dates.unsaved) for failed_dates in FailedDates._failed_dates.values() if failed_dates.unsaved]
+            FailedDates._failed_dates = {}
+        return unsaved
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.RLock()
+        self.unsaved: list[FailedDate] = []
+        self.entries: dict[date, FailedDate] = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path) as failed_dates_file:
+            for for_date, entry in json.load(failed_dates_file).items():
+                failed_date = FailedDate(
+                    date.fromisoformat(for_date), entry["reason"], datetime.fromisoformat(entry["expires_at"])
+                )
+                if not failed_date.is_expired():
+                    self.entries[failed_date.for_date] = failed_date
+
+    def save(self):
+        with atomic_write(self.path, "w") as failed_dates_file:
+            json.dump(
+                {
+                    entry.for_date.isoformat(): {"reason": entry.reason, "expires_at": entry.expires_at.isoformat()}
+                    for entry in self.entries.values()
+                },
+                failed_dates_file,
+                indent=1,
+            )
+
+    def record(self, for_date: date, reason: str, expiry: timedelta):
+        self.record_entries([FailedDate(pd.Timestamp(for_date).date(), reason, datetime.now() + expiry)])
+
+    def record_entries(self, entries: list[FailedDate]):
+        with self.lock:
+            for entry in entries:
+                self.entries[entry.for_date] = entry
+            if not self.persist:
+                self.unsaved += entries
+            else:
+                self.save()
+
+    def get(self, for_date: date) -> FailedDate:
+        entry = self.entries.get(pd.Timestamp(for_date).date())
+        if entry is None or entry.is_expired():
+            return None
+        return entry
+
+    def has(self, for_date: date) -> bool:
+        return self.get(for_date) is not None
+
+    def clear(self, from_date: date = None, to_date: date = None):
+        with self.lock:
+            self.entries = {
+                for_date: entry
+                for for_date, entry in self.entries.items()
+                if not ((from_date is None or for_date >= from_date) and (to_date is None or for_date <= to_date))
+            }
+            self.save()
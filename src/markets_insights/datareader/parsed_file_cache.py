@@ -0,0 +1,88 @@
+from collections import OrderedDict
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from markets_insights.core.environment import EnvironmentSettings
+
+
+class ParsedFile:
+    """A parsed source file indexed by `split_column`, serving the rows of each value from the
+    shared frame. The frame keeps the row order of the file."""
+
+    def __init__(self, data: pd.DataFrame, split_column: str = None):
+        self.split_column = split_column
+        self.bounds: dict = {}
+        self.order: np.ndarray = None
+        if split_column is not None and split_column in data.columns:
+            values, inverse, counts = np.unique(
+                data[split_column].to_numpy(dtype=str), return_inverse=True, return_counts=True
+            )
+            # positions of the rows of each value, in file order, as one block of `order`
+            self.order = np.argsort(inverse, kind="stable")
+            starts = np.cumsum(counts) - counts
+            self.bounds = {value: (start, start + count) for value, start, count in zip(values, starts, counts)}
+        self.data = data
+        self.size = int(data.memory_usage(deep=True).sum())
+
+    def get_view(self, value=None) -> pd.DataFrame:
+        """Rows having `value` in the split column, or all rows when value is None. The frame is
+        shared between readers and must not be modified in place."""
+        if value is None or self.split_column is None:
+            return self.data
+        start, end = self.bounds.get(str(value), (0, 0))
+        positions = self.order[start:end]
+        if len(positions) > 0 and positions[-1] - positions[0] == len(positions) - 1:
+            # the rows of the value are contiguous in the file, served as a slice
+            return self.data.iloc[positions[0] : positions[-1] + 1]
+        return self.data.take(positions)
+
+
+class ParsedFileCache:
+    """Process wide LRU cache of parsed source files keyed by path and modification time, holding
+    up to `max_bytes` of parsed data. Lets readers of the same source file parse it only once.
+    Without `max_bytes` the size follows EnvironmentSettings.Caches["ParsedFileCacheMB"]."""
+
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = max_bytes
+        self.files: OrderedDict[tuple, ParsedFile] = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, path: str, parse, split_column: str = None, columns: frozenset = None) -> ParsedFile:
+        """Returns the cached parse of `path`. `columns` identifies the projection `parse` applies,
+        files parsed with different projections are cached separately."""
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns, split_column, columns)
+        with self.lock:
+            if key in self.files:
+                self.files.move_to_end(key)
+                return self.files[key]
+
+        parsed_file = ParsedFile(parse(path), split_column)
+        with self.lock:
+            if key not in self.files:
+                self.files[key] = parsed_file
+                self.size += parsed_file.size
+                self.evict()
+        return parsed_file
+
+    def get_max_bytes(self) -> int:
+        if self.max_bytes is not None:
+            return self.max_bytes
+        return EnvironmentSettings.Caches["ParsedFileCacheMB"] * 1024 * 1024
+
+    def evict(self):
+        max_bytes = self.get_max_bytes()
+        while self.size > max_bytes and len(self.files) > 1:
+            _, parsed_file = self.files.popitem(last=False)
+            self.size -= parsed_file.size
+
+    def clear(self):
+        with self.lock:
+            self.files = OrderedDict()
+            self.size = 0
+
+
+parsed_file_cache = ParsedFileCache()
@@ -0,0 +1,98 @@
+from datetime import date
+from functools import lru_cache
+import os
+from string import Template
+
+import numpy as np
+import pandas as pd
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader.file_lock import atomic_write
+
+
+@lru_cache(maxsize=4)
+def load_partition(path: str, modified_time_ns: int, filters: tuple = None, columns: tuple = None) -> pd.DataFrame:
+    """Loads a partition once per modification, filters and columns; range reads slice the cached frame day by day"""
+    return pd.read_parquet(
+        path, filters=list(filters) if filters else None, columns=list(columns) if columns else None
+    )
+
+
+@lru_cache(maxsize=16)
+def load_partition_columns(path: str, modified_time_ns: int) -> list[str]:
+    import pyarrow.parquet as pq
+
+    return pq.read_schema(path).names
+
+
+@lru_cache(maxsize=16)
+def load_partition_dates(path: str, modified_time_ns: int) -> np.ndarray:
+    return pd.read_parquet(path, columns=[BaseColumns.Date])[BaseColumns.Date].unique()
+
+
+class MonthlyPartitionStore:
+    """Columnar store holding the normalised daily data of one source in one parquet file per month.
+    Needs the optional pyarrow dependency to write and read partitions."""
+
+    path_template = Template("$DataBaseDir/$ProcessedDataDir/$PartitionsDataDir/$SourceName/$Month.parquet")
+    compression = "zstd"
+
+    def __init__(self, source_name: str):
+        self.source_name = source_name
+
+    def get_path(self, for_date: date) -> str:
+        return self.path_template.substitute(
+            **EnvironmentSettings.Paths,
+            SourceName=self.source_name,
+            Month=pd.Timestamp(for_date).strftime("%Y-%m"),
+        )
+
+    def has_partition(self, for_date: date) -> bool:
+        return os.path.exists(self.get_path(for_date))
+
+    def read_month(self, for_date: date, filters: list[tuple] = None, columns: list[str] = None) -> pd.DataFrame:
+        """Reads the partition of the month of `for_date`. `filters` are (column, operator, value)
+        tuples evaluated while reading and `columns` the columns to read; filters and columns not
+        in the partition are ignored."""
+        path = self.get_path(for_date)
+        if not os.path.exists(path):
+            return None
+
+        modified_time_ns = os.stat(path).st_mtime_ns
+        if filters or columns:
+            partition_columns = load_partition_columns(path, modified_time_ns)
+            if filters:
+                filters = tuple(condition for condition in filters if condition[0] in partition_columns)
+            if columns:
+                columns = tuple(column for column in partition_columns if column in columns)
+        return load_partition(path, modified_time_ns, filters or None, columns or None)
+
+    def read(self, for_date: date, filters: list[tuple] = None, columns: list[str] = None) -> pd.DataFrame:
+        """Returns the rows stored for `for_date`, or None when its month is not compacted or
+        the date is not part of the partition"""
+        month_data = self.read_month(for_date, filters, columns)
+        if month_data is None:
+            return None
+
+        for_date = pd.Timestamp(for_date).to_datetime64()
+        if filters:
+            # the filters may drop every row of a compacted date, check the date against all rows
+            path = self.get_path(for_date)
+            if for_date not in load_partition_dates(path, os.stat(path).st_mtime_ns):
+                return None
+
+        dates = month_data[BaseColumns.Date].values
+        start = dates.searchsorted(for_date, side="left")
+        end = dates.searchsorted(for_date, side="right")
+        if start == end and not filters:
+            return None
+        return month_data.iloc[start:end].reset_index(drop=True)
+
+    def write(self, for_date: date, data: pd.DataFrame) -> str:
+        path = self.get_path(for_date)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = data.sort_values(BaseColumns.Date, kind="stable").reset_index(drop=True)
+        with atomic_write(path) as output:
+            data.to_parquet(output, index=False, compression=self.compression)
+        return path
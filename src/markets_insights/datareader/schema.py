@@ -0,0 +1,71 @@
+import pandas as pd
+
+
+class ReaderSchema:
+    """Dtypes of the normalised columns of a reader. Low-cardinality text columns are read as
+    categories and date columns as datetime64; numeric columns are downcast to float32/int32
+    when `compact_numerics` is set. Columns missing from the data are skipped."""
+
+    def __init__(self, categories: list[str] = None, dates: dict[str, str] = None, numerics: list[str] = None):
+        self.categories = categories or []
+        self.dates = dates or {}  # column -> format of the source values
+        self.numerics = numerics or []
+
+    def extend(self, categories: list[str] = None, dates: dict[str, str] = None, numerics: list[str] = None):
+        return ReaderSchema(
+            self.categories + (categories or []),
+            {**self.dates, **(dates or {})},
+            self.numerics + (numerics or []),
+        )
+
+    def apply(self, data: pd.DataFrame, compact_numerics: bool = False) -> pd.DataFrame:
+        if data is None or data.empty:
+            return data
+
+        dtypes = {}
+        for column in self.categories:
+            if column in data.columns and not isinstance(data[column].dtype, pd.CategoricalDtype):
+                dtypes[column] = "category"
+        if len(dtypes) > 0:
+            data = data.astype(dtypes)
+
+        for column, format in self.dates.items():
+            if column in data.columns and not pd.api.types.is_datetime64_any_dtype(data[column].dtype):
+                data[column] = pd.to_datetime(data[column], format=format)
+
+        if compact_numerics:
+            for column in self.numerics:
+                if column in data.columns and pd.api.types.is_numeric_dtype(data[column].dtype):
+                    data[column] = downcast(data[column])
+        return data
+
+
+def downcast(values: pd.Series) -> pd.Series:
+    """int64 columns become the smallest integer type holding their values, floats become float32"""
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return pd.to_numeric(values, downcast="integer")
+    elif pd.api.types.is_float_dtype(values.dtype):
+        return values.astype("float32")
+    return values
+
+
+def concat_categories(frames: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """Sets the union of the categories on the categorical columns shared by `frames` so that
+    concatenating them keeps the columns categorical"""
+    columns = [
+        column
+        for column, dtype in frames[0].dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype)
+        and all(column in frame.columns and isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames)
+    ]
+    if len(columns) == 0:
+        return frames
+
+    categories = {
+        column: pd.api.types.union_categoricals([frame[column] for frame in frames], ignore_order=True).categories
+        for column in columns
+    }
+    return [
+        frame.assign(**{column: frame[column].cat.set_categories(categories[column]) for column in columns})
+        for frame in frames
+    ]
@@ -2,7 +2,7 @@ from markets_insights.core.column_definition import (
     DerivativesBaseColumns,
     DerivativesCalculatedColumns,
 )
-from markets_insights.core.core import TypeHelper, MarketDaysHelper
+from markets_insights.core.core import TypeHelper, TradingCalendar
 import datetime
 import pandas as pd
 import numpy as np
@@ -14,6 +14,13 @@ from markets_insights.trade_builders.results import (
 )
 
 
+def as_datetime(values: pd.Series) -> pd.Series:
+    # readers type the date columns already, parse only data loaded from elsewhere
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    return pd.to_datetime(values)
+
+
 class DerivativeTradeOptions:
     holding_days: int = 7
     budget_min: int = 8000
@@ -54,10 +61,9 @@ class OptionsTradeBuilder:
 
     def get_first_entry_date(self, signal_date):
         if self._trade_options.entry_lag_days > 0:
-            for_date = pd.to_datetime(signal_date)
-            for i in range(0, self._trade_options.entry_lag_days):
-                for_date = MarketDaysHelper.get_next_market_day(for_date)
-            return pd.to_datetime(for_date)
+            return pd.to_datetime(
+                TradingCalendar.get().offset(pd.to_datetime(signal_date), self._trade_options.entry_lag_days)
+            )
         else:
             return pd.to_datetime(signal_date)
 
@@ -116,7 +122,7 @@ class OptionsTradeBuilder:
                 )
                 & (
                     (
-                        pd.to_datetime(data[DerivativesBaseColumns.ExpiryDate])
+                        as_datetime(data[DerivativesBaseColumns.ExpiryDate])
                         >= hold_till_date
                     )
                     | (diagnostic.skip_expiry_date_check == True)
@@ -0,0 +1,18 @@
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.environment import Environment, EnvironmentSettings
+from markets_insights.datareader.parsed_file_cache import parsed_file_cache
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Data folders in an empty temporary folder, with no parsed files cached. Modules needing raw
+    files override it and write them with helper.write_raw_files."""
+    monkeypatch.setitem(EnvironmentSettings.Paths, "DataBaseDir", str(tmp_path))
+    Environment.setup(str(tmp_path))
+    parsed_file_cache.clear()
+    return str(tmp_path)
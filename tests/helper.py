@@ -107,3 +107,65 @@ def check_col_values(data: pd.DataFrame, col_value_pairs: dict):
                 assert pytest.fail(
                     f"column `{col_name}` value check: {data[col_name].values[0]} <> {col_value_pairs[col_name]}"
                 )
+
+
+from markets_insights.datareader.data_reader import SingleDaySourceDataReader
+
+
+class SyntheticDailyReader(SingleDaySourceDataReader):
+    """Offline reader producing deterministic prices for `identifiers` on every day read"""
+
+    def __init__(self, identifiers: list[str] = None):
+        super().__init__()
+        self.name = "synthetic_daily"
+        self.options.unzip_file = False
+        self.identifiers = identifiers if identifiers is not None else ["A", "B"]
+
+    def fetch_data(self, for_date):
+        return None
+
+    def read_data_from_file(self, for_date, primary_data_filepath):
+        day_no = pd.Timestamp(for_date).toordinal()
+        close = [float(day_no % 97 + 10 * (i + 1)) for i in range(len(self.identifiers))]
+        return pd.DataFrame(
+            {
+                BaseColumns.Identifier: self.identifiers,
+                BaseColumns.Open: close,
+                BaseColumns.High: close,
+                BaseColumns.Low: close,
+                BaseColumns.Close: close,
+                BaseColumns.Volume: 100,
+                BaseColumns.Turnover: 1000.0,
+                BaseColumns.Date: pd.to_datetime(for_date),
+            }
+        )
+
+
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader.data_reader import (
+    BhavCopyReader,
+    NseDerivatiesOldReader,
+    NseDerivatiesReader,
+    NseIndicesNewReader,
+)
+from nse_stand_in import SyntheticMarketData, to_csv_bytes, to_zip_bytes
+
+raw_file_generators = {
+    BhavCopyReader: "bhavcopy",
+    NseIndicesNewReader: "indices",
+    NseDerivatiesReader: "derivatives_new",
+    NseDerivatiesOldReader: "derivatives_old",
+}
+
+
+def write_raw_files(market_data: SyntheticMarketData, reader_classes: list[type], from_date: datetime.date, to_date: datetime.date = None):
+    """Writes the synthetic files of the market days from `from_date` to `to_date` where readers
+    of `reader_classes` keep their downloads, so that they read them without downloading"""
+    for day in MarketDaysHelper.get_market_days_list_for_range(from_date, to_date or from_date):
+        for reader_class in reader_classes:
+            reader = reader_class()
+            filenames = reader.get_filenames(day)
+            data = getattr(market_data, raw_file_generators[reader_class])(day.date())
+            path = reader.options.output_path_template.substitute(**{**EnvironmentSettings.Paths, **filenames})
+            with open(path, "wb") as output:
+                output.write(to_zip_bytes(filenames["primary_data_filename"], data) if path.endswith(".zip") else to_csv_bytes(data))
@@ -0,0 +1,281 @@
+"""Offline stand-in for the NSE archives serving deterministic synthetic files in the url layouts
+used by BhavCopyReader, NseIndicesNewReader, NseDerivatiesReader and NseDerivatiesOldReader.
+
+Point the readers at it with EnvironmentSettings.Urls["NseArchivesUrl"] = stand_in.base_url
+"""
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import re
+import threading
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import numpy as np
+import pandas as pd
+
+from markets_insights.core.core import MarketDaysHelper
+
+index_symbols = ["NIFTY", "BANKNIFTY", "FINNIFTY"]
+index_names = ["Nifty 50", "Nifty Bank", "Nifty Financial Services", "Nifty IT", "Nifty Auto"]
+
+
+class SyntheticMarketData:
+    """Generates `symbols` stocks with futures and `strikes` call and put strikes per expiry for
+    the current and the next `expiries - 1` monthly expiries. Prices follow a random walk seeded
+    by `seed` so that a date always produces the same files."""
+
+    def __init__(self, symbols: int = 100, strikes: int = 10, expiries: int = 3, seed: int = 0):
+        self.symbols = [f"SYM{i:04d}" for i in range(symbols)]
+        self.strikes = strikes
+        self.expiries = expiries
+        self.seed = seed
+        self.base_prices = np.random.default_rng(seed).uniform(50, 5000, symbols + len(index_symbols)).round(2)
+
+    def get_rng(self, for_date: date, stream: int) -> np.random.Generator:
+        return np.random.default_rng([self.seed, stream, for_date.toordinal()])
+
+    def get_prices(self, for_date: date, base_prices: np.ndarray, stream: int) -> dict:
+        rng = self.get_rng(for_date, stream)
+        drift = 1 + (for_date.toordinal() % 50 - 25) / 1000
+        close = (base_prices * drift * rng.uniform(0.97, 1.03, len(base_prices))).round(2)
+        open_price = (close * rng.uniform(0.98, 1.02, len(close))).round(2)
+        return {
+            "open": open_price,
+            "high": (np.maximum(open_price, close) * rng.uniform(1, 1.02, len(close))).round(2),
+            "low": (np.minimum(open_price, close) * rng.uniform(0.98, 1, len(close))).round(2),
+            "close": close,
+            "previous_close": (close * rng.uniform(0.97, 1.03, len(close))).round(2),
+            "volume": rng.integers(100, 1_000_000, len(close)),
+        }
+
+    def get_expiry_dates(self, for_date: date) -> list[date]:
+        expiry_dates = []
+        month_start = date(for_date.year, for_date.month, 1)
+        while len(expiry_dates) < self.expiries:
+            expiry = MarketDaysHelper.get_this_or_previous_market_day(
+                MarketDaysHelper.get_last_thursday(month_start.year, month_start.month)
+            )
+            if expiry >= for_date:
+                expiry_dates.append(expiry)
+            month_start = (pd.Timestamp(month_start) + pd.offsets.MonthBegin(1)).date()
+        return expiry_dates
+
+    def bhavcopy(self, for_date: date) -> pd.DataFrame:
+        prices = self.get_prices(for_date, self.base_prices[: len(self.symbols)], 1)
+        return pd.DataFrame(
+            {
+                "SYMBOL": self.symbols,
+                "SERIES": ["EQ" if i % 10 else "BE" for i in range(len(self.symbols))],
+                "OPEN": prices["open"],
+                "HIGH": prices["high"],
+                "LOW": prices["low"],
+                "CLOSE": prices["close"],
+                "LAST": prices["close"],
+                "PREVCLOSE": prices["previous_close"],
+                "TOTTRDQTY": prices["volume"],
+                "TOTTRDVAL": (prices["volume"] * prices["close"]).round(2),
+                "TIMESTAMP": for_date.strftime("%d-%b-%Y").upper(),
+                "TOTALTRADES": prices["volume"] // 10,
+                "ISIN": [f"INE{i:06d}01010" for i in range(len(self.symbols))],
+                "": "",
+            }
+        )
+
+    def indices(self, for_date: date) -> pd.DataFrame:
+        base_prices = np.linspace(10000, 50000, len(index_names)).round(2)
+        prices = self.get_prices(for_date, base_prices, 2)
+        data = pd.DataFrame(
+            {
+                "Index Name": index_names,
+                "Index Date": for_date.strftime("%d-%m-%Y"),
+                "Open Index Value": prices["open"].astype(object),
+                "High Index Value": prices["high"].astype(object),
+                "Low Index Value": prices["low"].astype(object),
+                "Closing Index Value": prices["close"],
+                "Points Change": (prices["close"] - prices["previous_close"]).round(2),
+                "Change(%)": ((prices["close"] / prices["previous_close"] - 1) * 100).round(2),
+                "Volume": prices["volume"].astype(object),
+                "Turnover (Rs. Cr.)": (prices["volume"] * prices["close"] / 1e7).round(2),
+                "P/E": 20.5,
+                "P/B": 3.5,
+                "Div Yield": 1.2,
+            }
+        )
+        # the archive reports "-" for the values of indices without trading
+        data.loc[len(data) - 1, ["Open Index Value", "High Index Value", "Low Index Value", "Volume"]] = "-"
+        return data
+
+    def derivatives(self, for_date: date) -> pd.DataFrame:
+        """Contracts in the columns of the old F&O bhavcopy with one row per future and option"""
+        underlyings = index_symbols + self.symbols
+        prices = self.get_prices(for_date, np.concatenate([self.base_prices[len(self.symbols):], self.base_prices[: len(self.symbols)]]), 3)
+        is_index = np.arange(len(underlyings)) < len(index_symbols)
+
+        strike_steps = np.arange(self.strikes) - self.strikes // 2
+        frames = []
+        for expiry_no, expiry in enumerate(self.get_expiry_dates(for_date)):
+            futures = pd.DataFrame(
+                {
+                    "INSTRUMENT": np.where(is_index, "FUTIDX", "FUTSTK"),
+                    "SYMBOL": underlyings,
+                    "EXPIRY_DT": expiry,
+                    "STRIKE_PR": 0.0,
+                    "OPTION_TYP": "XX",
+                    "UNDERLYING": prices["close"],
+                }
+            )
+            strikes = (np.round(prices["close"][:, None] / 50) * 50 + strike_steps[None, :] * 50).ravel()
+            options = pd.DataFrame(
+                {
+                    "INSTRUMENT": np.repeat(np.where(is_index, "OPTIDX", "OPTSTK"), self.strikes),
+                    "SYMBOL": np.repeat(underlyings, self.strikes),
+                    "EXPIRY_DT": expiry,
+                    "STRIKE_PR": strikes,
+                    "UNDERLYING": np.repeat(prices["close"], self.strikes),
+                }
+            )
+            options = pd.concat([options.assign(OPTION_TYP="CE"), options.assign(OPTION_TYP="PE")])
+            frames += [futures, options]
+
+        data = pd.concat(frames, ignore_index=True)
+        rng = self.get_rng(for_date, 4)
+        is_future = data["OPTION_TYP"] == "XX"
+        intrinsic = np.where(
+            data["OPTION_TYP"] == "CE",
+            data["UNDERLYING"] - data["STRIKE_PR"],
+            data["STRIKE_PR"] - data["UNDERLYING"],
+        ).clip(0)
+        close = np.where(is_future, data["UNDERLYING"] * 1.002, intrinsic + data["UNDERLYING"] * 0.01)
+        close = (close * rng.uniform(0.95, 1.05, len(data))).round(2)
+        data["OPEN"] = (close * rng.uniform(0.97, 1.03, len(data))).round(2)
+        data["HIGH"] = (np.maximum(data["OPEN"], close) * 1.01).round(2)
+        data["LOW"] = (np.minimum(data["OPEN"], close) * 0.99).round(2)
+        data["CLOSE"] = close
+        data["SETTLE_PR"] = close
+        data["CONTRACTS"] = rng.integers(0, 50_000, len(data))
+        data["VAL_INLAKH"] = (data["CONTRACTS"] * close / 1e5).round(2)
+        data["OPEN_INT"] = np.where(rng.uniform(size=len(data)) < 0.1, 0, rng.integers(1, 5_000_000, len(data)))
+        data["CHG_IN_OI"] = rng.integers(-10_000, 10_000, len(data))
+        data["PREVCLOSE"] = (close * rng.uniform(0.95, 1.05, len(data))).round(2)
+        return data.drop(columns="UNDERLYING")
+
+    def derivatives_old(self, for_date: date) -> pd.DataFrame:
+        data = self.derivatives(for_date).drop(columns="PREVCLOSE")
+        data["EXPIRY_DT"] = data["EXPIRY_DT"].map(lambda x: x.strftime("%d-%b-%Y"))
+        data["TIMESTAMP"] = for_date.strftime("%d-%b-%Y").upper()
+        data[""] = ""
+        return data
+
+    def derivatives_new(self, for_date: date) -> pd.DataFrame:
+        data = self.derivatives(for_date)
+        return pd.DataFrame(
+            {
+                "TradDt": for_date.isoformat(),
+                "BizDt": for_date.isoformat(),
+                "Sgmt": "FO",
+                "Src": "NSE",
+                "FinInstrmTp": data["INSTRUMENT"].map({"FUTIDX": "IDF", "FUTSTK": "STF", "OPTIDX": "IDO", "OPTSTK": "STO"}),
+                "TckrSymb": data["SYMBOL"],
+                "XpryDt": data["EXPIRY_DT"].map(lambda x: x.isoformat()),
+                "StrkPric": data["STRIKE_PR"].where(data["OPTION_TYP"] != "XX"),
+                "OptnTp": data["OPTION_TYP"].where(data["OPTION_TYP"] != "XX"),
+                "FinInstrmNm": data["INSTRUMENT"],
+                "OpnPric": data["OPEN"],
+                "HghPric": data["HIGH"],
+                "LwPric": data["LOW"],
+                "ClsPric": data["CLOSE"],
+                "LastPric": data["CLOSE"],
+                "PrvsClsgPric": data["PREVCLOSE"],
+                "SttlmPric": data["SETTLE_PR"],
+                "OpnIntrst": data["OPEN_INT"],
+                "ChngInOpnIntrst": data["CHG_IN_OI"],
+                "PctgChngInOpnIntrst": (data["CHG_IN_OI"] / data["OPEN_INT"].clip(1) * 100).round(2),
+                "TtlTradgVol": data["CONTRACTS"],
+                "TtlTrfVal": data["VAL_INLAKH"] * 1e5,
+                "SsnId": "F1",
+            }
+        )
+
+
+def to_csv_bytes(data: pd.DataFrame) -> bytes:
+    return data.to_csv(index=False).encode()
+
+
+def to_zip_bytes(filename: str, data: pd.DataFrame) -> bytes:
+    archive = io.BytesIO()
+    with ZipFile(archive, "w", compression=ZIP_DEFLATED) as zf:
+        zf.writestr(filename, to_csv_bytes(data))
+    return archive.getvalue()
+
+
+class NseArchiveStandIn:
+    """Local http server answering the NSE archive urls of market days with synthetic files and
+    404 for every other date"""
+
+    routes = [
+        (re.compile(r"^/content/historical/EQUITIES/\d{4}/[A-Z]{3}/cm(\d{2}[A-Z]{3}\d{4})bhav\.csv\.zip$"), "%d%b%Y", "bhavcopy"),
+        (re.compile(r"^/content/indices/ind_close_all_(\d{8})\.csv$"), "%d%m%Y", "indices"),
+        (re.compile(r"^/content/fo/NSE_FO_bhavcopy_(\d{8})\.csv$"), "%d%m%Y", "derivatives_new"),
+        (re.compile(r"^/content/historical/DERIVATIVES/\d{4}/[A-Z]{3}/fo(\d{2}[A-Z]{3}\d{4})bhav\.csv\.zip$"), "%d%b%Y", "derivatives_old"),
+    ]
+
+    def __init__(self, market_data: SyntheticMarketData = None):
+        self.market_data = market_data or SyntheticMarketData()
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.server = None
+
+    def get_file(self, path: str) -> bytes:
+        for pattern, date_format, generator in self.routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+
+            for_date = datetime.strptime(match.group(1).title(), date_format).date()
+            if not MarketDaysHelper.is_open_for_day(for_date):
+                return None
+
+            data = getattr(self.market_data, generator)(for_date)
+            filename = path.rsplit("/", 1)[-1]
+            if filename.endswith(".zip"):
+                return to_zip_bytes(filename[: -len(".zip")], data)
+            return to_csv_bytes(data)
+        return None
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with stand_in.lock:
+                    stand_in.requests += 1
+                body = stand_in.get_file(self.path)
+                self.send_response(404 if body is None else 200)
+                body = body or b"Not Found"
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
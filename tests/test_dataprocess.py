@@ -135,4 +135,28 @@ def test_historical_data_processor_with_filter():
         DateRangeCriteria(Presets.dates.year_start, Presets.dates.year_end),
     )
 
-    assert len(result.get_daily_data()[BaseColumns.Identifier].unique()) == 1
\ No newline at end of file
+    assert len(result.get_daily_data()[BaseColumns.Identifier].unique()) == 1
+
+def test_historical_data_processor_in_batches():
+    from datetime import date
+    from helper import SyntheticDailyReader
+    from markets_insights.calculations.base import SmaCalculationWorker, LowestPriceInNextNDaysCalculationWorker
+    from markets_insights.dataprocess.data_processor import CalculationPipelineBuilder, MultiDataCalculationPipelines
+
+    pipelines = MultiDataCalculationPipelines()
+    pipelines.set_item("sma", CalculationPipelineBuilder.create_pipeline_for_worker(SmaCalculationWorker(5)))
+    pipelines.set_item("trough", CalculationPipelineBuilder.create_pipeline_for_worker(LowestPriceInNextNDaysCalculationWorker(3)))
+    processor = HistoricalDataProcessor(HistoricalDataProcessOptions(include_annual_data=False, include_monthly_data=False))
+    processor.set_calculation_pipelines(pipelines)
+    criteria = DateRangeCriteria(date(2023, 10, 2), date(2023, 12, 29))
+
+    batches = list(processor.process_in_batches(SyntheticDailyReader(), criteria, batch_sessions=10))
+    batched = pd.concat(batches).sort_values([BaseColumns.Identifier, BaseColumns.Date]).reset_index(drop=True)
+
+    full = processor.process(SyntheticDailyReader(), criteria).get_daily_data()
+    full = pipelines.run(full).sort_values([BaseColumns.Identifier, BaseColumns.Date]).reset_index(drop=True)
+
+    assert len(batches) > 1
+    for col in ["Sma5", "TroughInNext3Sessions", BaseColumns.PreviousClose]:
+        pd.testing.assert_series_equal(batched[col], full[col])
+    assert batched[BaseColumns.PreviousClose].isna().sum() == batched[BaseColumns.Identifier].nunique()
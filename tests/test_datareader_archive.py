@@ -0,0 +1,46 @@
+from datetime import date
+import os
+from zipfile import ZipFile
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.environment import Environment, EnvironmentSettings
+from markets_insights.datareader.data_reader import BhavCopyReader, ForDateCriteria
+
+for_date = date(2023, 12, 1)
+bhavcopy_csv = """SYMBOL,SERIES,OPEN,HIGH,LOW,CLOSE,LAST,PREVCLOSE,TOTTRDQTY,TOTTRDVAL,TIMESTAMP,TOTALTRADES,ISIN,
+RELIANCE,EQ,2390.0,2400.5,2380.25,2395.1,2395.0,2388.0,100,239510.0,01-DEC-2023,10,INE002A01018,
+RELIANCE,BE,2390.0,2400.5,2380.25,2395.1,2395.0,2388.0,100,239510.0,01-DEC-2023,10,INE002A01018,
+TCS,EQ,3500.0,3510.0,3490.0,3505.0,3505.0,3499.0,50,175250.0,01-DEC-2023,5,INE467B01029,
+"""
+
+
+@pytest.fixture
+def bhavcopy_archive(tmp_path, monkeypatch):
+    monkeypatch.setitem(EnvironmentSettings.Paths, "DataBaseDir", str(tmp_path))
+    Environment.setup(str(tmp_path))
+    bhav_dir = os.path.join(str(tmp_path), EnvironmentSettings.Paths["RawDataDir"], EnvironmentSettings.Paths["BhavDataDir"])
+    with ZipFile(os.path.join(bhav_dir, "cm01DEC2023bhav.csv.zip"), "w") as zf:
+        zf.writestr("cm01DEC2023bhav.csv", bhavcopy_csv)
+    return bhav_dir
+
+
+def test_read_from_archive_without_extracting(bhavcopy_archive):
+    data = BhavCopyReader().read(ForDateCriteria(for_date))
+
+    assert data[BaseColumns.Identifier].tolist() == ["RELIANCE", "TCS"]
+    assert data[BaseColumns.Close].tolist() == [2395.1, 3505.0]
+    assert os.listdir(bhavcopy_archive) == ["cm01DEC2023bhav.csv.zip"]
+
+
+def test_read_with_extraction(bhavcopy_archive):
+    reader = BhavCopyReader()
+    reader.options.extract_zip = True
+    data = reader.read(ForDateCriteria(for_date))
+
+    assert data.shape[0] == 2
+    assert os.path.exists(os.path.join(bhavcopy_archive, "cm01DEC2023bhav", "cm01DEC2023bhav.csv"))
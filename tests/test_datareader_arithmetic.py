@@ -0,0 +1,199 @@
+from collections import Counter
+from datetime import date
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+
+from helper import setup, SyntheticDailyReader
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.core import IdentifierFilter
+from markets_insights.datareader.data_reader import (
+    ArithmaticOpReader,
+    BhavCopyReader,
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    ForDateCriteria,
+    MemoryCachedDataReader,
+    ReaderOptions,
+)
+
+criteria = DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8))
+
+
+class CountingDailyReader(SyntheticDailyReader):
+    plan_key_by_value = True
+
+    def __init__(self, identifier: str):
+        super().__init__([identifier])
+        self.name = identifier
+        self.reads = Counter()
+        self.lock = threading.Lock()
+
+    def read_data_from_file(self, for_date, primary_data_filepath):
+        with self.lock:
+            self.reads[for_date] += 1
+        return super().read_data_from_file(for_date, primary_data_filepath)
+
+
+def test_repeated_readers_are_read_once():
+    a, b = CountingDailyReader("A"), CountingDailyReader("B")
+
+    data = ((a - b) / (a + b)).read(criteria)
+
+    assert set(a.reads.values()) == {1} and set(b.reads.values()) == {1}
+    assert len(a.reads) == 5
+    close_a, close_b = data["A - B-A-Close"], data["A - B-B-Close"]
+    assert data[BaseColumns.Close].round(10).tolist() == ((close_a - close_b) / (close_a + close_b)).round(10).tolist()
+
+
+def test_equal_readers_are_read_once():
+    a, other_a, b = CountingDailyReader("A"), CountingDailyReader("A"), CountingDailyReader("B")
+
+    ((a - b) / (other_a + b)).read(criteria)
+
+    assert sum(a.reads.values()) + sum(other_a.reads.values()) == 5
+    assert CountingDailyReader("A").set_filter(None).get_plan_key() == a.get_plan_key()
+    assert SyntheticDailyReader(["A"]).get_plan_key() != SyntheticDailyReader(["B"]).get_plan_key()
+
+
+def test_caches_over_differently_filtered_readers_are_read_apart():
+    cached_a = MemoryCachedDataReader(SyntheticDailyReader(["A", "B"]).set_filter(IdentifierFilter("A")))
+    cached_b = MemoryCachedDataReader(SyntheticDailyReader(["A", "B"]).set_filter(IdentifierFilter("B")))
+
+    data = (cached_a / cached_b).read(criteria)
+
+    assert cached_a.get_plan_key() != cached_b.get_plan_key()
+    assert data[BaseColumns.Identifier].unique().tolist() == ["A / B"]
+    assert (data[BaseColumns.Close] != 1.0).all()
+    assert MemoryCachedDataReader(BhavCopyReader()).get_plan_key() == MemoryCachedDataReader(BhavCopyReader()).get_plan_key()
+
+
+def test_leaves_are_read_in_parallel_only_when_asked(monkeypatch):
+    assert ReaderOptions().max_concurrent_leaf_reads == 1
+    a, b = CountingDailyReader("A"), CountingDailyReader("B")
+    reader = a - b
+    threads = set()
+    read_data_from_file = CountingDailyReader.read_data_from_file
+    monkeypatch.setattr(
+        CountingDailyReader,
+        "read_data_from_file",
+        lambda self, for_date, path: threads.add(threading.current_thread().name) or read_data_from_file(self, for_date, path),
+    )
+
+    reader.read(criteria)
+    assert threads == {threading.current_thread().name}
+
+    reader.options.max_concurrent_leaf_reads = 2
+    reader.read(criteria)
+    assert any(name.startswith(f"{reader.name}-leaves") for name in threads)
+
+
+def test_sub_expressions_are_post_processed_as_when_read_alone():
+    a, b, c = CountingDailyReader("A"), CountingDailyReader("B"), CountingDailyReader("C")
+    reader = (a - b) / c
+
+    data = reader.read(criteria)
+
+    inner = DateRangeDataReaderWrapper(a - b).read(criteria)
+    expected = reader.merge_with_operation(inner, DateRangeDataReaderWrapper(c).read(criteria))
+    columns = [BaseColumns.Identifier, BaseColumns.Date, BaseColumns.Close, "A - B-PreviousClose"]
+    pd.testing.assert_frame_equal(data[columns], expected[columns], check_categorical=False)
+    assert data["A - B-PreviousClose"].notna().sum() == 4
+
+
+def test_identical_sub_expressions_are_evaluated_once(monkeypatch):
+    a, b, c = CountingDailyReader("A"), CountingDailyReader("B"), CountingDailyReader("C")
+    reader = ((a - b) / c) + ((a - b) * c)
+    merges = []
+    merge_with_operation = ArithmaticOpReader.merge_with_operation
+    monkeypatch.setattr(
+        ArithmaticOpReader,
+        "merge_with_operation",
+        lambda self, l_data, r_data: merges.append(self.op_symbol) or merge_with_operation(self, l_data, r_data),
+    )
+
+    data = reader.read(ForDateCriteria(date(2023, 12, 4)))
+
+    assert sorted(merges) == sorted(["-", "/", "*", "+"])
+    assert data[BaseColumns.Identifier].tolist() == ["A - B / C + A - B * C"]
+    assert data[BaseColumns.Close].tolist() == (data["A - B / C-Close"] + data["A - B * C-Close"]).tolist()
+
+
+def test_result_matches_reading_each_side():
+    a, b = CountingDailyReader("A"), CountingDailyReader("B")
+
+    data = (a / b).read(criteria)
+
+    left = CountingDailyReader("A").read(ForDateCriteria(date(2023, 12, 6)))
+    right = CountingDailyReader("B").read(ForDateCriteria(date(2023, 12, 6)))
+    row = data[data[BaseColumns.Date] == pd.Timestamp("2023-12-06")]
+    assert row[BaseColumns.Close].tolist() == [left[BaseColumns.Close].iloc[0] / right[BaseColumns.Close].iloc[0]]
+    assert row[BaseColumns.Identifier].tolist() == ["A / B"]
+
+
+def frame(identifiers: list[str], days: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=days)
+    rows = len(identifiers) * days
+    return pd.DataFrame(
+        {
+            BaseColumns.Identifier: pd.Categorical(np.tile(identifiers, days)),
+            BaseColumns.Date: np.repeat(dates.to_numpy(), len(identifiers)),
+            **{col: rng.uniform(1, 2, rows) for col in [BaseColumns.Open, BaseColumns.High, BaseColumns.Low, BaseColumns.Close]},
+            BaseColumns.Volume: rng.uniform(1, 9, rows),
+        }
+    )
+
+
+def get_op_reader() -> ArithmaticOpReader:
+    l_reader, r_reader = SyntheticDailyReader(), SyntheticDailyReader()
+    l_reader.options.col_prefix, r_reader.options.col_prefix = "FO-", "Cash-"
+    return l_reader / r_reader
+
+
+@pytest.mark.parametrize(
+    "l_data,r_data,on_cols,prefix_l,prefix_r",
+    [
+        (frame(["A", "B", "C"], 20, 1), frame(["B", "C", "D"], 20, 2).sample(frac=1, random_state=0), [BaseColumns.Identifier, BaseColumns.Date], "FO-", "Cash-"),
+        (frame(["A", "B"], 20, 1), frame(["NIFTY"], 20, 2).iloc[::2], [BaseColumns.Date], "FO-", "NIFTY-"),
+    ],
+)
+def test_aligned_join_matches_merge(l_data, r_data, on_cols, prefix_l, prefix_r):
+    reader = get_op_reader()
+    expected = reader.merge_on_keys(l_data, r_data, on_cols, prefix_l, prefix_r)
+    reader.add_price_columns(expected, prefix_l, prefix_r)
+
+    data = reader.merge_with_operation(l_data, r_data)
+
+    assert list(data.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(data, expected, check_dtype=False, check_categorical=False)
+
+
+def test_duplicate_keys_fall_back_to_merge():
+    reader = get_op_reader()
+    l_data, r_data = frame(["A", "B"], 5, 1), frame(["A", "B"], 5, 2)
+    r_data = pd.concat([r_data, r_data.head(1)], ignore_index=True)
+
+    assert reader.join_with_operation(l_data, r_data, [BaseColumns.Identifier, BaseColumns.Date], "FO-", "Cash-") is None
+    data = reader.merge_with_operation(l_data, r_data)
+    assert data.shape[0] == 11
+    assert isinstance(data[BaseColumns.Identifier].dtype, pd.CategoricalDtype)
+
+    index_data = reader.merge_with_operation(l_data, pd.concat([frame(["NIFTY"], 5, 2)] * 2, ignore_index=True))
+    assert index_data.shape[0] == 20
+    assert index_data[BaseColumns.Identifier].dtype == reader.merge_with_operation(l_data, frame(["NIFTY"], 5, 2))[BaseColumns.Identifier].dtype
+
+
+def test_only_requested_side_columns_are_carried():
+    reader = get_op_reader().set_projection([BaseColumns.Volume, "FO-Close"])
+
+    data = reader.merge_with_operation(frame(["A", "B"], 5, 1), frame(["A", "B"], 5, 2))
+
+    assert list(data.columns) == [
+        BaseColumns.Identifier, BaseColumns.Date, "FO-Close", "FO-Volume", "Cash-Volume",
+        BaseColumns.Close, BaseColumns.High, BaseColumns.Low, BaseColumns.Open,
+    ]
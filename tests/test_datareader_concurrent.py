@@ -0,0 +1,100 @@
+from datetime import date
+import threading
+import time
+import pandas as pd
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader.data_reader import (
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    MultiDatesCriteria,
+    MultiDatesDataReader,
+    SingleDaySourceDataReader,
+)
+
+
+class SlowDownloadReader(SingleDaySourceDataReader):
+    def __init__(self, fetch_seconds: float = 0.1, failing_dates: list[date] = None):
+        super().__init__()
+        self.name = "slow_download"
+        self.options.unzip_file = False
+        self.fetch_seconds = fetch_seconds
+        self.failing_dates = failing_dates if failing_dates is not None else []
+        self.active_fetches = 0
+        self.max_active_fetches = 0
+        self.fetched_dates = set()
+        self.lock = threading.Lock()
+
+    def fetch_data(self, for_date):
+        if for_date in self.fetched_dates:
+            return None
+        with self.lock:
+            self.active_fetches += 1
+            self.max_active_fetches = max(self.max_active_fetches, self.active_fetches)
+        time.sleep(self.fetch_seconds)
+        with self.lock:
+            self.active_fetches -= 1
+        if pd.Timestamp(for_date).date() in self.failing_dates:
+            raise Exception("HTTP Error 404: Not Found")
+        self.fetched_dates.add(for_date)
+        return None
+
+    def read_data_from_file(self, for_date, primary_data_filepath):
+        return pd.DataFrame(
+            {
+                BaseColumns.Identifier: ["A", "B"],
+                BaseColumns.Open: [1.0, 2.0],
+                BaseColumns.High: [1.0, 2.0],
+                BaseColumns.Low: [1.0, 2.0],
+                BaseColumns.Close: [1.0, 2.0],
+                BaseColumns.Date: pd.to_datetime(for_date),
+            }
+        )
+
+
+def test_concurrent_downloads_keep_date_order():
+    reader = SlowDownloadReader()
+    reader.options.max_concurrent_downloads = 4
+    criteria = DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 15))
+
+    started = time.time()
+    data = DateRangeDataReaderWrapper(reader).read(criteria)
+    elapsed = time.time() - started
+
+    assert reader.max_active_fetches == 4
+    assert elapsed < 10 * reader.fetch_seconds
+    assert data.shape[0] == 20
+    assert data[BaseColumns.Date].is_monotonic_increasing
+
+
+def test_serial_downloads_by_default():
+    reader = SlowDownloadReader(fetch_seconds=0.01)
+    data = DateRangeDataReaderWrapper(reader).read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8)))
+
+    assert reader.max_active_fetches == 1
+    assert data.shape[0] == 10
+
+
+def test_concurrent_download_failures_are_skipped(tmp_path, monkeypatch):
+    monkeypatch.setitem(EnvironmentSettings.Paths, "DataBaseDir", str(tmp_path))
+    reader = SlowDownloadReader(fetch_seconds=0.01, failing_dates=[date(2023, 12, 6)])
+    reader.options.max_concurrent_downloads = 3
+    data = DateRangeDataReaderWrapper(reader).read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8)))
+
+    assert data.shape[0] == 8
+    assert pd.Timestamp(date(2023, 12, 6)) not in data[BaseColumns.Date].values
+
+
+def test_multi_dates_reader_collects_all_dates():
+    reader = SlowDownloadReader(fetch_seconds=0.01)
+    reader.options.max_concurrent_downloads = 2
+    for_dates = [date(2023, 12, 8), date(2023, 12, 4), date(2023, 12, 9)]
+    data = MultiDatesDataReader(reader).read(MultiDatesCriteria(for_dates))
+
+    assert data.shape[0] == 4
+    assert list(data[BaseColumns.Date].unique()) == [pd.Timestamp(date(2023, 12, 8)), pd.Timestamp(date(2023, 12, 4))]
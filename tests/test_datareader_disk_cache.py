@@ -0,0 +1,113 @@
+from contextlib import closing
+from datetime import date
+import pandas as pd
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.core import IdentifierFilter
+from markets_insights.datareader.data_reader import (
+    DateRangeCriteria,
+    DateRangeSourceDataReader,
+    DiskCachedDataReader,
+)
+
+
+class CountingRangeReader(DateRangeSourceDataReader):
+    def __init__(self):
+        super().__init__()
+        self.name = "disk_cache_source"
+        self.reads = []
+
+    def read(self, criteria: DateRangeCriteria) -> pd.DataFrame:
+        self.reads.append(criteria)
+        dates = pd.bdate_range(criteria.from_date, criteria.to_date)
+        data = pd.DataFrame(
+            {
+                BaseColumns.Identifier: pd.Categorical([identifier for _ in dates for identifier in ["A", "B", "C"]]),
+                BaseColumns.Date: [day for day in dates for _ in range(3)],
+                BaseColumns.Close: [float(day.day * 10 + offset) for day in dates for offset in range(3)],
+            }
+        )
+        return self.filter.apply(data) if self.filter else data
+
+
+def test_cached_data_survives_new_reader(data_dir):
+    criteria = DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8))
+    expected = DiskCachedDataReader(CountingRangeReader()).read(criteria)
+
+    source = CountingRangeReader()
+    data = DiskCachedDataReader(source).read(criteria)
+
+    assert source.reads == []
+    pd.testing.assert_frame_equal(data.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False, check_categorical=False)
+    assert pd.api.types.is_datetime64_any_dtype(data[BaseColumns.Date].dtype)
+
+
+def test_only_missing_ranges_are_read_from_next(data_dir):
+    DiskCachedDataReader(CountingRangeReader()).read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8)))
+
+    source = CountingRangeReader()
+    reader = DiskCachedDataReader(source)
+    data = reader.read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 15)))
+
+    assert [(criteria.from_date, criteria.to_date) for criteria in source.reads] == [(date(2023, 12, 9), date(2023, 12, 15))]
+    assert data[BaseColumns.Date].nunique() == 10
+    assert reader.options.data_availability == [DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 15))]
+    assert DiskCachedDataReader(CountingRangeReader()).options.data_availability == reader.options.data_availability
+
+
+def test_identifier_filter_reads_indexed_rows(data_dir):
+    DiskCachedDataReader(CountingRangeReader()).read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8)))
+
+    reader = DiskCachedDataReader(CountingRangeReader()).set_filter(IdentifierFilter("B"))
+    data = reader.read(DateRangeCriteria(date(2023, 12, 5), date(2023, 12, 6)))
+
+    assert data[BaseColumns.Identifier].tolist() == ["B", "B"]
+    with closing(reader.store.connect()) as connection:
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM data WHERE Date BETWEEN ? AND ? AND Identifier IN (?)",
+            ["2023-12-05", "2023-12-06", "B"],
+        ).fetchall()
+    assert "USING INDEX data_identifier_date" in str(plan)
+
+
+def test_rewritten_dates_replace_stored_rows(data_dir):
+    reader = DiskCachedDataReader(CountingRangeReader())
+    reader.on_received_more_data(CountingRangeReader().read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 5))))
+    reader.on_received_more_data(CountingRangeReader().read(DateRangeCriteria(date(2023, 12, 5), date(2023, 12, 6))))
+
+    data = reader.store.read(date(2023, 12, 4), date(2023, 12, 6))
+
+    assert data.shape[0] == 9
+
+
+def test_differently_filtered_readers_do_not_share_rows(data_dir):
+    criteria = DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8))
+    filtered = DiskCachedDataReader(CountingRangeReader().set_filter(IdentifierFilter("A")))
+    assert set(filtered.read(criteria)[BaseColumns.Identifier]) == {"A"}
+
+    source = CountingRangeReader()
+    data = DiskCachedDataReader(source).read(criteria)
+
+    assert len(source.reads) == 1
+    assert set(data[BaseColumns.Identifier]) == {"A", "B", "C"}
+    assert filtered.store.path != DiskCachedDataReader(CountingRangeReader()).store.path
+    assert DiskCachedDataReader(CountingRangeReader().set_filter(IdentifierFilter("A"))).store.path == filtered.store.path
+
+
+def test_readers_sharing_a_store_keep_each_others_ranges(data_dir):
+    first, second = DiskCachedDataReader(CountingRangeReader()), DiskCachedDataReader(CountingRangeReader())
+    first.read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8)))
+    second.read(DateRangeCriteria(date(2023, 12, 18), date(2023, 12, 22)))
+
+    source = CountingRangeReader()
+    DiskCachedDataReader(source).read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 22)))
+
+    assert [(criteria.from_date, criteria.to_date) for criteria in source.reads] == [(date(2023, 12, 9), date(2023, 12, 17))]
+    assert second.options.data_availability == [
+        DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8)),
+        DateRangeCriteria(date(2023, 12, 18), date(2023, 12, 22)),
+    ]
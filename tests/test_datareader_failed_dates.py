@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+from urllib.error import HTTPError
+import pandas as pd
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.datareader.data_reader import (
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    FetchStatus,
+    MultiDatesCriteria,
+    MultiDatesDataReader,
+    SingleDaySourceDataReader,
+)
+from markets_insights.datareader.manifest import FailedDates
+
+holiday = date(2023, 12, 6)
+
+
+class HolidayReader(SingleDaySourceDataReader):
+    def __init__(self, missing_dates: list[date]):
+        super().__init__()
+        self.name = "holiday_reader"
+        self.options.unzip_file = False
+        self.missing_dates = missing_dates
+        self.fetch_attempts = []
+
+    def fetch_data(self, for_date):
+        self.fetch_attempts.append(pd.Timestamp(for_date).date())
+        if pd.Timestamp(for_date).date() in self.missing_dates:
+            raise HTTPError("https://example.com", 404, "Not Found", None, None)
+        return None
+
+    def read_data_from_file(self, for_date, primary_data_filepath):
+        return pd.DataFrame(
+            {
+                BaseColumns.Identifier: ["A"],
+                BaseColumns.Open: [1.0],
+                BaseColumns.High: [1.0],
+                BaseColumns.Low: [1.0],
+                BaseColumns.Close: [1.0],
+                BaseColumns.Date: pd.to_datetime(for_date),
+            }
+        )
+
+
+pytestmark = pytest.mark.usefixtures("data_dir")
+
+
+def test_failed_dates_are_skipped_on_next_read():
+    criteria = DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8))
+    reader = HolidayReader([holiday])
+    DateRangeDataReaderWrapper(reader).read(criteria)
+    assert reader.get_fetch_status(holiday) == FetchStatus.UNAVAILABLE
+
+    reader = HolidayReader([holiday])
+    data = DateRangeDataReaderWrapper(reader).read(criteria)
+
+    assert holiday not in reader.fetch_attempts
+    assert data.shape[0] == 4
+
+
+def test_failed_dates_are_persisted_with_reason():
+    reader = HolidayReader([holiday])
+    MultiDatesDataReader(reader).read(MultiDatesCriteria([holiday]))
+
+    failed_date = FailedDates(reader.get_failed_dates().path).get(holiday)
+    assert failed_date.reason.startswith("HTTPError")
+    assert failed_date.expires_at - pd.Timestamp.now() > timedelta(days=29)
+
+
+def test_recent_failed_dates_expire_sooner():
+    recent_date = date.today() - timedelta(days=1)
+    reader = HolidayReader([recent_date])
+    reader.record_failed_date(recent_date, HTTPError("https://example.com", 404, "Not Found", None, None))
+
+    failed_date = reader.get_failed_dates().get(recent_date)
+    assert failed_date.expires_at - pd.Timestamp.now() <= reader.options.recent_failed_date_expiry
+
+
+def test_local_errors_expire_sooner():
+    reader = HolidayReader([])
+    reader.record_failed_date(holiday, FileNotFoundError(2, "No such file or directory", "bhav.csv"))
+
+    failed_date = reader.get_failed_dates().get(holiday)
+    assert failed_date.reason.startswith("FileNotFoundError")
+    assert failed_date.expires_at - pd.Timestamp.now() <= reader.options.recent_failed_date_expiry
+
+
+def test_expired_failed_dates_are_retried():
+    reader = HolidayReader([holiday])
+    reader.options.failed_date_expiry = timedelta(seconds=0)
+    wrapper = DateRangeDataReaderWrapper(reader)
+    wrapper.read(DateRangeCriteria(holiday, holiday))
+    wrapper.read(DateRangeCriteria(holiday, holiday))
+
+    assert reader.fetch_attempts == [holiday, holiday]
+
+
+def test_clear_failed_dates():
+    reader = HolidayReader([holiday, date(2023, 12, 13)])
+    wrapper = DateRangeDataReaderWrapper(reader)
+    wrapper.read(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 15)))
+
+    wrapper.clear_failed_dates(DateRangeCriteria(date(2023, 12, 11), date(2023, 12, 15)))
+    assert reader.get_fetch_status(holiday) == FetchStatus.UNAVAILABLE
+    assert reader.get_fetch_status(date(2023, 12, 13)) == FetchStatus.NOT_FETCHED
+
+    reader.clear_failed_dates()
+    assert reader.get_fetch_status(holiday) == FetchStatus.NOT_FETCHED
@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import multiprocessing
+import os
+import threading
+import time
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader.data_reader import BhavCopyReader, ForDateCriteria
+from markets_insights.datareader.download_client import DownloadClient
+from markets_insights.datareader.file_lock import atomic_directory, atomic_write, locked_path, umask
+from nse_stand_in import SyntheticMarketData, to_zip_bytes
+
+for_date = date(2023, 12, 1)
+
+
+class SlowStandInClient(DownloadClient):
+    """Serves the stand-in bhavcopy archive slowly enough for concurrent reads to overlap"""
+
+    def __init__(self, body: bytes):
+        super().__init__(max_retries=0)
+        self.body = body
+        self.requests = 0
+        self.requests_lock = threading.Lock()
+
+    def get(self, url: str, timeout: float = 5) -> bytes:
+        with self.requests_lock:
+            self.requests += 1
+        time.sleep(0.2)
+        return self.body
+
+
+def test_concurrent_reads_of_a_date_download_once(data_dir):
+    filenames = BhavCopyReader().get_filenames(for_date)
+    client = SlowStandInClient(
+        to_zip_bytes(filenames["primary_data_filename"], SyntheticMarketData(symbols=5).bhavcopy(for_date))
+    )
+
+    def read(_):
+        reader = BhavCopyReader()
+        reader.options.download_client = client
+        return reader.read(ForDateCriteria(for_date))
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(read, range(6)))
+
+    assert client.requests == 1
+    assert all(data[BaseColumns.Identifier].tolist() == results[0][BaseColumns.Identifier].tolist() for data in results)
+    assert not any(name.endswith((".tmp", ".lock")) for name in os.listdir(os.path.dirname(reader_output_path(filenames))))
+
+
+def reader_output_path(filenames: dict) -> str:
+    return BhavCopyReader().options.output_path_template.substitute(**{**EnvironmentSettings.Paths, **filenames})
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = str(tmp_path / "data.csv")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as output:
+            output.write(b"partial")
+            raise RuntimeError("connection reset")
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_written_files_get_the_default_mode(tmp_path):
+    path, directory_path = str(tmp_path / "data.csv"), str(tmp_path / "data")
+    with atomic_write(path) as output:
+        output.write(b"data")
+    with atomic_directory(directory_path):
+        pass
+
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~umask
+    assert os.stat(directory_path).st_mode & 0o777 == 0o777 & ~umask
+
+
+def hold_lock(path: str, log_path: str):
+    with locked_path(path):
+        with open(log_path, "a") as log:
+            log.write(f"start {os.getpid()}\n")
+        time.sleep(0.2)
+        with open(log_path, "a") as log:
+            log.write(f"end {os.getpid()}\n")
+
+
+def test_lock_is_exclusive_across_processes(tmp_path):
+    path, log_path = str(tmp_path / "data.zip"), str(tmp_path / "log.txt")
+    processes = [multiprocessing.Process(target=hold_lock, args=(path, log_path)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(log_path) as log:
+        events = [line.split() for line in log]
+    assert len(events) == 6
+    assert all(start[0] == "start" and end == ["end", start[1]] for start, end in zip(events[::2], events[1::2]))
@@ -0,0 +1,110 @@
+from datetime import date
+import pandas as pd
+import pytest
+
+from helper import setup, write_raw_files
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns, DerivativesBaseColumns
+from markets_insights.core.core import ExpiryDateFilter, FilterBase, FilterCriteria, IdentifierFilter
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader import data_reader, partition_store
+from markets_insights.datareader.data_reader import (
+    BhavCopyReader,
+    DateRangeCriteria,
+    ForDateCriteria,
+    NseDerivatiesOldReader,
+    NseIndicesNewReader,
+)
+from markets_insights.datareader.download_client import DownloadClient
+from nse_stand_in import SyntheticMarketData
+
+for_date = date(2023, 12, 1)
+market_data = SyntheticMarketData(symbols=50)
+
+
+@pytest.fixture
+def data_dir(data_dir):
+    write_raw_files(market_data, [BhavCopyReader, NseIndicesNewReader, NseDerivatiesOldReader], for_date)
+    return data_dir
+
+
+@pytest.fixture
+def normalised_rows(monkeypatch):
+    rows = []
+    normalise = data_reader.DataReader.normalise_base_column_values
+    monkeypatch.setattr(
+        data_reader.DataReader,
+        "normalise_base_column_values",
+        lambda self, data: rows.append(data.shape[0]) or normalise(self, data),
+    )
+    return rows
+
+
+def test_source_filter_uses_source_column_names():
+    reader = BhavCopyReader().set_filter(IdentifierFilter("SYM0001"))
+
+    assert str(reader.get_source_filter(["SYMBOL", "SERIES"])) == "`SYMBOL` == 'SYM0001'"
+
+
+def test_filters_on_normalised_values_are_not_pushed():
+    volume_filter = FilterBase()
+    volume_filter.add_criteria(FilterCriteria(BaseColumns.Volume, ">", 1000))
+    reader = BhavCopyReader().set_filter(volume_filter & IdentifierFilter("SYM0001"))
+
+    assert str(reader.get_source_filter(["SYMBOL", "TOTTRDQTY"])) == "`SYMBOL` == 'SYM0001'"
+
+
+def test_filter_is_applied_before_normalisation(data_dir, normalised_rows):
+    data = NseIndicesNewReader().set_filter(IdentifierFilter("Nifty Bank")).read(ForDateCriteria(for_date))
+
+    assert data[BaseColumns.Identifier].tolist() == ["Nifty Bank"]
+    assert normalised_rows == [1]
+
+
+def test_chunked_parse_matches_full_parse(data_dir, normalised_rows):
+    reader = BhavCopyReader().set_filter(IdentifierFilter("SYM0012"))
+    expected = reader.read(ForDateCriteria(for_date))
+
+    reader = BhavCopyReader().set_filter(IdentifierFilter("SYM0012"))
+    reader.options.read_chunk_rows = 7
+    data = reader.read(ForDateCriteria(for_date))
+
+    pd.testing.assert_frame_equal(data, expected)
+    assert data.shape[0] == 1
+    assert normalised_rows == [1, 1]
+
+
+def test_partition_reads_push_filters(data_dir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    # the other days of the month are not on disk, fail their downloads right away
+    monkeypatch.setitem(EnvironmentSettings.Urls, "NseArchivesUrl", "http://127.0.0.1:9")
+    reader = BhavCopyReader()
+    reader.options.download_client = DownloadClient(max_retries=0)
+    reader.compact(DateRangeCriteria(for_date, for_date))
+
+    filters = []
+    load_partition = partition_store.load_partition
+    monkeypatch.setattr(partition_store, "load_partition", lambda *args: filters.append(args[2]) or load_partition(*args))
+    reader = BhavCopyReader().set_filter(IdentifierFilter("SYM0003") & IdentifierFilter("SYM0003"))
+    data = reader.read(ForDateCriteria(for_date))
+
+    assert data[BaseColumns.Identifier].tolist() == ["SYM0003"]
+    assert filters == [((BaseColumns.Identifier, "==", "SYM0003"), (BaseColumns.Identifier, "==", "SYM0003"))]
+
+    empty = BhavCopyReader().set_filter(IdentifierFilter("UNKNOWN")).read(ForDateCriteria(for_date))
+    assert empty.empty
+
+
+def test_date_filters_match_with_and_without_push_down(data_dir, monkeypatch):
+    expiry_date = market_data.get_expiry_dates(for_date)[0]
+    reader = NseDerivatiesOldReader().set_filter(ExpiryDateFilter(expiry_date.isoformat()))
+    data = reader.read(ForDateCriteria(for_date))
+
+    monkeypatch.setattr(NseDerivatiesOldReader, "get_source_filter", lambda self, columns: None)
+    expected = NseDerivatiesOldReader().set_filter(ExpiryDateFilter(expiry_date.isoformat())).read(ForDateCriteria(for_date))
+
+    assert data.shape[0] > 0
+    assert set(data[DerivativesBaseColumns.ExpiryDate]) == {pd.Timestamp(expiry_date)}
+    pd.testing.assert_frame_equal(data, expected)
@@ -0,0 +1,63 @@
+from datetime import date
+import pandas as pd
+
+from helper import setup, SyntheticDailyReader
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.core import IdentifierFilter
+from markets_insights.datareader.data_reader import (
+    ChainedDataReader,
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    ForDateCriteria,
+    MemoryCachedDataReader,
+    MultiDatesCriteria,
+    MultiDatesDataReader,
+)
+
+dec_range = DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 15))
+
+
+def test_read_iter_single_day():
+    chunks = list(SyntheticDailyReader().read_iter(ForDateCriteria(date(2023, 12, 1))))
+    assert len(chunks) == 1
+    assert chunks[0].shape[0] == 2
+
+
+def test_read_iter_yields_each_day_in_order():
+    chunks = list(DateRangeDataReaderWrapper(SyntheticDailyReader()).read_iter(dec_range))
+    dates = [chunk[BaseColumns.Date].unique()[0] for chunk in chunks]
+
+    assert len(chunks) == 11
+    assert dates == sorted(dates)
+
+
+def test_read_iter_matches_read():
+    reader = SyntheticDailyReader().set_filter(IdentifierFilter("B"))
+    data = DateRangeDataReaderWrapper(reader).read(dec_range)
+    chunks = pd.concat(list(reader.read_iter(dec_range)), ignore_index=True)
+
+    pd.testing.assert_frame_equal(
+        data[[BaseColumns.Identifier, BaseColumns.Date, BaseColumns.Close]],
+        chunks[[BaseColumns.Identifier, BaseColumns.Date, BaseColumns.Close]],
+    )
+
+
+def test_read_iter_multi_dates():
+    for_dates = [date(2023, 12, 4), date(2023, 12, 9), date(2023, 12, 5)]
+    chunks = list(MultiDatesDataReader(SyntheticDailyReader()).read_iter(MultiDatesCriteria(for_dates)))
+    assert len(chunks) == 2
+
+
+def test_chained_read_iter_fills_cache():
+    reader = MemoryCachedDataReader(SyntheticDailyReader())
+    first = pd.concat(list(reader.read_iter(DateRangeCriteria(date(2023, 12, 4), date(2023, 12, 8)))))
+    assert first.shape[0] == 10
+
+    chunks = list(reader.read_iter(dec_range))
+    data = pd.concat(chunks)
+    assert data.shape[0] == 22
+    assert data[BaseColumns.Date].is_monotonic_increasing
+    assert reader.cached_data.shape[0] == 22
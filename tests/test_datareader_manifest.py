@@ -0,0 +1,109 @@
+from datetime import date
+import os
+from zipfile import ZipFile
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader.data_reader import (
+    BhavCopyReader,
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    FetchStatus,
+    ForDateCriteria,
+    Status,
+)
+from markets_insights.datareader.manifest import ReaderManifest
+
+bhavcopy_csv = """SYMBOL,SERIES,OPEN,HIGH,LOW,CLOSE,LAST,PREVCLOSE,TOTTRDQTY,TOTTRDVAL,TIMESTAMP,TOTALTRADES,ISIN,
+RELIANCE,EQ,2390.0,2400.5,2380.25,2395.1,2395.0,2388.0,100,239510.0,01-DEC-2023,10,INE002A01018,
+TCS,EQ,3500.0,3510.0,3490.0,3505.0,3505.0,3499.0,50,175250.0,01-DEC-2023,5,INE467B01029,
+"""
+
+
+@pytest.fixture
+def data_dir(data_dir):
+    bhav_dir = os.path.join(data_dir, EnvironmentSettings.Paths["RawDataDir"], EnvironmentSettings.Paths["BhavDataDir"])
+    for for_date in [date(2023, 12, 1), date(2023, 12, 4), date(2023, 12, 5)]:
+        filenames = BhavCopyReader().get_filenames(for_date)
+        with ZipFile(os.path.join(bhav_dir, filenames["download_filename"]), "w") as zf:
+            zf.writestr(filenames["primary_data_filename"], bhavcopy_csv)
+    return data_dir
+
+
+def test_manifest_records_fetched_dates(data_dir):
+    reader = BhavCopyReader()
+    assert reader.get_fetch_status(date(2023, 12, 1)) == FetchStatus.NOT_FETCHED
+
+    reader.read(ForDateCriteria(date(2023, 12, 1)))
+
+    assert reader.get_fetch_status(date(2023, 12, 1)) == FetchStatus.FETCHED
+    entry = reader.get_manifest().get(date(2023, 12, 1))
+    assert entry.rows == 2
+    assert entry.size > 0
+
+
+def test_manifest_is_persisted(data_dir):
+    reader = BhavCopyReader()
+    DateRangeDataReaderWrapper(reader).read(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 5)))
+
+    manifest = ReaderManifest(reader.get_manifest().path)
+    assert manifest.dates == [date(2023, 12, 1), date(2023, 12, 4), date(2023, 12, 5)]
+    assert manifest.get_ranges() == [(date(2023, 12, 1), date(2023, 12, 5))]
+
+
+def test_fetched_dates_probe_only_the_raw_file(data_dir, monkeypatch):
+    reader = BhavCopyReader()
+    reader.read(ForDateCriteria(date(2023, 12, 1)))
+
+    probed_paths = []
+    exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists", lambda path: probed_paths.append(path) or exists(path))
+    output_file_path = reader.fetch_data(date(2023, 12, 1))
+
+    assert probed_paths == [output_file_path]
+
+
+def test_deleted_raw_file_is_fetched_again(data_dir, monkeypatch):
+    reader = BhavCopyReader()
+    output_file_path = reader.fetch_data(date(2023, 12, 1))
+    reader.read(ForDateCriteria(date(2023, 12, 1)))
+    with open(output_file_path, "rb") as raw_file:
+        body = raw_file.read()
+    os.remove(output_file_path)
+
+    downloads = []
+    monkeypatch.setattr(reader.get_download_client(), "get", lambda url, timeout=5: downloads.append(url) or body)
+    data = reader.read(ForDateCriteria(date(2023, 12, 1)))
+
+    assert len(downloads) == 1 and os.path.exists(output_file_path)
+    assert data.shape[0] == 2
+    assert reader.get_fetch_status(date(2023, 12, 1)) == FetchStatus.FETCHED
+    assert ReaderManifest(reader.get_manifest().path).dates == [date(2023, 12, 1)]
+
+
+def test_has_local_data(data_dir):
+    reader = BhavCopyReader()
+    DateRangeDataReaderWrapper(reader).read(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 4)))
+
+    status = reader.has_local_data(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 8)))
+    assert status.status == Status.PARTIAL
+    assert status.availability_ranges == [DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 4))]
+    assert status.unavailability_ranges == [DateRangeCriteria(date(2023, 12, 5), date(2023, 12, 8))]
+
+    assert reader.has_local_data(ForDateCriteria(date(2023, 12, 4))).status == Status.COMPLETE
+    assert reader.has_local_data(ForDateCriteria(date(2023, 12, 5))).status == Status.NONE
+
+
+def test_manifest_merges_ranges_out_of_order(tmp_path):
+    manifest = ReaderManifest(os.path.join(str(tmp_path), "source.csv"))
+    for for_date in [date(2023, 12, 11), date(2023, 12, 1), date(2023, 12, 20), date(2023, 12, 7), date(2023, 12, 4)]:
+        manifest.record(for_date, 1, 1)
+
+    assert manifest.get_ranges() == [
+        (date(2023, 12, 1), date(2023, 12, 11)),
+        (date(2023, 12, 20), date(2023, 12, 20)),
+    ]
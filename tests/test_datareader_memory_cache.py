@@ -0,0 +1,129 @@
+from datetime import date
+import threading
+import numpy as np
+import pandas as pd
+
+from helper import setup, SyntheticDailyReader
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.datareader.data_reader import (
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    MemoryCachedDataReader,
+    concat_by_date,
+    get_date_ranges,
+)
+
+
+def read_range(reader, from_date, to_date) -> pd.DataFrame:
+    return reader.read(DateRangeCriteria(from_date, to_date))
+
+
+def test_incremental_availability_matches_full_scan():
+    reader = MemoryCachedDataReader(SyntheticDailyReader())
+    for from_date, to_date in [
+        (date(2023, 12, 11), date(2023, 12, 15)),
+        (date(2023, 11, 1), date(2023, 11, 10)),
+        (date(2023, 11, 27), date(2023, 12, 8)),
+        (date(2024, 1, 15), date(2024, 1, 19)),
+    ]:
+        read_range(reader, from_date, to_date)
+
+    assert reader.options.data_availability == get_date_ranges(reader.cached_data[BaseColumns.Date])
+    assert reader.options.data_availability == [
+        DateRangeCriteria(date(2023, 11, 1), date(2023, 11, 10)),
+        DateRangeCriteria(date(2023, 11, 28), date(2023, 12, 15)),
+        DateRangeCriteria(date(2024, 1, 15), date(2024, 1, 19)),
+    ]
+
+
+def test_insert_touches_only_its_month():
+    reader = MemoryCachedDataReader(SyntheticDailyReader())
+    read_range(reader, date(2023, 11, 1), date(2023, 12, 8))
+    november = reader.partitions[(2023, 11)]
+
+    read_range(reader, date(2023, 12, 1), date(2023, 12, 15))
+
+    assert reader.partitions[(2023, 11)] is november
+    assert reader.partitions[(2023, 12)][BaseColumns.Date].is_monotonic_increasing
+    assert reader.cached_data.shape[0] == reader.cached_data.drop_duplicates().shape[0]
+
+
+def test_least_recently_used_month_is_evicted():
+    reader = MemoryCachedDataReader(SyntheticDailyReader())
+    read_range(reader, date(2023, 10, 2), date(2023, 10, 31))
+    month_bytes = reader.get_cached_bytes()
+    reader.max_bytes = int(month_bytes * 2.5)
+
+    read_range(reader, date(2023, 11, 1), date(2023, 11, 30))
+    read_range(reader, date(2023, 10, 2), date(2023, 10, 6))
+    read_range(reader, date(2023, 12, 1), date(2023, 12, 29))
+
+    assert list(reader.partitions) == [(2023, 10), (2023, 12)]
+    assert reader.get_cached_bytes() <= reader.max_bytes
+    assert reader.options.data_availability == [
+        DateRangeCriteria(date(2023, 10, 3), date(2023, 10, 31)),
+        DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 29)),
+    ]
+
+
+def test_evicted_month_is_read_again():
+    source = SyntheticDailyReader()
+    reader = MemoryCachedDataReader(source, max_bytes=1)
+    read_range(reader, date(2023, 11, 1), date(2023, 11, 30))
+    read_range(reader, date(2023, 12, 1), date(2023, 12, 29))
+
+    data = read_range(reader, date(2023, 11, 20), date(2023, 11, 24))
+    expected = DateRangeDataReaderWrapper(SyntheticDailyReader()).read(DateRangeCriteria(date(2023, 11, 20), date(2023, 11, 24)))
+
+    assert list(reader.partitions) == [(2023, 11)]
+    assert data[BaseColumns.Close].tolist() == expected[BaseColumns.Close].tolist()
+
+
+def test_range_reads_are_slices_of_the_partition():
+    reader = MemoryCachedDataReader(SyntheticDailyReader())
+    read_range(reader, date(2023, 12, 1), date(2023, 12, 29))
+    partition = reader.partitions[(2023, 12)]
+
+    data = reader.read_cached_data(DateRangeCriteria(date(2023, 12, 5), date(2023, 12, 7)))
+
+    assert sorted(data[BaseColumns.Date].dt.day.unique()) == [5, 6, 7]
+    assert np.shares_memory(data[BaseColumns.Close].to_numpy(), partition[BaseColumns.Close].to_numpy())
+    assert reader.read_cached_data(DateRangeCriteria(date(2023, 12, 9), date(2023, 12, 10))).empty
+
+
+class BlockingRangeReader(DateRangeDataReaderWrapper):
+    """Reads through SyntheticDailyReader, waiting until `parties` ranges are being read at once"""
+
+    def __init__(self, parties: int):
+        super().__init__(SyntheticDailyReader())
+        self.barrier = threading.Barrier(parties, timeout=5)
+
+    def read(self, criteria):
+        self.barrier.wait()
+        return super().read(criteria)
+
+
+def test_gaps_are_read_concurrently():
+    reader = MemoryCachedDataReader(SyntheticDailyReader())
+    read_range(reader, date(2023, 12, 4), date(2023, 12, 8))
+    read_range(reader, date(2023, 12, 18), date(2023, 12, 22))
+
+    assert reader.options.max_concurrent_gap_reads == 1
+    reader.options.max_concurrent_gap_reads = 3
+    reader.next = BlockingRangeReader(parties=3)
+    data = read_range(reader, date(2023, 12, 1), date(2023, 12, 29))
+
+    expected = DateRangeDataReaderWrapper(SyntheticDailyReader()).read(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 29)))
+    assert data[BaseColumns.Date].is_monotonic_increasing
+    assert data[BaseColumns.Close].tolist() == expected[BaseColumns.Close].tolist()
+
+
+def test_concat_by_date_sorts_only_overlapping_frames():
+    frame = lambda days: pd.DataFrame({BaseColumns.Date: pd.to_datetime([f"2023-12-{day:02d}" for day in days]), "Day": days})
+
+    assert concat_by_date([frame([4, 5]), frame([1, 2])])["Day"].tolist() == [1, 2, 4, 5]
+    assert concat_by_date([frame([1, 4]), frame([2, 3])])["Day"].tolist() == [1, 2, 3, 4]
+    assert concat_by_date([frame([1, 1]), frame([]), frame([1, 2])])["Day"].tolist() == [1, 1, 1, 2]
@@ -0,0 +1,92 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.datareader.data_reader import DataReader, is_plain_number
+
+
+def row_wise_normalise(data: pd.DataFrame) -> pd.DataFrame:
+    """Reference implementation normalise_base_column_values used to have"""
+    for col_name in [BaseColumns.Open, BaseColumns.High, BaseColumns.Low]:
+        data[col_name] = data.apply(
+            lambda x: x[col_name]
+            if str(x[col_name]).replace(".", "").isnumeric() == True
+            else x[BaseColumns.Close],
+            axis=1,
+        )
+        data[col_name] = data[col_name].astype(float)
+
+    data[BaseColumns.PreviousClose] = data.groupby(
+        BaseColumns.Identifier
+    )[BaseColumns.Close].transform(lambda x: x.shift(1))
+
+    for col_name in [BaseColumns.Volume, BaseColumns.Turnover]:
+        if col_name in data.columns:
+            data[col_name] = (
+                data[col_name]
+                .apply(
+                    lambda val: val
+                    if str(val).replace(".", "").isnumeric() == True
+                    else math.nan
+                )
+                .astype(float)
+            )
+        else:
+            data[col_name] = 0
+    return data
+
+
+edge_values = [12.5, 0.0, -0.0, -3.5, math.nan, 1e-05, 0.0001, 1e16, 9999999999999998.0, math.inf, 7.0]
+
+
+def make_frame(open_values, volume_values) -> pd.DataFrame:
+    count = len(open_values)
+    return pd.DataFrame(
+        {
+            BaseColumns.Identifier: ["A", "B", "A", "C", "B", "A", "C", "B", "A", "C", "B"][:count],
+            BaseColumns.Open: open_values,
+            BaseColumns.High: open_values,
+            BaseColumns.Low: open_values,
+            BaseColumns.Close: [float(i + 1) for i in range(count)],
+            BaseColumns.Volume: volume_values,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "open_values,volume_values",
+    [
+        (edge_values, edge_values),
+        ([1, 2, -3, 0, 5], [10, -1, 0, 3, 4]),
+        (["12.5", "-", "1.2", " 3", "-4", "nan", "1e5"], ["100", "-", "7", "", "2.5", "x", "0"]),
+        ([12.5, "-", 3, None, "7.25"], [1.5, "-", 3, None, "8"]),
+    ],
+)
+def test_normalise_matches_row_wise(open_values, volume_values):
+    expected = row_wise_normalise(make_frame(open_values, volume_values))
+    actual = DataReader().normalise_base_column_values(make_frame(open_values, volume_values))
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_normalise_string_columns():
+    data = make_frame(["1.5", "-", "2"], ["10", "-", "2"])
+    data[BaseColumns.Open] = data[BaseColumns.Open].astype("string")
+    data[BaseColumns.Volume] = data[BaseColumns.Volume].astype("string")
+    actual = DataReader().normalise_base_column_values(data)
+
+    assert actual[BaseColumns.Open].tolist() == [1.5, 2.0, 2.0]
+    assert actual[BaseColumns.Volume].tolist()[0] == 10.0
+    assert np.isnan(actual[BaseColumns.Volume].tolist()[1])
+
+
+def test_is_plain_number_on_floats():
+    assert is_plain_number(pd.Series(edge_values)).tolist() == [
+        str(val).replace(".", "").isnumeric() for val in edge_values
+    ]
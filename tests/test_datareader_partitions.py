@@ -0,0 +1,67 @@
+from datetime import date
+import os
+import pandas as pd
+import pytest
+
+from helper import setup, SyntheticDailyReader
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.core import IdentifierFilter
+from markets_insights.datareader.data_reader import (
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    ForDateCriteria,
+)
+
+pytest.importorskip("pyarrow")
+
+
+class CountingReader(SyntheticDailyReader):
+    def __init__(self):
+        super().__init__(identifiers=["A", "B", "C"])
+        self.files_read = 0
+
+    def read_data_from_file(self, for_date, primary_data_filepath):
+        self.files_read += 1
+        return super().read_data_from_file(for_date, primary_data_filepath)
+
+
+def test_compact_writes_monthly_partitions(data_dir):
+    paths = CountingReader().compact(DateRangeCriteria(date(2023, 11, 20), date(2023, 12, 10)))
+
+    assert [os.path.basename(path) for path in paths] == ["2023-11.parquet", "2023-12.parquet"]
+    assert pd.read_parquet(paths[1])[BaseColumns.Date].nunique() == 20
+
+
+def test_reads_are_served_from_partitions(data_dir):
+    criteria = DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 29))
+    expected = DateRangeDataReaderWrapper(CountingReader()).read(criteria)
+
+    CountingReader().compact(criteria)
+    reader = CountingReader()
+    actual = DateRangeDataReaderWrapper(reader).read(criteria)
+
+    assert reader.files_read == 0
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_partition_reads_apply_filter(data_dir):
+    CountingReader().compact(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 29)))
+    reader = CountingReader().set_filter(IdentifierFilter("B"))
+    data = reader.read(ForDateCriteria(date(2023, 12, 4)))
+
+    assert reader.files_read == 0
+    assert data[BaseColumns.Identifier].tolist() == ["B"]
+
+
+def test_days_missing_from_partition_read_raw_files(data_dir):
+    CountingReader().compact(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 1)))
+    store = CountingReader().get_partition_store()
+    partition = pd.read_parquet(store.get_path(date(2023, 12, 1)))
+    store.write(date(2023, 12, 1), partition[partition[BaseColumns.Date] < pd.Timestamp(2023, 12, 15)])
+
+    reader = CountingReader()
+    DateRangeDataReaderWrapper(reader).read(DateRangeCriteria(date(2023, 12, 11), date(2023, 12, 19)))
+    assert reader.files_read == 3
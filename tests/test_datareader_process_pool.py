@@ -0,0 +1,113 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import os
+import pandas as pd
+import pytest
+
+from helper import setup, SyntheticDailyReader, write_raw_files
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.core import IdentifierFilter
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader import data_reader
+from markets_insights.datareader.data_reader import (
+    BhavCopyReader,
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    FetchStatus,
+    NseIndexOptionsDataReader,
+    NseDerivatiesReader,
+)
+from markets_insights.datareader.download_client import DownloadClient
+from markets_insights.datareader.manifest import FailedDates, ReaderManifest
+from nse_stand_in import SyntheticMarketData
+
+dec_range = DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 29))
+market_data = SyntheticMarketData(symbols=30, strikes=4, expiries=2)
+
+
+@pytest.fixture
+def data_dir(data_dir):
+    write_raw_files(market_data, [BhavCopyReader, NseDerivatiesReader], dec_range.from_date, dec_range.to_date)
+    return data_dir
+
+
+@pytest.mark.parametrize("reader_class", [BhavCopyReader, NseIndexOptionsDataReader])
+def test_process_pool_read_matches_serial_read(data_dir, reader_class):
+    expected = DateRangeDataReaderWrapper(reader_class()).read(dec_range)
+
+    reader = reader_class()
+    reader.options.parse_processes = 2
+    reader.options.download_client = DownloadClient(max_retries=0)
+    data = DateRangeDataReaderWrapper(reader).read(dec_range)
+
+    pd.testing.assert_frame_equal(data.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_shards_are_reassembled_in_date_order(data_dir):
+    reader = BhavCopyReader().set_filter(IdentifierFilter("SYM0002"))
+    reader.options.parse_processes = 3
+    datelist = DateRangeDataReaderWrapper(reader).get_open_dates(dec_range)
+
+    data = data_reader.read_for_dates_in_processes(reader, datelist)
+
+    assert data[BaseColumns.Identifier].tolist() == ["SYM0002"] * len(datelist)
+    assert data[BaseColumns.Date].is_monotonic_increasing
+    assert isinstance(data[BaseColumns.Identifier].dtype, pd.CategoricalDtype)
+
+
+def test_records_of_processes_are_written_once_by_parent(data_dir, monkeypatch):
+    # the first and the last day are not on disk and land in different shards, their downloads fail right away
+    monkeypatch.setitem(EnvironmentSettings.Urls, "NseArchivesUrl", "http://127.0.0.1:9")
+    reader = BhavCopyReader()
+    datelist = DateRangeDataReaderWrapper(reader).get_open_dates(dec_range)
+    missing_dates = [datelist[0], datelist[-1]]
+    for for_date in missing_dates:
+        filenames = reader.get_filenames(for_date)
+        os.remove(reader.options.output_path_template.substitute(**{**EnvironmentSettings.Paths, **filenames}))
+    reader.options.parse_processes = 2
+    reader.options.download_client = DownloadClient(max_retries=0)
+
+    data = DateRangeDataReaderWrapper(reader).read(dec_range)
+
+    assert data[BaseColumns.Date].nunique() == len(datelist) - 2
+    assert [reader.get_fetch_status(for_date) for for_date in missing_dates] == [FetchStatus.UNAVAILABLE] * 2
+    assert sorted(FailedDates(reader.get_failed_dates().path).entries) == [pd.Timestamp(day).date() for day in missing_dates]
+    assert ReaderManifest(reader.get_manifest().path).dates == [pd.Timestamp(day).date() for day in datelist[1:-1]]
+    assert reader.get_manifest().dates == ReaderManifest(reader.get_manifest().path).dates
+
+
+def test_caller_pool_is_used(data_dir, monkeypatch):
+    monkeypatch.setattr(data_reader, "get_parse_pool", lambda processes: pytest.fail("shared pool used"))
+    expected = DateRangeDataReaderWrapper(BhavCopyReader()).read(dec_range)
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        reader = BhavCopyReader()
+        reader.options.parse_processes = 2
+        reader.options.parse_pool = pool
+        results = [DateRangeDataReaderWrapper(reader).read(dec_range) for _ in range(2)]
+
+    for data in results:
+        pd.testing.assert_frame_equal(data.reset_index(drop=True), expected.reset_index(drop=True))
+    assert reader.options.parse_pool is pool
+
+
+def test_shared_pool_is_reused():
+    assert data_reader.get_parse_pool(2) is data_reader.get_parse_pool(2)
+
+
+class MixedTypesReader(SyntheticDailyReader):
+    def read_data_from_file(self, for_date, primary_data_filepath):
+        return super().read_data_from_file(for_date, primary_data_filepath).assign(Series=["EQ", 1])
+
+
+def test_frames_arrow_cannot_convert_are_pickled(data_dir):
+    pytest.importorskip("pyarrow")
+    settings = (dict(EnvironmentSettings.Paths), dict(EnvironmentSettings.Urls), dict(EnvironmentSettings.Caches))
+
+    shard_data, _, _ = data_reader.read_shard(MixedTypesReader(), [date(2023, 12, 4), date(2023, 12, 5)], settings)
+
+    assert isinstance(shard_data, pd.DataFrame)
+    assert shard_data["Series"].tolist() == ["EQ", 1, "EQ", 1]
@@ -0,0 +1,97 @@
+from datetime import date
+import pandas as pd
+import pytest
+
+from helper import setup, SyntheticDailyReader, write_raw_files
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns, DerivativesBaseColumns
+from markets_insights.core.core import IdentifierFilter
+from markets_insights.datareader.data_reader import (
+    BhavCopyReader,
+    DataReader,
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    ForDateCriteria,
+    NseDerivatiesReader,
+    NseIndexOptionsDataReader,
+    NseIndicesNewReader,
+)
+from nse_stand_in import SyntheticMarketData
+
+for_date = date(2023, 12, 1)
+market_data = SyntheticMarketData(symbols=20, strikes=4, expiries=2)
+
+
+@pytest.fixture
+def data_dir(data_dir):
+    write_raw_files(market_data, [BhavCopyReader, NseIndicesNewReader, NseDerivatiesReader], date(2023, 12, 1), date(2023, 12, 31))
+    return data_dir
+
+
+@pytest.mark.parametrize("reader_class", [BhavCopyReader, NseIndicesNewReader])
+def test_projection_drops_unused_source_columns(data_dir, reader_class):
+    expected = reader_class().read(ForDateCriteria(for_date))
+    data = reader_class().set_projection([]).read(ForDateCriteria(for_date))
+
+    assert set(data.columns) < set(expected.columns)
+    assert set(data.columns) >= set([BaseColumns.Identifier, BaseColumns.Date, BaseColumns.Close, BaseColumns.Volume])
+    pd.testing.assert_frame_equal(data, expected[data.columns])
+
+
+def test_projection_keeps_requested_and_filter_columns(data_dir):
+    reader = BhavCopyReader().set_filter(IdentifierFilter("SYM0003")).set_projection(["ISIN"])
+
+    data = reader.read(ForDateCriteria(for_date))
+
+    assert "ISIN" in data.columns and "TOTALTRADES" not in data.columns
+    assert data[BaseColumns.Identifier].tolist() == ["SYM0003"]
+
+
+def test_derivatives_projection(data_dir):
+    expected = NseIndexOptionsDataReader().read(ForDateCriteria(for_date))
+    data = NseIndexOptionsDataReader().set_projection([]).read(ForDateCriteria(for_date))
+
+    assert "SttlmPric" not in data.columns and "SttlmPric" in expected.columns
+    assert DerivativesBaseColumns.OpenInterest in data.columns
+    pd.testing.assert_frame_equal(data, expected[data.columns])
+
+
+def test_compact_ignores_projection_and_partition_reads_project(data_dir):
+    expected = BhavCopyReader().read(ForDateCriteria(for_date))
+    reader = BhavCopyReader().set_projection([])
+    reader.compact(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 31)))
+
+    assert "ISIN" in reader.get_partition_store().read_month(for_date).columns
+
+    data = reader.read(ForDateCriteria(for_date))
+
+    assert "ISIN" not in data.columns
+    assert data[BaseColumns.Close].tolist() == expected[BaseColumns.Close].tolist()
+
+
+def test_projection_is_propagated_to_wrapped_reader(data_dir):
+    reader = BhavCopyReader()
+    wrapper = DateRangeDataReaderWrapper(reader).set_projection([BaseColumns.Close])
+
+    data = wrapper.read(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 5)))
+
+    assert reader.projection == [BaseColumns.Close]
+    assert "ISIN" not in data.columns
+
+
+def test_restoring_projections_keeps_wrapped_readers_own():
+    l_reader, r_reader = SyntheticDailyReader(["A"]), SyntheticDailyReader(["B"])
+    l_reader.set_projection([BaseColumns.Volume])
+    reader = l_reader / r_reader
+
+    # as the data processor does around its reads
+    previous_projections = reader.get_projections()
+    reader.set_projection([BaseColumns.Close])
+    assert l_reader.projection == [BaseColumns.Close] and r_reader.projection == [BaseColumns.Close]
+    DataReader.restore_projections(previous_projections)
+
+    assert reader.projection is None
+    assert l_reader.projection == [BaseColumns.Volume]
+    assert r_reader.projection is None
@@ -0,0 +1,87 @@
+from datetime import date
+import pandas as pd
+import pytest
+
+from helper import setup, write_raw_files
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns, DerivativesBaseColumns
+from markets_insights.datareader.data_reader import (
+    BhavCopyReader,
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    ForDateCriteria,
+    NseDerivatiesReader,
+    NseIndexOptionsDataReader,
+)
+from markets_insights.datareader.schema import ReaderSchema, concat_categories
+from nse_stand_in import SyntheticMarketData
+
+for_date = date(2023, 12, 1)
+market_data = SyntheticMarketData(symbols=20, strikes=10, expiries=3)
+
+
+@pytest.fixture
+def data_dir(data_dir):
+    write_raw_files(market_data, [BhavCopyReader, NseDerivatiesReader], date(2023, 12, 1), date(2023, 12, 31))
+    return data_dir
+
+
+def test_schema_skips_missing_and_typed_columns():
+    schema = ReaderSchema(categories=["Identifier", "Missing"], dates={"ExpiryDate": "%d-%b-%Y"}, numerics=["Close"])
+    data = pd.DataFrame({"Identifier": ["A", "B"], "ExpiryDate": ["28-Dec-2023", "25-JAN-2024"], "Close": [1.5, 2.5]})
+
+    typed = schema.apply(data, compact_numerics=True)
+
+    assert isinstance(typed["Identifier"].dtype, pd.CategoricalDtype)
+    assert typed["ExpiryDate"].tolist() == [pd.Timestamp("2023-12-28"), pd.Timestamp("2024-01-25")]
+    assert typed["Close"].dtype == "float32"
+
+
+def test_concat_keeps_categories():
+    frames = [
+        pd.DataFrame({"Identifier": pd.Categorical(["A", "B"])}),
+        pd.DataFrame({"Identifier": pd.Categorical(["C"])}),
+    ]
+
+    data = pd.concat(concat_categories(frames), ignore_index=True)
+
+    assert isinstance(data["Identifier"].dtype, pd.CategoricalDtype)
+    assert data["Identifier"].tolist() == ["A", "B", "C"]
+
+
+def test_derivatives_columns_are_typed(data_dir):
+    data = NseIndexOptionsDataReader().read(ForDateCriteria(for_date))
+
+    for column in [BaseColumns.Identifier, DerivativesBaseColumns.InstrumentType, DerivativesBaseColumns.OptionType]:
+        assert isinstance(data[column].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(data[DerivativesBaseColumns.ExpiryDate].dtype)
+    assert data[BaseColumns.Close].dtype == "float64"
+
+
+def test_range_read_is_typed_and_compact(data_dir):
+    reader = NseIndexOptionsDataReader()
+    reader.options.compact_numerics = True
+    data = DateRangeDataReaderWrapper(reader).read(DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 29)))
+
+    assert isinstance(data[BaseColumns.Identifier].dtype, pd.CategoricalDtype)
+    assert data[BaseColumns.Close].dtype == "float32"
+
+    untyped = data.astype(
+        {
+            BaseColumns.Identifier: object,
+            DerivativesBaseColumns.InstrumentType: object,
+            DerivativesBaseColumns.OptionType: object,
+            DerivativesBaseColumns.ExpiryDate: str,
+            **{column: "float64" for column in data.columns if data[column].dtype == "float32"},
+        }
+    )
+    assert data.memory_usage(deep=True).sum() * 2 <= untyped.memory_usage(deep=True).sum()
+
+
+def test_bhavcopy_series_is_categorical(data_dir):
+    data = BhavCopyReader().read(ForDateCriteria(for_date))
+
+    assert isinstance(data["SERIES"].dtype, pd.CategoricalDtype)
+    assert set(data["SERIES"]) == {"EQ"}
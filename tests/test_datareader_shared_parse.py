@@ -0,0 +1,140 @@
+from datetime import date
+import os
+import pandas as pd
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns, DerivativesBaseColumns
+from markets_insights.core.core import MarketDaysHelper
+from markets_insights.core.environment import Environment, EnvironmentSettings
+from markets_insights.datareader import data_reader
+from markets_insights.datareader.data_reader import (
+    ForDateCriteria,
+    NseDerivatiesReader,
+    NseEquityFuturesDataReader,
+    NseEquityOptionsDataReader,
+    NseIndexFuturesDataReader,
+    NseIndexOptionsDataReader,
+)
+from markets_insights.datareader.parsed_file_cache import ParsedFileCache, parsed_file_cache
+from nse_stand_in import SyntheticMarketData
+
+for_date = date(2023, 12, 1)
+market_data = SyntheticMarketData(symbols=10, strikes=4, expiries=2)
+
+
+@pytest.fixture
+def fo_file(tmp_path, monkeypatch):
+    monkeypatch.setitem(EnvironmentSettings.Paths, "DataBaseDir", str(tmp_path))
+    Environment.setup(str(tmp_path))
+    parsed_file_cache.clear()
+    fo_dir = os.path.join(str(tmp_path), EnvironmentSettings.Paths["RawDataDir"], EnvironmentSettings.Paths["NseDerivativesDataDir"])
+    for day in pd.date_range(date(2023, 12, 1), date(2023, 12, 31), freq="B"):
+        if MarketDaysHelper.is_open_for_day(day.date()):
+            filename = NseDerivatiesReader().get_filenames(day)["download_filename"]
+            market_data.derivatives_new(day.date()).to_csv(os.path.join(fo_dir, filename), index=False)
+    return os.path.join(fo_dir, NseDerivatiesReader().get_filenames(for_date)["download_filename"])
+
+
+@pytest.fixture
+def parse_count(monkeypatch):
+    calls = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(data_reader.pd, "read_csv", lambda *args, **kwargs: calls.append(args[0]) or read_csv(*args, **kwargs))
+    return calls
+
+
+def test_readers_share_one_parse(fo_file, parse_count):
+    readers = [NseEquityFuturesDataReader(), NseIndexFuturesDataReader(), NseIndexOptionsDataReader(), NseEquityOptionsDataReader()]
+    results = [reader.read(ForDateCriteria(for_date)) for reader in readers]
+
+    assert len(parse_count) == 1
+    assert [set(data[DerivativesBaseColumns.InstrumentType]) for data in results] == [{"FUTSTK"}, {"FUTIDX"}, {"OPTIDX"}, {"OPTSTK"}]
+
+
+def test_views_match_filtered_full_parse(fo_file):
+    reader = NseIndexOptionsDataReader()
+    data = reader.read(ForDateCriteria(for_date))
+
+    full_reader = NseIndexOptionsDataReader()
+    raw_data = full_reader.read_data_from_file(for_date, fo_file)
+    full_data = full_reader.post_read_data(raw_data[raw_data["FinInstrmNm"] == "OPTIDX"])
+
+    pd.testing.assert_frame_equal(data.reset_index(drop=True), full_data.reset_index(drop=True))
+
+
+def test_shared_frame_is_not_modified(fo_file):
+    NseIndexFuturesDataReader().read(ForDateCriteria(for_date))
+    NseIndexOptionsDataReader().read(ForDateCriteria(for_date))
+
+    shared_data = NseDerivatiesReader().read_source_data(for_date)
+    assert "TckrSymb" in shared_data.columns
+    assert BaseColumns.Identifier not in shared_data.columns
+    assert set(shared_data["FinInstrmNm"]) == {"FUTIDX", "FUTSTK", "OPTIDX", "OPTSTK"}
+
+
+def test_compact_keeps_every_instrument_type(fo_file):
+    pytest.importorskip("pyarrow")
+    reader = NseIndexFuturesDataReader()
+    reader.compact(data_reader.DateRangeCriteria(for_date, for_date))
+
+    partition = reader.get_partition_store().read(for_date)
+    assert set(partition[DerivativesBaseColumns.InstrumentType]) == {"FUTIDX", "FUTSTK", "OPTIDX", "OPTSTK"}
+
+
+def test_cache_is_bounded_by_bytes(tmp_path):
+    paths = []
+    for i in range(3):
+        path = os.path.join(str(tmp_path), f"{i}.csv")
+        pd.DataFrame({"A": range(1000)}).to_csv(path, index=False)
+        paths.append(path)
+
+    cache = ParsedFileCache(max_bytes=10000)
+    for path in paths:
+        cache.get(path, pd.read_csv)
+
+    assert len(cache.files) == 1
+    assert cache.size <= 10000
+
+
+def test_cache_size_follows_settings(tmp_path, monkeypatch):
+    monkeypatch.setitem(EnvironmentSettings.Caches, "ParsedFileCacheMB", 1)
+    cache = ParsedFileCache()
+
+    assert cache.get_max_bytes() == 1024 * 1024
+    assert ParsedFileCache(max_bytes=10000).get_max_bytes() == 10000
+
+
+def test_unfiltered_view_keeps_file_order(fo_file):
+    shared_data = NseDerivatiesReader().read_source_data(for_date)
+
+    assert shared_data["TckrSymb"].tolist() == pd.read_csv(fo_file)["TckrSymb"].tolist()
+
+
+def test_interleaved_values_are_served_in_file_order(tmp_path):
+    path = os.path.join(str(tmp_path), "interleaved.csv")
+    pd.DataFrame({"Type": ["B", "A", "B", "A"], "Row": range(4)}).to_csv(path, index=False)
+
+    parsed_file = ParsedFileCache().get(path, pd.read_csv, split_column="Type")
+
+    assert parsed_file.get_view("A")["Row"].tolist() == [1, 3]
+    assert parsed_file.get_view("B")["Row"].tolist() == [0, 2]
+    assert parsed_file.get_view("C").empty
+
+
+def test_chunked_read_bypasses_shared_parse(fo_file, monkeypatch):
+    chunk_sizes = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(data_reader.pd, "read_csv", lambda *args, **kwargs: chunk_sizes.append(kwargs.get("chunksize")) or read_csv(*args, **kwargs))
+    reader = NseIndexOptionsDataReader()
+    reader.options.read_chunk_rows = 50
+
+    data = reader.read(ForDateCriteria(for_date))
+
+    assert chunk_sizes == [50]
+    assert len(parsed_file_cache.files) == 0
+    expected = NseIndexOptionsDataReader().read(ForDateCriteria(for_date))
+    pd.testing.assert_frame_equal(data.reset_index(drop=True), expected.reset_index(drop=True))
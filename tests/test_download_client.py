@@ -0,0 +1,190 @@
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import os
+import pickle
+from string import Template
+import threading
+import time
+from urllib.error import HTTPError
+from zipfile import ZipFile
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.environment import Environment, EnvironmentSettings
+from markets_insights.datareader.data_reader import BhavCopyReader, ForDateCriteria
+from markets_insights.datareader.download_client import DownloadClient, TokenBucket
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.client_ports.add(self.client_address[1])
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hits = server.hits[self.path]
+
+        if self.path.startswith("/flaky") and hits <= 2:
+            self.send_body(503, b"busy")
+        elif self.path.startswith("/throttle") and hits == 1:
+            self.send_body(429, b"slow down", {"Retry-After": "0"})
+        elif self.path.startswith("/missing"):
+            self.send_body(404, b"not found")
+        elif self.path.startswith("/close"):
+            # drops the connection after answering without telling the client, like an idle timeout
+            self.send_body(200, self.path.encode())
+            self.close_connection = True
+        elif self.path.startswith("/redirect"):
+            self.send_body(302, b"", {"Location": "/files/redirected.csv"})
+        elif self.path in server.files:
+            self.send_body(200, server.files[self.path])
+        else:
+            self.send_body(200, self.path.encode())
+
+    def send_body(self, status: int, body: bytes, headers: dict = {}):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.lock = threading.Lock()
+    server.client_ports = set()
+    server.hits = {}
+    server.files = {}
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get_client():
+    return DownloadClient(backoff_seconds=0.01, requests_per_second=1000, burst=1000)
+
+
+def test_connections_are_reused(server):
+    client = get_client()
+    bodies = [client.get(f"{server.base_url}/files/{i}.csv") for i in range(10)]
+
+    assert bodies[3] == b"/files/3.csv"
+    assert len(server.client_ports) == 1
+    assert client.pool.created == 1
+
+
+def test_closed_keep_alive_connection_is_not_a_retry(server):
+    client = get_client()
+    client.max_retries = 0
+    client.backoff_seconds = 10
+
+    bodies = [client.get(f"{server.base_url}/close/{i}.csv") for i in range(3)]
+
+    assert bodies == [f"/close/{i}.csv".encode() for i in range(3)]
+    assert client.pool.created == 3
+    assert client.stats.summary()["retries"] == 0
+
+
+def test_transient_errors_are_retried(server):
+    client = get_client()
+
+    assert client.get(f"{server.base_url}/flaky/1.csv") == b"/flaky/1.csv"
+    assert server.hits["/flaky/1.csv"] == 3
+    assert client.stats.summary()["retries"] == 2
+
+
+def test_retries_are_bounded(server):
+    client = get_client()
+    client.max_retries = 1
+
+    with pytest.raises(HTTPError) as error:
+        client.get(f"{server.base_url}/flaky/2.csv")
+    assert error.value.code == 503
+    assert server.hits["/flaky/2.csv"] == 2
+
+
+def test_not_found_is_not_retried(server):
+    client = get_client()
+
+    with pytest.raises(HTTPError) as error:
+        client.get(f"{server.base_url}/missing/1.csv")
+    assert error.value.code == 404
+    assert server.hits["/missing/1.csv"] == 1
+    assert client.stats.summary()["failures"] == 1
+
+
+def test_redirects_are_followed(server):
+    assert get_client().get(f"{server.base_url}/redirect/1.csv") == b"/files/redirected.csv"
+
+
+def test_throttling_slows_down_rate(server):
+    client = get_client()
+    rate = client.rate_limiter.rate
+
+    assert client.get(f"{server.base_url}/throttle/1.csv") == b"/throttle/1.csv"
+    assert client.rate_limiter.rate < rate
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.monotonic() - started >= 0.04
+
+
+def test_client_pickles_with_its_settings():
+    client = pickle.loads(pickle.dumps(DownloadClient(max_retries=1, requests_per_second=5, burst=2)))
+
+    assert client.max_retries == 1
+    assert (client.rate_limiter.max_rate, client.rate_limiter.burst) == (5, 2)
+    assert client.stats.requests == 0
+
+
+def test_stats_record_latency_and_throughput(server):
+    client = get_client()
+    for i in range(3):
+        client.get(f"{server.base_url}/files/{i}.csv")
+
+    summary = client.stats.summary()
+    assert summary["requests"] == 3
+    assert summary["bytes"] == sum(len(f"/files/{i}.csv") for i in range(3))
+    assert summary["mean_latency"] > 0
+    assert len(client.stats.records) == 3
+
+
+def test_reader_downloads_with_client(server, tmp_path, monkeypatch):
+    monkeypatch.setitem(EnvironmentSettings.Paths, "DataBaseDir", str(tmp_path))
+    Environment.setup(str(tmp_path))
+    for_date = date(2023, 12, 1)
+    reader = BhavCopyReader()
+    filenames = reader.get_filenames(for_date)
+    archive = io.BytesIO()
+    with ZipFile(archive, "w") as zf:
+        zf.writestr(
+            filenames["primary_data_filename"],
+            "SYMBOL,SERIES,OPEN,HIGH,LOW,CLOSE,TOTTRDQTY,TOTTRDVAL\nTCS,EQ,1,2,1,2,10,20\n",
+        )
+    server.files[f"/{filenames['download_filename']}"] = archive.getvalue()
+
+    reader.options.url_template = Template(server.base_url + "/$download_filename")
+    reader.options.download_client = get_client()
+    data = reader.read(ForDateCriteria(for_date))
+
+    assert data[BaseColumns.Identifier].tolist() == ["TCS"]
+    assert reader.options.download_client.stats.summary()["requests"] == 1
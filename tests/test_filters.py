@@ -0,0 +1,85 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns
+from markets_insights.core.core import (
+    DateFilter,
+    DateRangeFilter,
+    FilterBase,
+    FilterCriteria,
+    IdentifierFilter,
+)
+
+data = pd.DataFrame(
+    {
+        BaseColumns.Identifier: pd.Categorical(["A", "B", "A", "C"]),
+        BaseColumns.Date: pd.to_datetime(["2023-12-01", "2023-12-01", "2023-12-04", "2023-12-05"]),
+        BaseColumns.Volume: [10.0, np.nan, 30.0, 40.0],
+    }
+)
+
+
+def volume_filter(condition: str, value) -> FilterBase:
+    volume_filter = FilterBase()
+    volume_filter.add_criteria(FilterCriteria(BaseColumns.Volume, condition, value))
+    return volume_filter
+
+
+def test_mask_matches_query():
+    for filter in [
+        IdentifierFilter("A"),
+        volume_filter(">", 15),
+        volume_filter("!=", 30),
+        volume_filter("in", [10.0, 40.0]),
+        IdentifierFilter("A") & volume_filter("<=", 10),
+    ]:
+        pd.testing.assert_frame_equal(filter.apply(data), data.query(str(filter)))
+
+
+def test_dates_compare_with_datetime_column():
+    assert DateFilter(date(2023, 12, 1)).apply(data)[BaseColumns.Identifier].tolist() == ["A", "B"]
+    assert DateRangeFilter(date(2023, 12, 2), date(2023, 12, 31)).apply(data)[BaseColumns.Identifier].tolist() == ["A", "C"]
+
+
+def test_between_and_not_in():
+    assert volume_filter("between", (10, 30)).apply(data)[BaseColumns.Volume].tolist() == [10.0, 30.0]
+    assert volume_filter("between", (10, 30)).apply(data).equals(data.query(str(volume_filter("between", (10, 30)))))
+
+    not_in = FilterBase()
+    not_in.add_criteria(FilterCriteria(BaseColumns.Identifier, "not in", ["A"]))
+    assert not_in.apply(data)[BaseColumns.Identifier].tolist() == ["B", "C"]
+
+
+def test_key_ignores_criteria_order():
+    left = IdentifierFilter("A") & volume_filter("in", [40, 10])
+    right = volume_filter("in", [10, 40]) & IdentifierFilter("A")
+
+    assert left.get_key() == right.get_key()
+    assert hash(left.get_key()) == hash(right.get_key())
+    assert left.get_key() != (IdentifierFilter("B") & volume_filter("in", [10, 40])).get_key()
+
+
+def test_values_only_query_can_evaluate_fall_back_to_query():
+    prices = data.assign(**{BaseColumns.Open: [5.0, 1.0, 40.0, 50.0]})
+    above_open = volume_filter(">", f"`{BaseColumns.Open}`")
+    twice_open = volume_filter("==", f"`{BaseColumns.Open}` * 2")
+
+    for filter in [above_open, above_open & IdentifierFilter("A"), twice_open]:
+        pd.testing.assert_frame_equal(filter.apply(prices), prices.query(str(filter)))
+    assert above_open.apply(prices)[BaseColumns.Identifier].tolist() == ["A"]
+    assert prices[(above_open & IdentifierFilter("A")).get_mask(prices)][BaseColumns.Identifier].tolist() == ["A"]
+    assert above_open.get_key() == ((BaseColumns.Volume, ">", f"`{BaseColumns.Open}`"),)
+
+
+def test_typed_values_are_not_kept_per_frame():
+    filter = IdentifierFilter("A")
+    for identifiers in [["A", "B"], ["A", "C"], ["A", "D"]]:
+        frame = pd.DataFrame({BaseColumns.Identifier: pd.Categorical(identifiers)})
+        assert frame[filter.get_mask(frame)][BaseColumns.Identifier].tolist() == ["A"]
+
+    assert [len(criteria._typed_values) for criteria in filter.get_criterias()] == [1]
@@ -0,0 +1,81 @@
+from datetime import date
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.column_definition import BaseColumns, DerivativesBaseColumns
+from markets_insights.core.environment import EnvironmentSettings
+from markets_insights.datareader.data_reader import (
+    BhavCopyReader,
+    DateRangeCriteria,
+    DateRangeDataReaderWrapper,
+    NseDerivatiesOldReader,
+    NseIndexFuturesDataReader,
+    NseIndicesNewReader,
+    NseEquityOptionsDataReader,
+)
+from markets_insights.datareader.download_client import DownloadClient
+from nse_stand_in import NseArchiveStandIn, SyntheticMarketData
+
+criteria = DateRangeCriteria(date(2023, 12, 1), date(2023, 12, 5))
+
+
+@pytest.fixture(scope="module")
+def stand_in():
+    with NseArchiveStandIn(SyntheticMarketData(symbols=20, strikes=4, expiries=2)) as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def data_dir(data_dir, stand_in, monkeypatch):
+    monkeypatch.setitem(EnvironmentSettings.Urls, "NseArchivesUrl", stand_in.base_url)
+    return data_dir
+
+
+def read(reader):
+    reader.options.download_client = DownloadClient(requests_per_second=1000, burst=1000)
+    return DateRangeDataReaderWrapper(reader).read(criteria)
+
+
+def test_synthetic_data_is_deterministic():
+    assert SyntheticMarketData(seed=1).bhavcopy(date(2023, 12, 1)).equals(SyntheticMarketData(seed=1).bhavcopy(date(2023, 12, 1)))
+    assert not SyntheticMarketData(seed=1).bhavcopy(date(2023, 12, 1)).equals(SyntheticMarketData(seed=2).bhavcopy(date(2023, 12, 1)))
+
+
+def test_stand_in_serves_market_days_only(stand_in):
+    assert stand_in.get_file("/content/indices/ind_close_all_01122023.csv") is not None
+    assert stand_in.get_file("/content/indices/ind_close_all_02122023.csv") is None
+    assert stand_in.get_file("/content/unknown.csv") is None
+
+
+def test_bhavcopy_reader(data_dir):
+    data = read(BhavCopyReader())
+
+    assert data[BaseColumns.Date].nunique() == 3
+    assert data.shape[0] == 3 * 18
+    assert data[BaseColumns.Close].dtype == float
+
+
+def test_indices_reader(data_dir):
+    data = read(NseIndicesNewReader())
+
+    assert data.shape[0] == 3 * 5
+    assert data[BaseColumns.Open].notna().all()
+
+
+def test_derivatives_reader(data_dir):
+    futures = read(NseIndexFuturesDataReader())
+    options = read(NseEquityOptionsDataReader())
+
+    assert set(futures[BaseColumns.Identifier]) == {"Nifty 50", "Nifty Bank", "Nifty Financial Services"}
+    assert set(options[DerivativesBaseColumns.InstrumentType]) == {"OPTSTK"}
+    assert (options[DerivativesBaseColumns.OpenInterest] > 0).all()
+
+
+def test_derivatives_old_reader(data_dir):
+    data = read(NseDerivatiesOldReader())
+
+    assert data[BaseColumns.Date].nunique() == 3
+    assert set(data[DerivativesBaseColumns.InstrumentType]) == {"FUTIDX", "FUTSTK", "OPTIDX", "OPTSTK"}
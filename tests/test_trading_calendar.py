@@ -0,0 +1,101 @@
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+import pytest
+
+from helper import setup
+
+setup()
+
+from markets_insights.core.core import ExpiryCalendar, MarketDaysHelper, TradingCalendar
+from markets_insights.core.settings import MarketDaysSettings
+
+# 2023-11-27 (Monday) is a market holiday
+november = pd.date_range(date(2023, 11, 1), date(2023, 11, 30))
+
+
+def is_open_by_loop(day: date) -> bool:
+    return day.weekday() < 5 and day not in MarketDaysSettings.MarketHolidays
+
+
+def test_is_open_matches_holiday_list():
+    calendar = TradingCalendar.get()
+
+    assert calendar.is_open(november).tolist() == [is_open_by_loop(day.date()) for day in november]
+    assert not MarketDaysHelper.is_open_for_day(date(2023, 11, 27))
+    assert MarketDaysHelper.is_open_for_day(pd.Timestamp("2023-11-28"))
+
+
+@pytest.mark.parametrize("for_date", [date(2023, 11, 25), datetime(2023, 11, 25, 9, 15), pd.Timestamp("2023-11-25")])
+def test_market_day_helpers_keep_input_type(for_date):
+    next_day = MarketDaysHelper.get_next_market_day(for_date)
+
+    assert type(next_day) == type(for_date)
+    assert pd.Timestamp(next_day) == pd.Timestamp(for_date) + pd.Timedelta(days=3)
+    assert pd.Timestamp(MarketDaysHelper.get_previous_market_day(for_date)) == pd.Timestamp(for_date) - pd.Timedelta(days=1)
+
+
+def test_offsets_and_ranges_skip_holidays():
+    calendar = TradingCalendar.get()
+    days = pd.to_datetime(["2023-11-23", "2023-11-24", "2023-11-25"])
+
+    assert pd.DatetimeIndex(calendar.offset(days, 1)).strftime("%d").tolist() == ["24", "28", "28"]
+    assert pd.DatetimeIndex(calendar.offset(days, -1)).strftime("%d").tolist() == ["22", "23", "24"]
+    assert calendar.count_sessions(date(2023, 11, 1), date(2023, 11, 30)) == sum(is_open_by_loop(day.date()) for day in november)
+    assert MarketDaysHelper.get_market_days_list_for_range(date(2023, 11, 24), date(2023, 11, 29)) == list(
+        pd.to_datetime(["2023-11-24", "2023-11-28", "2023-11-29"])
+    )
+
+
+def test_calendar_follows_settings(monkeypatch):
+    monkeypatch.setattr(MarketDaysSettings, "MarketHolidays", MarketDaysSettings.MarketHolidays + [date(2023, 11, 28)])
+    monkeypatch.setattr(MarketDaysSettings, "HolidayOpenings", [date(2023, 11, 27)])
+
+    assert MarketDaysHelper.get_next_market_day(date(2023, 11, 24)) == date(2023, 11, 27)
+    assert MarketDaysHelper.get_next_market_day(date(2023, 11, 27)) == date(2023, 11, 29)
+
+
+def test_monthly_expiries_match_last_thursdays():
+    expected = [
+        MarketDaysHelper.get_this_or_previous_market_day(MarketDaysHelper.get_last_thursday(year, month))
+        for year in range(2019, 2024)
+        for month in range(1, 13)
+    ]
+
+    expiries = ExpiryCalendar.get(ExpiryCalendar.Monthly).expiries_in_range(date(2019, 1, 1), date(2023, 12, 31))
+
+    assert [expiry.date() for expiry in expiries] == expected
+
+
+def test_weekly_expiries_move_before_holidays():
+    expiries = ExpiryCalendar.get(ExpiryCalendar.Weekly).expiries_in_range(date(2023, 3, 20), date(2023, 4, 10))
+
+    # 2023-03-30 (Thursday) was a holiday
+    assert expiries.strftime("%Y-%m-%d").tolist() == ["2023-03-23", "2023-03-29", "2023-04-06"]
+
+
+def test_next_expiry_maps_date_column():
+    dates = pd.Series(pd.to_datetime(["2023-12-01", "2023-12-28", "2023-12-29"]), index=[5, 6, 7])
+
+    expiries = ExpiryCalendar.get().map_next_expiry(dates)
+
+    assert expiries.index.tolist() == [5, 6, 7]
+    assert expiries.dt.strftime("%Y-%m-%d").tolist() == ["2023-12-28", "2023-12-28", "2024-01-25"]
+
+
+def test_dates_before_the_calendar_span():
+    calendar = TradingCalendar.get()
+
+    assert calendar.is_open([date(1985, 1, 2), date(1985, 1, 5)]).tolist() == [True, False]
+    assert MarketDaysHelper.get_this_or_next_market_day(date(1900, 1, 1)) == date(1900, 1, 1)
+    assert MarketDaysHelper.get_previous_market_day(date(1900, 1, 1)) == date(1899, 12, 29)
+    assert calendar.count_sessions(date(1985, 1, 1), date(1985, 1, 31)) == 23
+
+
+def test_dates_after_the_calendar_span():
+    calendar = TradingCalendar.get()
+
+    assert MarketDaysHelper.get_next_market_day(date(2099, 12, 31)) == date(2100, 1, 1)
+    assert MarketDaysHelper.get_next_market_day(date(2100, 1, 1)) == date(2100, 1, 4)
+    assert calendar.offset(date(2099, 12, 31), 500) == np.busday_offset(np.datetime64("2099-12-31"), 500)
+    assert ExpiryCalendar.get().next_expiry(date(2100, 1, 1)) == np.datetime64("2100-01-28")